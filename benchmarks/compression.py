@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark the compression of solution and statistics files.
+
+This script runs the same tasks using the fake solver backend with each of the
+supported compression methods, and reports the number of bytes written, the
+time taken to run the tasks, and the time taken to collect the statistics and
+objectives from the results. The objectives are collected both from the
+sidecar files and from the solution files themselves.
+
+Example usage:
+    python benchmarks/compression.py --tasks 50 --solutions 20 --size 500
+"""
+import argparse
+import io
+import tempfile
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import timedelta
+from pathlib import Path
+
+from mzn_bench import Configuration, FakeSolver, SolutionStore, schedule
+from mzn_bench.cli import collect_objectives_, collect_statistics_
+from mzn_bench.results import COMPRESSION_SUFFIXES
+
+
+def measure(fn) -> float:
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+
+def run(root: Path, compression, tasks: int, solutions: int, size: int, mode: str):
+    (root / "model.mzn").write_text("var 1..10: x;\nsolve minimize x;\n")
+    instances = root / "instances.csv"
+    instances.write_text(
+        "problem,model,data_file\n"
+        + "".join(f"p,model.mzn,{i}.dzn\n" for i in range(tasks))
+    )
+    output_dir = root / (compression or "none")
+    run_time = measure(
+        lambda: schedule(
+            instances=instances,
+            timeout=timedelta(seconds=60),
+            configurations=[Configuration(name="A", solver=FakeSolver.solver())],
+            output_dir=output_dir,
+            nodelist=None,
+            fake=FakeSolver(solutions=solutions, rate=None, size=size),
+            solution_store=SolutionStore(mode=mode),
+            compression=compression,
+        )
+    )
+    written = sum(f.stat().st_size for f in output_dir.iterdir())
+    statistics = measure(
+        lambda: collect_statistics_([str(output_dir)], str(root / "stats.csv"))
+    )
+    objectives = measure(
+        lambda: collect_objectives_([str(output_dir)], str(root / "objs.csv"))
+    )
+    for file in output_dir.glob("*_obj.csv"):
+        file.unlink()
+    solution_objectives = measure(
+        lambda: collect_objectives_([str(output_dir)], str(root / "objs.csv"))
+    )
+    return written, run_time, statistics, objectives, solution_objectives
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50, help="Number of tasks")
+    parser.add_argument("--solutions", type=int, default=20, help="Solutions per task")
+    parser.add_argument(
+        "--size", type=int, default=500, help="Number of values in each solution"
+    )
+    parser.add_argument(
+        "--mode",
+        default="full",
+        help="The solution storage mode (full, sample, or delta)",
+    )
+    args = parser.parse_args()
+
+    methods = [None] + list(COMPRESSION_SUFFIXES)
+    print(
+        f"{'compression':<12} {'written':>12} {'run':>9} {'statistics':>11} "
+        f"{'objectives':>11} {'(solutions)':>12}"
+    )
+    for compression in methods:
+        with tempfile.TemporaryDirectory(prefix="mzn_bench_") as tmp:
+            try:
+                written, *timings = run(
+                    Path(tmp),
+                    compression,
+                    args.tasks,
+                    args.solutions,
+                    args.size,
+                    args.mode,
+                )
+            except ImportError as err:
+                print(f"{compression:<12} skipped ({err})")
+                continue
+        print(
+            f"{compression or 'none':<12} {written / 2**20:>10.2f}MB "
+            + " ".join(f"{t:>10.3f}s" for t in timings)
+        )
+
+
+if __name__ == "__main__":
+    main()
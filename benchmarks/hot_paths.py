@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""Benchmarks for the hot paths of mzn-bench itself.
+
+This script generates a large synthetic benchmark (an instance directory, an
+instances CSV file, and a results directory with statistics and solution
+files), and times the functions that process them. No solver or MiniZinc
+installation is required: tasks are run using the fake solver backend, or a
+stub that does not run the instance at all.
+
+The timings are appended to a history file (JSON lines), and are compared to
+the last entry in the history with the same scale. The script exits with an
+error code when any of the timings regressed by more than the tolerance.
+
+Example usage:
+    python benchmarks/hot_paths.py --scale 100000 --history benchmarks/history.jsonl
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import minizinc
+
+import mzn_bench.mzn_slurm as mzn_slurm
+from mzn_bench import Configuration, FakeSolver, schedule
+from mzn_bench.analysis.collect import collect_instances
+from mzn_bench.archive import compact
+from mzn_bench.cli import collect_objectives_, collect_statistics_
+from mzn_bench.results import OBJECTIVE_KEYS
+
+CONFIGURATIONS = ["Stub", "Stub2"]
+STATUSES = ["OPTIMAL_SOLUTION", "SATISFIED", "UNKNOWN", "UNSATISFIABLE", "ERROR"]
+
+STATS = """configuration: {config}
+data_file: {data}
+flatTime: 0.{row:03d}
+method: {method}
+model: {model}
+nSolutions: {n}
+objective: {objective}
+problem: {problem}
+solveTime: {time}
+status: {status}
+time: {time}
+"""
+
+SOLUTION = """- configuration: {config}
+  data_file: {data}
+  model: {model}
+  problem: {problem}
+  solution:
+    objective: {objective}
+    x: [{values}]
+  status: SATISFIED
+  time: {time}
+"""
+
+
+def instance(row: int, problems: int):
+    problem = f"problem{row % problems}"
+    return problem, f"{problem}/model.mzn", f"{problem}/data{row}.dzn"
+
+
+def generate(
+    root: Path, scale: int, solutions: int, problems: int, sidecars: bool = True
+):
+    """Generate the instance directory, instances CSV, and results directory"""
+    n_instances = scale // len(CONFIGURATIONS)
+
+    # Instance directory and instances CSV
+    instances = root / "instances"
+    for p in range(problems):
+        (instances / f"problem{p}").mkdir(parents=True)
+        (instances / f"problem{p}" / "model.mzn").write_text("var 1..10: x;\n")
+    with (root / "instances.csv").open("w") as file:
+        writer = csv.writer(file, dialect="unix")
+        writer.writerow(["problem", "model", "data_file"])
+        for row in range(n_instances):
+            problem, model, data = instance(row, problems)
+            (instances / data).write_text(f"n = {row};\n")
+            writer.writerow([problem, model, data])
+
+    # Results directory
+    results = root / "results"
+    results.mkdir()
+    values = ", ".join(str(i) for i in range(50))
+    for row in range(n_instances):
+        problem, model, data = instance(row, problems)
+        method = "satisfy" if row % 5 == 0 else "minimize"
+        for c, config in enumerate(CONFIGURATIONS):
+            status = STATUSES[(row + c) % len(STATUSES)]
+            n = 1 if method == "satisfy" else solutions
+            keys = dict(config=config, problem=problem, model=model, data=data)
+            name = f"{row + 1}_{config}"
+            (results / f"{name}_stats.yml").write_text(
+                STATS.format(
+                    **keys,
+                    row=row % 1000,
+                    method=method,
+                    n=n,
+                    objective=1000 - n,
+                    status=status,
+                    time=(row % 97) + c,
+                )
+            )
+            (results / f"{name}_sol.yml").write_text(
+                "".join(
+                    SOLUTION.format(
+                        **keys,
+                        objective=1000 - i,
+                        values=values,
+                        time=(i + 1) * 0.1,
+                    )
+                    for i in range(n)
+                )
+            )
+            if sidecars:
+                with (results / f"{name}_obj.csv").open("w") as file:
+                    writer = csv.writer(file, dialect="unix")
+                    writer.writerow(OBJECTIVE_KEYS)
+                    for i in range(n):
+                        writer.writerow(
+                            [config, problem, model, data]
+                            + ["SATISFIED", (i + 1) * 0.1, 1000 - i]
+                        )
+    return root / "instances.csv", results
+
+
+def measure(fn, repeat: int = 1):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            fn()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def benchmark(
+    root: Path,
+    instances: Path,
+    results: Path,
+    plot_limit: int,
+    run_limit: int,
+    solutions: int,
+):
+    timings = {}
+    stats_csv = root / "statistics.csv"
+    objs_csv = root / "objectives.csv"
+
+    timings["collect_instances"] = measure(
+        lambda: sum(1 for _ in collect_instances(str(root / "instances"), None))
+    )
+    timings["collect_statistics"] = measure(
+        lambda: collect_statistics_([str(results)], str(stats_csv))
+    )
+    timings["collect_objectives"] = measure(
+        lambda: collect_objectives_([str(results)], str(objs_csv))
+    )
+
+    # Time the compaction of the results, and the collection from the archive
+    archive = root / "results.sqlite"
+    timings["compact"] = measure(lambda: compact(results, archive))
+    timings["collect_statistics[archive]"] = measure(
+        lambda: collect_statistics_([str(archive)], str(root / "statistics_a.csv"))
+    )
+    timings["collect_objectives[archive]"] = measure(
+        lambda: collect_objectives_([str(archive)], str(root / "objectives_a.csv"))
+    )
+
+    # Time the task lookup in main() for the last task, using a stub instead of
+    # running the instance
+    async def stub_run_instance(*args):
+        pass
+
+    solver = minizinc.Solver(
+        name="Stub", version="1.0", id="org.mzn_bench.stub", executable=""
+    )
+    configurations = [Configuration(name=c, solver=solver) for c in CONFIGURATIONS]
+    os.environ["MZN_SLURM_CONFIGS"] = json.dumps(
+        [c.to_dict() for c in configurations], cls=mzn_slurm._JSONEnc
+    )
+    os.environ["MZN_SLURM_TIMEOUT"] = str(
+        int(timedelta(seconds=1).total_seconds() * 1000)
+    )
+    n_tasks = (sum(1 for _ in instances.open()) - 1) * len(configurations)
+    os.environ["SLURM_ARRAY_TASK_ID"] = str(n_tasks)
+    run_instance = mzn_slurm.run_instance
+    mzn_slurm.run_instance = stub_run_instance
+    try:
+        timings["main_task_lookup"] = measure(
+            lambda: mzn_slurm.main(instances, root), repeat=3
+        )
+    finally:
+        mzn_slurm.run_instance = run_instance
+
+    # Time the start-up of a worker process (as started by every SLURM job)
+    timings["worker_startup"] = measure(
+        lambda: subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", "import mzn_bench.mzn_slurm"],
+            check=True,
+        ),
+        repeat=5,
+    )
+
+    # Time the local execution of tasks using the fake solver backend
+    lines = instances.read_text().splitlines(keepends=True)
+    run_instances = root / "instances" / "run_instances.csv"
+    run_instances.write_text("".join(lines[: run_limit // len(configurations) + 1]))
+    fake_dir = root / "fake_results"
+    timings[f"schedule_fake[{run_limit}]"] = measure(
+        lambda: schedule(
+            instances=run_instances,
+            timeout=timedelta(seconds=60),
+            configurations=configurations,
+            output_dir=fake_dir,
+            nodelist=None,
+            fake=FakeSolver(solutions=solutions, rate=None, size=50),
+        )
+    )
+
+    try:
+        from mzn_bench.analysis.analyse_changes import compare_configurations
+        from mzn_bench.analysis.report_status import report_status
+    except ImportError:
+        print("Skipping analysis benchmarks (requires mzn-bench[scripts])")
+    else:
+        timings["compare_configurations"] = measure(
+            lambda: compare_configurations(
+                stats_csv, CONFIGURATIONS[0], CONFIGURATIONS[1], 0.1, 0.1
+            )
+        )
+        timings["report_status"] = measure(
+            lambda: report_status(
+                ["configuration", "problem"], stats_csv, "time", "plain"
+            )
+        )
+
+    try:
+        from mzn_bench.analysis.collect import read_csv
+        from mzn_bench.analysis.plot import plot_all_instances
+    except ImportError:
+        print("Skipping plotting benchmarks (requires mzn-bench[plotting])")
+    else:
+        sols, stats = read_csv(objs_csv, stats_csv)
+        stats = stats[stats.data_file.isin(stats.data_file.unique()[:plot_limit])]
+        timings[f"plot_all_instances[{plot_limit}]"] = measure(
+            lambda: plot_all_instances(sols, stats)
+        )
+    return timings
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scale", type=int, default=100_000, help="Number of tasks in the results"
+    )
+    parser.add_argument(
+        "--solutions", type=int, default=10, help="Solutions per optimisation task"
+    )
+    parser.add_argument("--problems", type=int, default=100, help="Number of problems")
+    parser.add_argument(
+        "--plot-limit", type=int, default=200, help="Number of instances to plot"
+    )
+    parser.add_argument(
+        "--no-sidecars",
+        action="store_true",
+        help="Do not generate objective sidecar files (as written by older versions)",
+    )
+    parser.add_argument(
+        "--run-limit", type=int, default=1000, help="Number of tasks to run"
+    )
+    parser.add_argument(
+        "--history", type=Path, default=None, help="JSON lines file with past timings"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Fraction by which a timing can increase before it is a regression",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mzn_bench_") as tmp:
+        root = Path(tmp)
+        start = time.perf_counter()
+        instances, results = generate(
+            root, args.scale, args.solutions, args.problems, not args.no_sidecars
+        )
+        print(f"Generated {args.scale} tasks in {time.perf_counter() - start:.1f}s")
+        timings = benchmark(
+            root,
+            instances,
+            results,
+            args.plot_limit,
+            args.run_limit,
+            args.solutions,
+        )
+
+    previous = None
+    if args.history is not None and args.history.exists():
+        with args.history.open() as file:
+            for line in file:
+                entry = json.loads(line)
+                if entry["scale"] == args.scale:
+                    previous = entry
+
+    regressions = []
+    for name, duration in timings.items():
+        line = f"{name:<32} {duration:>10.3f}s"
+        if previous is not None and name in previous["timings"]:
+            change = duration / previous["timings"][name] - 1
+            line += f" ({change:+.1%} since {previous['revision']})"
+            if change > args.tolerance:
+                regressions.append(name)
+                line += " REGRESSION"
+        print(line)
+
+    if args.history is not None:
+        with args.history.open("a") as file:
+            entry = {
+                "date": datetime.now(timezone.utc).isoformat(),
+                "revision": git_revision(),
+                "python": sys.version.split()[0],
+                "scale": args.scale,
+                "timings": timings,
+            }
+            file.write(json.dumps(entry) + "\n")
+
+    if len(regressions) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,50 @@
-from .mzn_slurm import schedule, Configuration, DZNExpression, yaml
-from .cli import (
-    collect_objectives_,
-    collect_statistics_,
-    check_solutions_,
-    check_statuses_,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+# The public names of the package are imported lazily (on first access), so
+# that importing a single submodule, such as the SLURM worker, does not import
+# the command line interface and its dependencies.
+_EXPORTS = {
+    "schedule": "mzn_slurm",
+    "Configuration": "mzn_slurm",
+    "DZNExpression": "mzn_slurm",
+    "yaml": "results",
+    "FakeSolver": "fake",
+    "SolutionStore": "results",
+    "Pinning": "pinning",
+    "read_solutions": "results",
+    "ResultCache": "result_cache",
+    "race": "racing",
+    "collect_objectives_": "cli",
+    "collect_statistics_": "cli",
+    "check_solutions_": "cli",
+    "check_statuses_": "cli",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .cli import (
+        check_solutions_,
+        check_statuses_,
+        collect_objectives_,
+        collect_statistics_,
+    )
+    from .fake import FakeSolver
+    from .mzn_slurm import Configuration, DZNExpression, schedule
+    from .pinning import Pinning
+    from .racing import race
+    from .result_cache import ResultCache
+    from .results import SolutionStore, read_solutions, yaml
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
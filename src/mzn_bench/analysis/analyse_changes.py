@@ -7,6 +7,8 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Tuple, Dict, List
 
+from .collect import read_stats_rows
+
 # The difference in objectives for them to be considered the same
 SAME_DELTA = 1e-6
 # Status changes (from, to) considered positive
@@ -218,14 +220,14 @@ def compare_configurations(
     from_stats = {}
     to_stats = {}
 
-    with statistics.open() as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            key = (row["model"], row["data_file"])
-            if row["configuration"] == from_conf:
-                from_stats[key] = read_row(row)
-            elif row["configuration"] == to_conf:
-                to_stats[key] = read_row(row)
+    for row in read_stats_rows(statistics):
+        if str(row.get("partial", "")) == "True":
+            continue  # The task did not finish, so its results are incomplete
+        key = (row["model"], row["data_file"])
+        if row["configuration"] == from_conf:
+            from_stats[key] = read_row(row)
+        elif row["configuration"] == to_conf:
+            to_stats[key] = read_row(row)
 
     changes = PerformanceChanges(time_delta, obj_delta)
 
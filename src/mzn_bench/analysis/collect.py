@@ -1,8 +1,7 @@
+import csv
 import os
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Union
-import minizinc
-from mzn_bench import yaml
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 STANDARD_KEYS = [
     "configuration",
@@ -12,6 +11,11 @@ STANDARD_KEYS = [
     "status",
     "time",
 ]
+INSTANCE_KEYS = ["problem", "model", "data_file"]
+# Keys that identify a task within a run
+TASK_KEYS = ["configuration"] + INSTANCE_KEYS
+# Statistics that are normalised by node speed
+TIME_STATISTICS = ["time", "solveTime", "flatTime"]
 
 
 def collect_instances(benchmarks_location: str, shared_data: Optional[str]):
@@ -43,44 +47,322 @@ def collect_instances(benchmarks_location: str, shared_data: Optional[str]):
                     }
 
 
-def collect_objectives(dirs: Iterable[Union[str, Path]]) -> List[Dict[str, Any]]:
+def collect_objectives(
+    dirs: Iterable[Union[str, Path]],
+    compact: bool = False,
+    resolution: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    from mzn_bench.results import objectives_path, result_files
+
     base_keys = STANDARD_KEYS.copy()
     base_keys.remove("status")  # No need to output SAT every time
     for dir in dirs:
         path = (dir if isinstance(dir, Path) else Path(dir)).resolve()
-        for file in path.rglob("*_sol.yml"):
-            with file.open() as fp:
-                sols = yaml.load(fp)
-                for sol in sols or []:
-                    if "solution" not in sol:
-                        continue
-                    obj = sol["solution"].get("objective", None)
-                    item = {k: sol[k] for k in base_keys}
-                    item["objective"] = obj
-                    item["run"] = path.name
-                    yield item
+        for file in [] if path.is_file() else result_files(path, "_sol.yml"):
+            # Read the objectives sidecar file when available, which avoids
+            # reading the (possibly large) solutions
+            sidecar = objectives_path(file)
+            if sidecar.exists():
+                items = _read_objectives(sidecar, base_keys)
+            else:
+                items = _read_solution_objectives(file, base_keys)
+            for item in items:
+                item["run"] = path.name
+            if compact:
+                items = compact_trajectory(items, resolution, _task_method(file))
+            yield from items
+        for file in _archives(path):
+            from mzn_bench.archive import Archive
+
+            with Archive(file, readonly=True) as archive:
+                methods = {}
+                if compact:
+                    methods = {
+                        tuple(stats.get(k) for k in TASK_KEYS): stats.get("method")
+                        for stats in archive.statistics()
+                    }
+                for items in archive.objectives():
+                    for item in items:
+                        item["run"] = _run_name(path)
+                    if compact:
+                        key = tuple(items[0][k] for k in TASK_KEYS)
+                        items = compact_trajectory(
+                            items, resolution, methods.get(key, None)
+                        )
+                    yield from items
+
+
+def _task_method(file: Path) -> Optional[str]:
+    # The method of a task, as recorded in the statistics next to its solutions
+    from mzn_bench.results import open_results, strip_compression, yaml
+
+    name = strip_compression(file.name)
+    stats_file = file.with_name(
+        name[: -len("_sol.yml")] + "_stats.yml" + file.name[len(name) :]
+    )
+    try:
+        with open_results(stats_file) as fp:
+            stats = yaml.load(fp)
+    except FileNotFoundError:
+        return None
+    return stats.get("method", None) if isinstance(stats, dict) else None
+
+
+def _read_solution_objectives(file: Path, base_keys: List[str]) -> List[Dict[str, Any]]:
+    from mzn_bench.results import open_results, yaml
+
+    with open_results(file) as fp:
+        sols = yaml.load(fp)
+    items = []
+    for sol in sols or []:
+        if "solution" not in sol:
+            continue
+        item = {k: sol[k] for k in base_keys}
+        item["objective"] = sol["solution"].get("objective", None)
+        items.append(item)
+    return items
+
+
+def _read_objectives(file: Path, base_keys: List[str]) -> List[Dict[str, Any]]:
+    items = []
+    with file.open(newline="") as fp:
+        for row in csv.DictReader(fp, dialect="unix"):
+            item = {k: row[k] for k in base_keys}
+            item["time"] = float(row["time"])
+            objective = row["objective"]
+            if objective == "":
+                item["objective"] = None
+            else:
+                try:
+                    item["objective"] = int(objective)
+                except ValueError:
+                    item["objective"] = float(objective)
+            items.append(item)
+    return items
+
+
+def compact_trajectory(
+    solutions: List[Dict[str, Any]],
+    resolution: Optional[float] = None,
+    method: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Reduce the objective trajectory of a single run
+
+    Only the solutions that strictly improve the objective are kept. Whether the
+    objective is minimised or maximised is given by the method of the instance.
+    When the method is unknown, it is derived from the first and the last
+    objective value. If a resolution is given, then the trajectory is further
+    resampled into time buckets of that width: the first solution and the last
+    (best) solution in each bucket are kept. Solutions without an objective
+    value are always kept.
+
+    Args:
+        solutions (List[Dict[str, Any]]): The solutions of the run, ordered by time
+        resolution (Optional[float], optional): The width (in seconds) of the
+            time buckets. Defaults to None.
+        method (Optional[str], optional): The method of the instance
+            (``minimize`` or ``maximize``), as reported in its statistics.
+            Defaults to None.
+
+    Returns:
+        List[Dict[str, Any]]: The remaining solutions
+    """
+    if method in ["minimize", "maximize"]:
+        sign = -1 if method == "maximize" else 1
+    else:
+        objectives = [s["objective"] for s in solutions if s["objective"] is not None]
+        sign = -1 if len(objectives) > 1 and objectives[-1] > objectives[0] else 1
+
+    kept = []
+    best = None
+    for sol in solutions:
+        if sol["objective"] is None:
+            kept.append(sol)
+        elif best is None or sign * sol["objective"] < best:
+            best = sign * sol["objective"]
+            kept.append(sol)
+    if resolution is None:
+        return kept
+
+    return [
+        sol
+        for i, sol in enumerate(kept)
+        if i == 0
+        or i + 1 == len(kept)
+        or kept[i + 1]["time"] // resolution != sol["time"] // resolution
+    ]
+
+
+def compact_objectives(sols, resolution: Optional[float] = None, stats=None):
+    """Reduce the objective trajectories in an objectives data frame
+
+    This applies the same reduction as ``compact_trajectory`` to every run of
+    every instance in the data frame, as read by ``read_csv``. The method of
+    every task is taken from the statistics, when given.
+
+    Args:
+        sols (pd.DataFrame): The objectives data frame
+        resolution (Optional[float], optional): The width (in seconds) of the
+            time buckets. Defaults to None.
+        stats (Optional[pd.DataFrame], optional): The statistics data frame.
+            Defaults to None.
+
+    Returns:
+        pd.DataFrame: The reduced objectives data frame
+    """
+    keys = ["configuration", "run", "problem", "model", "data_file"]
+    if sols.empty:
+        return sols
+    sols = sols.sort_values(keys + ["time"], kind="stable")
+    groups = [sols[k] for k in keys]
+    objective = sols.objective.groupby(groups)
+    maximise = objective.transform("last") > objective.transform("first")
+    if stats is not None and "method" in stats.columns:
+        on = [k for k in keys if k in stats.columns]
+        method = (
+            sols[on]
+            .merge(stats[on + ["method"]].drop_duplicates(on), on=on, how="left")
+            .method.to_numpy()
+        )
+        maximise = maximise.mask(method == "maximize", True)
+        maximise = maximise.mask(method == "minimize", False)
+    score = sols.objective.where(~maximise, -sols.objective)
+    prev_best = score.groupby(groups).cummin().groupby(groups).shift()
+    sols = sols[score.isna() | prev_best.isna() | (score < prev_best)]
+    if resolution is not None:
+        bucket = sols.assign(bucket=sols.time // resolution)
+        first = ~sols.duplicated(keys, keep="first")
+        last = ~bucket.duplicated(keys + ["bucket"], keep="last")
+        sols = sols[first | last]
+    return sols
 
 
 def collect_statistics(
     dirs: Iterable[Union[str, Path]], filter_stats: Optional[List[str]] = None
 ) -> List[Dict[str, Any]]:
+    from mzn_bench.results import open_results, result_files, yaml
+
     base_keys = STANDARD_KEYS
     for dir in dirs:
         path = (dir if isinstance(dir, Path) else Path(dir)).resolve()
-        for file in path.rglob("*_stats.yml"):
-            with file.open() as fp:
+        for file in [] if path.is_file() else result_files(path, "_stats.yml"):
+            with open_results(file) as fp:
                 stats = yaml.load(fp)
                 if filter_stats is not None:
                     stats = {k: stats[k] for k in base_keys + filter_stats}
                 stats["run"] = path.name
                 yield stats
+        for file in _archives(path):
+            from mzn_bench.archive import Archive
+
+            with Archive(file, readonly=True) as archive:
+                for stats in archive.statistics():
+                    if filter_stats is not None:
+                        stats = {k: stats[k] for k in base_keys + filter_stats}
+                    stats["run"] = _run_name(path)
+                    yield stats
+
+
+def normalise_times(
+    statistics: List[Dict[str, Any]],
+    speed_factors: Optional[Dict[str, float]] = None,
+    reference: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Normalise the times of tasks run on nodes with different speeds
+
+    The speed of the node that ran a task is taken from ``speed_factors`` (by
+    hostname), or from its ``nodeSpeed`` statistic (as recorded when the tasks
+    are scheduled with ``calibrate=True``). The times of the task are then
+    scaled to the times expected on a node with the reference speed. The
+    applied scaling factor is stored as ``speedFactor``, and the times of tasks
+    for which the speed of the node is unknown are not changed.
+
+    Args:
+        statistics (List[Dict[str, Any]]): The statistics of the tasks
+        speed_factors (Optional[Dict[str, float]]): The speed of each node (by
+            hostname), overriding the recorded speeds. Defaults to None.
+        reference (Optional[float]): The reference speed. Defaults to the median
+            speed of the nodes.
+
+    Returns:
+        List[Dict[str, Any]]: The statistics with normalised times
+    """
+    speed_factors = speed_factors or {}
+
+    def speed(stats: Dict[str, Any]) -> Optional[float]:
+        value = speed_factors.get(stats.get("hostname", None), None)
+        if value is None:
+            value = stats.get("nodeSpeed", None)
+        return None if value in [None, ""] else float(value)
+
+    if reference is None:
+        nodes = {stats.get("hostname", None): speed(stats) for stats in statistics}
+        speeds = sorted(v for v in nodes.values() if v is not None)
+        if len(speeds) == 0:
+            return statistics
+        reference = speeds[len(speeds) // 2]
+    for stats in statistics:
+        value = speed(stats)
+        if value is None:
+            continue
+        factor = value / reference
+        for key in TIME_STATISTICS:
+            if stats.get(key, None) not in [None, ""]:
+                stats[key] = float(stats[key]) * factor
+        stats["speedFactor"] = factor
+    return statistics
+
+
+def _archives(path: Path) -> Iterable[Path]:
+    # A results directory (containing archive shards), or a compacted archive
+    if path.is_file():
+        return [path]
+    return path.rglob("mzn-bench-*.sqlite")
+
+
+def _run_name(path: Path) -> str:
+    # The run of a compacted archive is named after the directory it packed
+    return path.stem if path.is_file() else path.name
 
 
 def read_csv(sols: str, stats: str):
     import pandas as pd
 
-    sols_df = pd.read_csv(sols)
-    stats_df = pd.read_csv(stats)
+    if str(sols).endswith(".sqlite"):
+        sols_df = pd.DataFrame(
+            list(collect_objectives([sols])),
+            columns=STANDARD_KEYS + ["run", "objective"],
+        )
+    else:
+        sols_df = pd.read_csv(sols)
     sols_df.data_file = sols_df.data_file.fillna("")
+    return sols_df, read_stats_csv(stats)
+
+
+def read_stats_rows(statistics: Path) -> Iterator[Dict[str, Any]]:
+    """Read collected statistics as CSV rows, or from a (compacted) archive
+
+    Rows read from an archive use the same conventions as the CSV rows: missing
+    values are empty strings.
+    """
+    if statistics.suffix == ".sqlite":
+        # Read the statistics directly from a (compacted) archive
+        for stats in collect_statistics([statistics]):
+            row = {k: "" if v is None else v for k, v in stats.items()}
+            row.setdefault("method", "")
+            yield row
+    else:
+        with statistics.open() as csvfile:
+            yield from csv.DictReader(csvfile)
+
+
+def read_stats_csv(stats: str):
+    """Read collected statistics from a CSV file, or from a (compacted) archive"""
+    import pandas as pd
+
+    if str(stats).endswith(".sqlite"):
+        stats_df = pd.DataFrame(list(collect_statistics([stats])))
+    else:
+        stats_df = pd.read_csv(stats)
     stats_df.data_file = stats_df.data_file.fillna("")
-    return sols_df, stats_df
+    return stats_df
@@ -10,6 +10,9 @@ from bokeh.palettes import Palette, Spectral5
 from bokeh.plotting import figure, gridplot
 from bokeh.transform import factor_cmap
 
+from .collect import INSTANCE_KEYS
+from .profiles import cactus, performance_profile, time_to_target
+
 
 def plot_all_instances(
     sols: pd.DataFrame, stats: pd.DataFrame, palette: Palette = Spectral5
@@ -24,20 +27,22 @@ def plot_all_instances(
     Returns:
         figure: The plotting figure
     """
+    # Group both data frames once, instead of filtering them for every instance
+    sols_by_instance = {key: df for key, df in sols.groupby(INSTANCE_KEYS, sort=False)}
+    no_sols = sols.iloc[0:0]
     return gridplot(
         [
             [
-                plot_instance(
-                    sols,
-                    stats,
-                    model,
-                    data,
+                _plot_instance(
+                    sols_by_instance.get((problem, model, data), no_sols),
+                    df_stats,
                     palette,
                 )
-                for model in stats[stats.problem.eq(problem)].model.unique()
-                for data in stats[stats.problem.eq(problem)].data_file.unique()
+                for (model, data), df_stats in df_problem.groupby(
+                    ["model", "data_file"], sort=False
+                )
             ]
-            for problem in stats.problem.unique()
+            for problem, df_problem in stats.groupby("problem", sort=False)
         ]
     )
 
@@ -71,7 +76,12 @@ def plot_instance(
     if df_stats.data_file.nunique() != 1:
         print(stats[stats.model.eq(model)])
         raise ValueError("Could not determine unique instance for plotting.")
+    return _plot_instance(df_sols, df_stats, palette)
 
+
+def _plot_instance(
+    df_sols: pd.DataFrame, df_stats: pd.DataFrame, palette: Palette
+) -> figure:
     instance = "{} ({})".format(
         df_stats.problem.iloc[0],
         df_stats.model.iloc[0]
@@ -140,19 +150,22 @@ def plot_instance(
         ]
 
         p = figure(title="Objective value for {}".format(instance))
+        run_stats = df_stats.groupby(["configuration", "run"]).first()
+        y_pos = df_sols.objective.median()
+        if math.isnan(y_pos):
+            y_pos = 0
         colors = cycle(palette)
         for configuration in df_stats.configuration.unique():
             color = next(colors)
             dashes = cycle([[], [6], [2, 4], [2, 4, 6, 4], [6, 4, 2, 4]])
             for run, line_dash in zip(df_stats.run.unique(), dashes):
+                if (configuration, run) not in run_stats.index:
+                    continue
                 view = CDSView(
-                    source=source,
-                    filters=[
-                        GroupFilter(column_name="configuration", group=configuration),
-                        GroupFilter(column_name="run", group=run),
-                    ],
+                    filter=GroupFilter(column_name="configuration", group=configuration)
+                    & GroupFilter(column_name="run", group=run)
                 )
-                glyph = p.circle(
+                glyph = p.scatter(
                     x="time",
                     y="objective",
                     color=color,
@@ -172,13 +185,8 @@ def plot_instance(
                     view=view,
                 )
 
-                # Add markers for flatTime and time stats
-                y_pos = df_sols.objective.median()
-                if math.isnan(y_pos):
-                    y_pos = 0
-                stats = df_stats[
-                    df_stats.configuration.eq(configuration) & df_stats.run.eq(run)
-                ].iloc[0]
+                # Add lines for flatTime and time stats
+                stats = run_stats.loc[(configuration, run)]
                 start = Span(
                     location=stats.flatTime,
                     dimension="height",
@@ -195,36 +203,37 @@ def plot_instance(
                     line_dash=line_dash,
                 )
                 p.add_layout(end)
-                glyph = p.circle([stats.flatTime], [y_pos], fill_alpha=0, line_alpha=0)
-                p.add_tools(
-                    HoverTool(
-                        renderers=[glyph],
-                        tooltips=[
-                            ("configuration", configuration),
-                            ("run", run),
-                            ("flatTime", str(stats.flatTime)),
-                        ],
-                        mode="vline",
-                        point_policy="follow_mouse",
-                    )
-                )
-                glyph = p.circle([stats.time], [y_pos], fill_alpha=0, line_alpha=0)
-                end_tooltips = [
-                    ("configuration", configuration),
-                    ("run", run),
-                    ("time", str(stats.time)),
-                    ("status", str(stats.status)),
-                ]
-                if stats.status in ["SATISFIED", "OPTIMAL_SOLUTION"]:
-                    end_tooltips.append(["objective", str(stats.objective)])
-                p.add_tools(
-                    HoverTool(
-                        renderers=[glyph],
-                        tooltips=end_tooltips,
-                        mode="vline",
-                        point_policy="follow_mouse",
-                    )
+
+        # Add hover markers for the flatTime and time stats of all runs at once
+        markers = run_stats.reset_index()
+        markers["y"] = y_pos
+        markers["result"] = markers.objective.where(
+            markers.status.isin(["SATISFIED", "OPTIMAL_SOLUTION"]), ""
+        ).astype(str)
+        marker_source = ColumnDataSource(
+            markers[
+                ["configuration", "run", "flatTime", "time", "status", "result", "y"]
+            ]
+        )
+        for x, marker_tooltips in [
+            ("flatTime", [("flatTime", "@flatTime")]),
+            (
+                "time",
+                [("time", "@time"), ("status", "@status"), ("objective", "@result")],
+            ),
+        ]:
+            glyph = p.scatter(
+                x=x, y="y", fill_alpha=0, line_alpha=0, source=marker_source
+            )
+            p.add_tools(
+                HoverTool(
+                    renderers=[glyph],
+                    tooltips=[("configuration", "@configuration"), ("run", "@run")]
+                    + marker_tooltips,
+                    mode="vline",
+                    point_policy="follow_mouse",
                 )
+            )
         p.x_range.start = 0
         p.x_range.end = df_stats.time.max()
         p.xaxis.axis_label = "Time (s)"
@@ -284,3 +293,111 @@ def plot_total_time(stats: pd.DataFrame, palette: Palette = Spectral5) -> figure
     p.xaxis.axis_label = "Time (s)"
     p.yaxis.axis_label = "Configuration"
     return p
+
+
+def plot_performance_profile(
+    stats: pd.DataFrame, palette: Palette = Spectral5
+) -> figure:
+    """Plots the Dolan-Moré performance profiles of all configurations (and runs)
+
+    Args:
+        stats (pd.DataFrame): Data frame containing the statistics output
+        palette (Palette, optional): Colour palette. Defaults to Spectral5.
+
+    Returns:
+        figure: The plotting figure
+    """
+    profile = performance_profile(stats)
+    p = figure(
+        title="Performance profile",
+        x_axis_type="log",
+        tooltips=[("tau", "@tau"), ("fraction", "@fraction")],
+    )
+    for solver, color in zip(profile.columns, cycle(palette)):
+        source = ColumnDataSource(
+            {"tau": profile.index.to_numpy(), "fraction": profile[solver].to_numpy()}
+        )
+        p.step(
+            x="tau",
+            y="fraction",
+            mode="after",
+            color=color,
+            legend_label=solver,
+            source=source,
+        )
+    p.y_range.start = 0
+    p.xaxis.axis_label = "Performance ratio (tau)"
+    p.yaxis.axis_label = "Fraction of instances"
+    p.legend.location = "bottom_right"
+    p.legend.click_policy = "hide"
+    return p
+
+
+def plot_cactus(stats: pd.DataFrame, palette: Palette = Spectral5) -> figure:
+    """Plots the number of instances solved by each configuration (and run)
+        against the time required to solve them
+
+    Args:
+        stats (pd.DataFrame): Data frame containing the statistics output
+        palette (Palette, optional): Colour palette. Defaults to Spectral5.
+
+    Returns:
+        figure: The plotting figure
+    """
+    df = cactus(stats)
+    p = figure(
+        title="Solved instances",
+        tooltips=[("solver", "@solver"), ("solved", "@solved"), ("time", "@time")],
+    )
+    for (solver, df_solver), color in zip(df.groupby("solver"), cycle(palette)):
+        source = ColumnDataSource(df_solver)
+        p.line(x="solved", y="time", color=color, legend_label=solver, source=source)
+        p.scatter(x="solved", y="time", color=color, legend_label=solver, source=source)
+    p.xaxis.axis_label = "Solved instances"
+    p.yaxis.axis_label = "Time (s)"
+    p.legend.location = "top_left"
+    p.legend.click_policy = "hide"
+    return p
+
+
+def plot_time_to_target(
+    sols: pd.DataFrame,
+    stats: pd.DataFrame,
+    gap: float = 0.0,
+    palette: Palette = Spectral5,
+) -> figure:
+    """Plots the empirical cumulative distribution of the time each
+        configuration (and run) requires to reach the best known objective
+        value of the optimisation instances
+
+    Args:
+        sols (pd.DataFrame): The solution data frame
+        stats (pd.DataFrame): Data frame containing the statistics output
+        gap (float, optional): The relative gap to the best objective value that
+            is accepted. Defaults to 0.0.
+        palette (Palette, optional): Colour palette. Defaults to Spectral5.
+
+    Returns:
+        figure: The plotting figure
+    """
+    df = time_to_target(sols, stats, gap)
+    p = figure(
+        title="Time to target" + (f" (gap {gap:.1%})" if gap > 0 else ""),
+        tooltips=[("solver", "@solver"), ("time", "@time"), ("fraction", "@fraction")],
+    )
+    for (solver, df_solver), color in zip(df.groupby("solver"), cycle(palette)):
+        p.step(
+            x="time",
+            y="fraction",
+            mode="after",
+            color=color,
+            legend_label=solver,
+            source=ColumnDataSource(df_solver),
+        )
+    p.x_range.start = 0
+    p.y_range.start = 0
+    p.xaxis.axis_label = "Time (s)"
+    p.yaxis.axis_label = "Fraction of instances"
+    p.legend.location = "bottom_right"
+    p.legend.click_policy = "hide"
+    return p
@@ -0,0 +1,171 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .collect import INSTANCE_KEYS
+
+# Statuses that count as solving an instance (together with SATISFIED for
+# satisfaction problems)
+SOLVED_STATUSES = ["OPTIMAL_SOLUTION", "UNSATISFIABLE", "ALL_SOLUTIONS"]
+
+
+def solver_labels(df: pd.DataFrame) -> pd.Series:
+    """Label each row by its configuration, including the run if multiple runs
+    are present.
+
+    Args:
+        df (pd.DataFrame): A statistics or objectives data frame
+
+    Returns:
+        pd.Series: The solver label of each row
+    """
+    if df.run.nunique() > 1:
+        return df.configuration + " (" + df.run.astype(str) + ")"
+    return df.configuration
+
+
+def solve_times(stats: pd.DataFrame) -> pd.DataFrame:
+    """Tabulate the time each solver took to solve each instance
+
+    Args:
+        stats (pd.DataFrame): The statistics data frame
+
+    Returns:
+        pd.DataFrame: The solve times with an instance per row and a solver per
+            column. Instances that were not solved (including tasks that did not
+            finish) have an infinite solve time.
+    """
+    solved = stats.status.isin(SOLVED_STATUSES) | (
+        stats.status.eq("SATISFIED") & stats.method.eq("satisfy")
+    )
+    if "partial" in stats.columns:
+        solved &= ~stats.partial.astype(str).eq("True")
+    df = stats.assign(
+        solver=solver_labels(stats), solve_time=stats.time.where(solved, np.inf)
+    )
+    return df.pivot_table(
+        index=INSTANCE_KEYS, columns="solver", values="solve_time", aggfunc="min"
+    ).fillna(np.inf)
+
+
+def performance_profile(
+    stats: pd.DataFrame, taus: Optional[np.ndarray] = None
+) -> pd.DataFrame:
+    """Compute the Dolan-Moré performance profiles of the solvers
+
+    The performance ratio of a solver on an instance is its solve time divided
+    by the best solve time of any solver on that instance. The profile of a
+    solver gives, for each ratio tau, the fraction of instances on which its
+    performance ratio is at most tau. Instances not solved by any solver are
+    ignored.
+
+    Args:
+        stats (pd.DataFrame): The statistics data frame
+        taus (Optional[np.ndarray], optional): The ratios at which to evaluate
+            the profiles. Defaults to all ratios that occur.
+
+    Returns:
+        pd.DataFrame: The profiles, indexed by tau, with a solver per column
+    """
+    times = solve_times(stats)
+    values = times.to_numpy()
+    best = values.min(axis=1)
+    values = values[np.isfinite(best)]
+    best = best[np.isfinite(best)]
+    ratios = np.sort(values / np.maximum(best, np.finfo(float).tiny)[:, None], axis=0)
+    if taus is None:
+        taus = np.unique(np.append(ratios[np.isfinite(ratios)], 1.0))
+    profile = np.column_stack(
+        [
+            np.searchsorted(ratios[:, j], taus, side="right")
+            for j in range(ratios.shape[1])
+        ]
+    ) / max(len(ratios), 1)
+    return pd.DataFrame(
+        profile, index=pd.Index(taus, name="tau"), columns=times.columns
+    )
+
+
+def cactus(stats: pd.DataFrame) -> pd.DataFrame:
+    """Compute the data for a cactus plot of the solvers
+
+    For each solver, the solve times of the solved instances are sorted, such
+    that the n-th entry gives the time needed to solve n instances (each within
+    that time).
+
+    Args:
+        stats (pd.DataFrame): The statistics data frame
+
+    Returns:
+        pd.DataFrame: A data frame with the solver, the number of solved
+            instances, and the time
+    """
+    times = solve_times(stats)
+    frames = []
+    for solver in times.columns:
+        values = np.sort(times[solver].to_numpy())
+        values = values[np.isfinite(values)]
+        frames.append(
+            pd.DataFrame(
+                {
+                    "solver": solver,
+                    "solved": np.arange(1, len(values) + 1),
+                    "time": values,
+                }
+            )
+        )
+    if len(frames) == 0:
+        return pd.DataFrame(columns=["solver", "solved", "time"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def time_to_target(
+    sols: pd.DataFrame, stats: pd.DataFrame, gap: float = 0.0
+) -> pd.DataFrame:
+    """Compute the empirical cumulative distribution of the time to target
+
+    The target of an optimisation instance is the best objective value found
+    by any solver, relaxed by the relative gap. The time to target of a solver
+    is the time of its first solution that reaches the target.
+
+    Args:
+        sols (pd.DataFrame): The objectives data frame
+        stats (pd.DataFrame): The statistics data frame
+        gap (float, optional): The relative gap to the best objective value that
+            is accepted. Defaults to 0.0.
+
+    Returns:
+        pd.DataFrame: A data frame with the solver, the time, and the fraction
+            of optimisation instances for which the target has been reached
+    """
+    method = stats.drop_duplicates(INSTANCE_KEYS).set_index(INSTANCE_KEYS).method
+    sols = sols[sols.objective.notna()]
+    sign = (
+        pd.MultiIndex.from_frame(sols[INSTANCE_KEYS])
+        .map(method)
+        .map({"minimize": 1, "maximize": -1})
+        .to_numpy(dtype=float, na_value=np.nan)
+    )
+    sols = sols.assign(solver=solver_labels(sols), score=sols.objective * sign)
+    sols = sols[sols.score.notna()]
+    best = sols.groupby(INSTANCE_KEYS).score.transform("min")
+    reached = sols[sols.score <= best + gap * best.abs()]
+    ttt = reached.groupby(["solver"] + INSTANCE_KEYS).time.min()
+
+    n_instances = max(len(sols.groupby(INSTANCE_KEYS)), 1)
+    frames = []
+    for solver in sols.solver.unique():
+        values = np.sort(ttt[solver].to_numpy()) if solver in ttt else np.empty(0)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "solver": solver,
+                    "time": values,
+                    "fraction": np.arange(1, len(values) + 1) / n_instances,
+                }
+            )
+        )
+    if len(frames) == 0:
+        return pd.DataFrame(columns=["solver", "time", "fraction"])
+    return pd.concat(frames, ignore_index=True)
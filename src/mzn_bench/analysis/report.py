@@ -0,0 +1,203 @@
+import hashlib
+import html
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+from bokeh.embed import json_item
+from bokeh.palettes import Spectral5
+from bokeh.resources import CDN
+from tabulate import tabulate
+
+from .collect import INSTANCE_KEYS, compact_objectives, read_csv
+from .plot import _plot_instance
+from .report_status import report_status
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+{resources}
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+th, td {{ border: 1px solid #ccc; padding: 0.2em 0.6em; text-align: right; }}
+.plot {{ min-height: 620px; margin-bottom: 1em; }}
+nav a {{ margin-right: 1em; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+# Only embed the plots once they (almost) scroll into view
+LAZY_EMBED = """<script>
+const observer = new IntersectionObserver((entries) => {
+  for (const entry of entries) {
+    if (entry.isIntersecting) {
+      observer.unobserve(entry.target);
+      const item = document.getElementById(entry.target.id + "-data");
+      Bokeh.embed.embed_item(JSON.parse(item.textContent), entry.target.id);
+    }
+  }
+}, { rootMargin: "600px" });
+document.querySelectorAll(".plot").forEach((div) => observer.observe(div));
+</script>
+"""
+
+
+def write_report(
+    objectives: Path,
+    statistics: Path,
+    out_dir: Path,
+    page_size: int = 20,
+    resolution: Optional[float] = None,
+):
+    """Write a static HTML report for a benchmark run
+
+    The report consists of an index page, containing summary tables and links
+    to the pages of each problem, and the (paginated) problem pages containing
+    the plots for each instance. Objective data is reduced to the improving
+    solutions, and optionally resampled, before plotting.
+
+    Args:
+        objectives (Path): The objectives CSV file, or a (compacted) archive
+        statistics (Path): The statistics CSV file, or a (compacted) archive
+        out_dir (Path): The directory in which the report is written
+        page_size (int, optional): Number of instance plots per page. Defaults to 20.
+        resolution (Optional[float], optional): Width (in seconds) of the time
+            buckets used to resample objective data. Defaults to None.
+    """
+    sols, stats = read_csv(objectives, statistics)
+    sols = compact_objectives(sols, resolution, stats)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "problems").mkdir(exist_ok=True)
+
+    links = []
+    slugs = _slugs(stats.problem.unique())
+    for problem, df_problem in stats.groupby("problem", sort=True):
+        pages = _write_problem(
+            out_dir / "problems", problem, slugs[problem], df_problem, sols, page_size
+        )
+        links.append(
+            "<li>{} ({} instances): {}</li>".format(
+                html.escape(problem),
+                len(df_problem.groupby(["model", "data_file"])),
+                " ".join(
+                    '<a href="problems/{}">{}</a>'.format(page, i + 1)
+                    for i, page in enumerate(pages)
+                ),
+            )
+        )
+
+    body = [
+        "<h2>Status</h2>",
+        report_status(
+            ["configuration"],
+            stats.fillna("").to_dict("records"),
+            "time",
+            "html",
+        ),
+        "<h2>Totals</h2>",
+        _totals(stats),
+        "<h2>Problems</h2>",
+        "<ul>{}</ul>".format("\n".join(links)),
+    ]
+    (out_dir / "index.html").write_text(
+        PAGE.format(title="Benchmark report", resources="", body="\n".join(body))
+    )
+
+
+def _slugs(problems: Iterable[str]) -> Dict[str, str]:
+    """Unique file names for the pages of the problems
+
+    Problems whose names only differ in characters that cannot be used in file
+    names get a short hash of their name added.
+    """
+    slugs: Dict[str, str] = {}
+    used = set()
+    for problem in sorted(problems):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", problem)
+        if slug in used:
+            slug += "-" + hashlib.sha1(problem.encode()).hexdigest()[:8]
+        used.add(slug)
+        slugs[problem] = slug
+    return slugs
+
+
+def _write_problem(
+    out_dir: Path,
+    problem: str,
+    slug: str,
+    df_problem: pd.DataFrame,
+    sols: pd.DataFrame,
+    page_size: int,
+) -> List[str]:
+    sols = sols[sols.problem.eq(problem)]
+    sols_by_instance = {key: df for key, df in sols.groupby(INSTANCE_KEYS, sort=False)}
+    no_sols = sols.iloc[0:0]
+    instances = list(df_problem.groupby(["model", "data_file"], sort=True))
+    pages = [
+        f"{slug}-{i + 1}.html" for i in range(max(1, -(-len(instances) // page_size)))
+    ]
+
+    for i, page in enumerate(pages):
+        body = ['<nav><a href="../index.html">Index</a>']
+        if i > 0:
+            body.append(f'<a href="{pages[i - 1]}">Previous</a>')
+        body.append(f"Page {i + 1} of {len(pages)}")
+        if i + 1 < len(pages):
+            body.append(f'<a href="{pages[i + 1]}">Next</a>')
+        body.append("</nav>")
+        nav = "\n".join(body)
+
+        for j, ((model, data), df_stats) in enumerate(
+            instances[i * page_size : (i + 1) * page_size]
+        ):
+            fig = _plot_instance(
+                sols_by_instance.get((problem, model, data), no_sols),
+                df_stats,
+                Spectral5,
+            )
+            item = json.dumps(json_item(fig)).replace("</", "<\\/")
+            body.append(f'<div class="plot" id="plot-{j}"></div>')
+            body.append(
+                f'<script type="application/json" id="plot-{j}-data">{item}</script>'
+            )
+        body.append(nav)
+        body.append(LAZY_EMBED)
+        (out_dir / page).write_text(
+            PAGE.format(
+                title=html.escape(f"{problem} ({i + 1}/{len(pages)})"),
+                resources=CDN.render_js(),
+                body="\n".join(body),
+            )
+        )
+    return pages
+
+
+def _totals(stats: pd.DataFrame) -> str:
+    solved = stats.status.isin(["OPTIMAL_SOLUTION", "UNSATISFIABLE"]) | (
+        stats.status.eq("SATISFIED") & stats.method.eq("satisfy")
+    )
+    totals = (
+        stats.assign(solved=solved)
+        .groupby(["configuration", "run"])
+        .agg(
+            instances=("status", "size"), solved=("solved", "sum"), time=("time", "sum")
+        )
+        .reset_index()
+    )
+    return tabulate(
+        totals.values.tolist(),
+        headers=["configuration", "run", "instances", "solved", "total time (s)"],
+        tablefmt="html",
+        floatfmt=".2f",
+    )
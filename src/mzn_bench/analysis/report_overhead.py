@@ -0,0 +1,57 @@
+import csv
+from pathlib import Path
+from typing import Iterable
+
+from tabulate import tabulate
+
+PHASES = ["Setup", "Flatten", "Solve", "Serialise", "Teardown"]
+
+
+def report_overhead(
+    keys: Iterable[str], statistics: Path, threshold: float, tablefmt: str
+):
+    keys = list(keys)
+    table = {}
+    with statistics.open() as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            if row.get("overheadTime", "") == "":
+                continue  # Statistics were produced by an older version
+            key = tuple(row[key] for key in keys)
+            entry = table.setdefault(
+                key, {"n": 0, "time": 0.0, "overhead": 0.0, "skewed": 0, "phases": {}}
+            )
+            time = float(row["time"])
+            # The overhead is part of the time of the task
+            overhead = min(float(row["overheadTime"]), time)
+            entry["n"] += 1
+            entry["time"] += time
+            entry["overhead"] += overhead
+            if time > 0 and overhead / time > threshold:
+                entry["skewed"] += 1
+            for p in PHASES:
+                value = row.get(f"phase{p}Time", "")
+                entry["phases"][p] = entry["phases"].get(p, 0.0) + float(
+                    0 if value == "" else value
+                )
+
+    output = []
+    for key in sorted(table):
+        entry = table[key]
+        line = list(key)
+        line.append(entry["n"])
+        line.extend(f"{entry['phases'][p] / entry['n']:.3f}" for p in PHASES)
+        line.append(f"{entry['overhead'] / entry['n']:.3f}")
+        share = entry["overhead"] / entry["time"] if entry["time"] > 0 else 0
+        line.append(f"{share:.1%}")
+        line.append(entry["skewed"])
+        output.append(line)
+
+    return tabulate(
+        output,
+        headers=keys
+        + ["tasks"]
+        + [f"avg. {p.lower()} (s)" for p in PHASES]
+        + ["avg. overhead (s)", "overhead share", f"overhead > {threshold:.0%}"],
+        tablefmt=tablefmt,
+    )
@@ -1,10 +1,11 @@
-import csv
 from pathlib import Path
 
-from typing import Iterable
+from typing import Any, Dict, Iterable, Union
 from tabulate import tabulate
 from minizinc.result import Status
 
+from .collect import read_stats_rows
+
 
 # TODO: Maybe this should be included in MiniZinc Python
 def status_from_str(s: str) -> Status:
@@ -14,44 +15,65 @@ def status_from_str(s: str) -> Status:
 
 
 def report_status(
-    keys: Iterable[str], statistics: Path, avg: str, tablefmt: str
+    keys: Iterable[str],
+    statistics: Union[Path, Iterable[Dict[str, Any]]],
+    avg: str,
+    tablefmt: str,
+    resources: bool = False,
 ):
+    keys = list(keys)
     seen_status = set()
     table = {}
-    with statistics.open() as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            key = [ row[key] for key in keys ]
-
-            status = status_from_str(row["status"])
-            seen_status.add(status)
-
-            key = tuple(key)
-            if key not in table:
-                table[key] = dict()
-
-            avg_value = row.get(avg, 0)
-            time = float(0 if avg_value == "" else avg_value)
-            if avg and status in [Status.OPTIMAL_SOLUTION, Status.UNSATISFIABLE]:
-                if status not in table[key]:
-                    table[key][status] = [time]
-                else:
-                    table[key][status].append(time)
-            elif status == Status.SATISFIED:
-                if avg:
-                    entry = table[key].get(status, (0, []))
-                    if row["method"] == "satisfy":
-                        entry[1].append(time)
-                    table[key][status] = (entry[0] + 1, entry[1])
-                else:
-                    entry = table[key].get(status, (0, 0))
-                    table[key][status] = (
-                        entry[0] + 1,
-                        entry[1] + int(row["method"] == "satisfy"),
-                    )
+    usage = {}
+    partial = {}
+    # The statistics file (CSV or archive), or its rows
+    rows = read_stats_rows(statistics) if isinstance(statistics, Path) else statistics
+    for row in rows:
+        key = [ row[key] for key in keys ]
+
+        status = status_from_str(row["status"])
+
+        key = tuple(key)
+        if key not in table:
+            table[key] = dict()
+            usage[key] = ([], [], [])
+            partial[key] = 0
+
+        if str(row.get("partial", "")) == "True":
+            # The task was killed, and reports its last checkpoint, which
+            # is only counted as partial
+            partial[key] += 1
+            continue
+        seen_status.add(status)
+
+        if resources and row.get("peakRSS", "") != "":
+            cpu_time, peak_rss, harness_time = usage[key]
+            cpu_time.append(float(row["userTime"]) + float(row["systemTime"]))
+            peak_rss.append(float(row["peakRSS"]))
+            harness_time.append(float(row["harnessCPUTime"]))
+
+        avg_value = row.get(avg, 0)
+        time = float(0 if avg_value == "" else avg_value)
+        if avg and status in [Status.OPTIMAL_SOLUTION, Status.UNSATISFIABLE]:
+            if status not in table[key]:
+                table[key][status] = [time]
+            else:
+                table[key][status].append(time)
+        elif status == Status.SATISFIED:
+            if avg:
+                entry = table[key].get(status, (0, []))
+                if row["method"] == "satisfy":
+                    entry[1].append(time)
+                table[key][status] = (entry[0] + 1, entry[1])
             else:
-                entry = table[key].get(status, 0)
-                table[key][status] = entry + 1
+                entry = table[key].get(status, (0, 0))
+                table[key][status] = (
+                    entry[0] + 1,
+                    entry[1] + int(row["method"] == "satisfy"),
+                )
+        else:
+            entry = table[key].get(status, 0)
+            table[key][status] = entry + 1
 
     status_order = [
         Status.OPTIMAL_SOLUTION,
@@ -86,10 +108,31 @@ def report_status(
                     o = row[s]
                 line.append(o)
 
+        if any(partial.values()):
+            line.append(partial[key])
+
+        if resources:
+            cpu_time, peak_rss, harness_time = usage[key]
+            if len(cpu_time) > 0:
+                line.extend(
+                    [
+                        f"{sum(cpu_time) / len(cpu_time):.2f}",
+                        f"{max(peak_rss):.1f}",
+                        f"{sum(harness_time) / len(harness_time):.2f}",
+                    ]
+                )
+            else:
+                line.extend(["", "", ""])
+
         output.append(line)
 
+    headers = keys + [s for s in status_order if s in seen_status]
+    if any(partial.values()):
+        headers.append("(partial)")
+    if resources:
+        headers += ["avg. CPU time (s)", "max. peak RSS (MiB)", "avg. harness CPU (s)"]
     return tabulate(
         output,
-        headers=(keys + [s for s in status_order if s in seen_status]),
+        headers=headers,
         tablefmt=tablefmt,
     )
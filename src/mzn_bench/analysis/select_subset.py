@@ -0,0 +1,266 @@
+import csv
+import math
+import os
+import random
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+from .collect import INSTANCE_KEYS
+from .profiles import solve_times
+
+
+def instance_features(instances: pd.DataFrame, stats: pd.DataFrame) -> pd.DataFrame:
+    """Compute the features used to stratify the instances
+
+    The features of an instance are derived from the historical statistics:
+    the fraction of solvers that solved it, and its difficulty (the median
+    solve time of the solvers that solved it). The size (in bytes) of its model
+    and data files is used as a cheap difficulty feature for instances without
+    historical statistics.
+
+    Args:
+        instances (pd.DataFrame): The instances, as read from an instances file
+        stats (pd.DataFrame): The historical statistics data frame
+
+    Returns:
+        pd.DataFrame: The instances with the added columns ``solved``,
+            ``difficulty``, and ``size``
+    """
+    times = solve_times(stats)
+    solved = np.isfinite(times)
+    history = pd.DataFrame(
+        {
+            "solved": solved.mean(axis=1),
+            "difficulty": times.where(solved).median(axis=1),
+        }
+    ).reset_index()
+    features = instances.merge(history, on=INSTANCE_KEYS, how="left")
+    features["size"] = features.file_size if "file_size" in features else 0
+    return features
+
+
+def strata(features: pd.DataFrame, bins: int = 3) -> pd.Series:
+    """Assign every instance to a stratum
+
+    Instances are stratified by problem, by whether they were solved by all,
+    some, or none of the solvers, and by difficulty. Solved instances are split
+    into ``bins`` difficulty bins (by quantile of their difficulty), and
+    instances without historical statistics are split by the size of their
+    files instead.
+
+    Args:
+        features (pd.DataFrame): The instance features (see
+            ``instance_features``)
+        bins (int): The number of difficulty bins
+
+    Returns:
+        pd.Series: The stratum label of each instance
+    """
+    status = pd.Series("some", index=features.index)
+    status[features.solved.eq(1)] = "all"
+    status[features.solved.eq(0)] = "none"
+    status[features.solved.isna()] = "new"
+
+    level = pd.Series("", index=features.index)
+    for mask, column in [
+        (features.solved.gt(0), "difficulty"),
+        (features.solved.isna(), "size"),
+    ]:
+        values = features[column][mask]
+        if values.nunique() > 1:
+            quantiles = pd.qcut(
+                values.rank(method="first"), min(bins, len(values)), labels=False
+            )
+            level[mask] = quantiles.astype(str)
+    return features.problem + "|" + status + "|" + level
+
+
+def select_subset(
+    features: pd.DataFrame, size: int, bins: int = 3, seed: int = 0
+) -> pd.DataFrame:
+    """Select a representative subset of the instances by stratified sampling
+
+    At least one instance of every problem is selected (from its largest
+    stratum), so the subset contains more than ``size`` instances when there
+    are more problems. The remaining instances are allocated to the strata in
+    proportion to their size (using the largest remainders), and are sampled
+    at random within each stratum.
+
+    Args:
+        features (pd.DataFrame): The instance features (see
+            ``instance_features``)
+        size (int): The number of instances to select
+        bins (int): The number of difficulty bins
+        seed (int): The seed used to sample the instances
+
+    Returns:
+        pd.DataFrame: The selected instances (in their original order)
+    """
+    labels = strata(features, bins)
+    counts = labels.value_counts(sort=False)
+    allocation: Dict[str, int] = {label: 0 for label in counts.index}
+    for problem, group in labels.groupby(features.problem):
+        largest = group.value_counts().sort_index().idxmax()
+        allocation[largest] += 1
+
+    remaining = max(0, min(size, len(features)) - sum(allocation.values()))
+    available = {label: counts[label] - allocation[label] for label in counts.index}
+    total = sum(available.values())
+    if remaining > 0 and total > 0:
+        quotas = {label: remaining * n / total for label, n in available.items()}
+        for label, quota in quotas.items():
+            allocation[label] += math.floor(quota)
+        by_remainder = sorted(
+            quotas, key=lambda label: (math.floor(quotas[label]) - quotas[label], label)
+        )
+        for label in by_remainder[: remaining - sum(map(math.floor, quotas.values()))]:
+            allocation[label] += 1
+
+    rng = random.Random(seed)
+    selected: List[int] = []
+    for label, n in sorted(allocation.items()):
+        members = sorted(labels.index[labels == label])
+        selected.extend(rng.sample(members, min(n, len(members))))
+    return features.loc[sorted(selected)]
+
+
+def _solver_summary(times: pd.DataFrame) -> pd.DataFrame:
+    solved = np.isfinite(times)
+    summary = pd.DataFrame(
+        {
+            "solved": solved.mean(),
+            "time": times.where(solved).mean().fillna(np.inf),
+        }
+    )
+    # Rank by the fraction of solved instances, and then by average solve time
+    order = summary.sort_values(["solved", "time"], ascending=[False, True]).index
+    summary["rank"] = pd.Series(range(1, len(order) + 1), index=order)
+    return summary
+
+
+def _kendall_tau(a: pd.Series, b: pd.Series) -> Tuple[float, float]:
+    # Kendall's tau, and the fraction of pairs that is ordered the same way
+    pairs = [(i, j) for i in range(len(a)) for j in range(i + 1, len(a))]
+    if len(pairs) == 0:
+        return 1.0, 1.0
+    sign = [
+        np.sign(a.iloc[i] - a.iloc[j]) * np.sign(b.iloc[i] - b.iloc[j])
+        for i, j in pairs
+    ]
+    return sum(sign) / len(pairs), sum(s > 0 for s in sign) / len(pairs)
+
+
+def reproduction_report(
+    stats: pd.DataFrame, subset: pd.DataFrame, tablefmt: str = "pretty"
+) -> str:
+    """Report how well the conclusions on all instances are reproduced
+
+    The solvers are ranked by the fraction of instances they solved, and then
+    by their average solve time, on all instances and on the subset. The report
+    compares these rankings, and the distribution of the instances over
+    problems and solved statuses.
+
+    Args:
+        stats (pd.DataFrame): The historical statistics data frame
+        subset (pd.DataFrame): The selected instances
+        tablefmt (str): The table format used in the output
+
+    Returns:
+        str: The report
+    """
+    times = solve_times(stats)
+    keys = pd.MultiIndex.from_frame(subset[INSTANCE_KEYS])
+    full = _solver_summary(times)
+    part = _solver_summary(times[times.index.isin(keys)])
+    table = [
+        [
+            solver,
+            f"{full.solved[solver]:.1%}",
+            f"{part.solved[solver]:.1%}",
+            full["rank"][solver],
+            part["rank"][solver],
+        ]
+        for solver in full.sort_values("rank").index
+    ]
+    tau, agreement = _kendall_tau(full["rank"], part["rank"][full.index])
+
+    solved = np.isfinite(times).mean(axis=1)
+    classes = pd.cut(solved, [-1, 0, 0.999999, 1], labels=["none", "some", "all"])
+    distribution = [
+        [
+            label,
+            f"{(classes == label).mean():.1%}",
+            f"{(classes[times.index.isin(keys)] == label).mean():.1%}",
+        ]
+        for label in ["all", "some", "none"]
+    ]
+    problems = stats.problem.nunique()
+    covered = subset.problem[subset.problem.isin(stats.problem)].nunique()
+
+    return "\n\n".join(
+        [
+            tabulate(
+                table,
+                headers=[
+                    "solver",
+                    "solved (all)",
+                    "solved (subset)",
+                    "rank (all)",
+                    "rank (subset)",
+                ],
+                tablefmt=tablefmt,
+            ),
+            tabulate(
+                distribution,
+                headers=["solved by", "instances (all)", "instances (subset)"],
+                tablefmt=tablefmt,
+            ),
+            f"Selected {len(subset)} instances, covering {covered} of {problems} "
+            f"problems.\nKendall's tau of the solver ranking: {tau:.3f} "
+            f"({agreement:.1%} of the solver pairs are ordered the same).",
+        ]
+    )
+
+
+def read_instances(instances: Path) -> pd.DataFrame:
+    """Read an instances file, including the size of the instance files"""
+    rows = []
+    with instances.open() as file:
+        for row in csv.DictReader(file, dialect="unix"):
+            size = 0
+            for name in [row["model"]] + row["data_file"].split(":"):
+                path = instances.parent / name
+                if name != "" and path.is_file():
+                    size += path.stat().st_size
+            rows.append(dict(row, file_size=size))
+    return pd.DataFrame(rows, columns=INSTANCE_KEYS + ["file_size"])
+
+
+def write_instances(instances: Path, subset: pd.DataFrame, out_file: Path):
+    """Write the selected instances to a new instances file
+
+    Relative paths are rewritten to be relative to the new instances file.
+    """
+
+    def relocate(name: str) -> str:
+        if name == "" or os.path.isabs(name):
+            return name
+        return os.path.relpath(
+            instances.parent.resolve() / name, out_file.parent.resolve()
+        )
+
+    with out_file.open("w") as file:
+        writer = csv.writer(file, dialect="unix")
+        writer.writerow(INSTANCE_KEYS)
+        for row in subset.itertuples():
+            writer.writerow(
+                [
+                    row.problem,
+                    relocate(row.model),
+                    ":".join(relocate(name) for name in row.data_file.split(":")),
+                ]
+            )
@@ -0,0 +1,360 @@
+import io
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from mzn_bench.results import (
+    SolutionStore,
+    SolutionWriter,
+    objectives_path,
+    open_results,
+    restore_assignments,
+    result_files,
+    strip_compression,
+    yaml,
+)
+
+# Name pattern of the archive shards in a results directory
+ARCHIVE_GLOB = "mzn-bench-*.sqlite"
+
+# Columns of the tasks table that are also stored in the statistics
+TASK_KEYS = ["configuration", "problem", "model", "data_file", "status", "time"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    name TEXT PRIMARY KEY,
+    configuration TEXT,
+    problem TEXT,
+    model TEXT,
+    data_file TEXT,
+    status TEXT,
+    time REAL,
+    statistics TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_instance
+    ON tasks (problem, model, data_file, configuration);
+CREATE TABLE IF NOT EXISTS solutions (
+    task TEXT,
+    number INTEGER,
+    configuration TEXT,
+    problem TEXT,
+    model TEXT,
+    data_file TEXT,
+    status TEXT,
+    time REAL,
+    has_solution INTEGER,
+    objective,
+    entry TEXT,
+    PRIMARY KEY (task, number)
+);
+"""
+
+
+def archive_path(output_dir: Path, job: Union[int, str]) -> Path:
+    """The archive shard written by a (SLURM array) job"""
+    return output_dir / f"mzn-bench-{job}.sqlite"
+
+
+def archives(path: Path) -> Iterator[Path]:
+    """The archive shards within a results directory"""
+    return path.rglob(ARCHIVE_GLOB)
+
+
+class Archive:
+    """An archive shard that stores the results of the tasks of one job.
+
+    Instead of writing a solutions, statistics and (possibly) error file for
+    every task, all results of a job are stored in a single SQLite database.
+    The statistics of every task are stored in the ``tasks`` table, and every
+    entry of its solutions file is stored in the ``solutions`` table, together
+    with its time, status and objective value. Both tables are indexed by task,
+    and the tasks table is also indexed by instance.
+
+    Changes are committed when a task finishes, and at most every
+    ``commit_interval`` seconds while solutions are written. When ``compress``
+    is set, the solution entries are stored as zlib compressed blobs.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        readonly: bool = False,
+        commit_interval: float = 1.0,
+        compress: bool = False,
+    ):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.compress = compress
+        if readonly:
+            self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            self.db = sqlite3.connect(path)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript(SCHEMA)
+        self._last_commit = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def commit(self, force: bool = True):
+        now = time.perf_counter()
+        if force or now - self._last_commit >= self.commit_interval:
+            self.db.commit()
+            self._last_commit = now
+
+    def solution_writer(
+        self, name: str, store: Optional[SolutionStore] = None
+    ) -> "ArchiveSolutionWriter":
+        return ArchiveSolutionWriter(self, name, store)
+
+    def write_statistics(self, name: str, statistics: Dict[str, Any]):
+        self.insert_statistics(name, statistics)
+        self.commit()
+
+    def write_error(self, name: str, error: str):
+        self.insert_error(name, error)
+        self.commit()
+
+    def insert_statistics(self, name: str, statistics: Dict[str, Any]):
+        """Store the statistics of a task (without committing)"""
+        self.db.execute(
+            "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+            [name]
+            + [statistics.get(k, None) for k in TASK_KEYS]
+            + [json.dumps(statistics, default=str)],
+        )
+
+    def insert_error(self, name: str, error: str):
+        """Store the error of a task (without committing)"""
+        if self.db.execute("SELECT 1 FROM tasks WHERE name = ?", [name]).fetchone():
+            self.db.execute("UPDATE tasks SET error = ? WHERE name = ?", [error, name])
+        else:
+            self.db.execute(
+                "INSERT INTO tasks (name, error) VALUES (?, ?)", [name, error]
+            )
+
+    def insert_solution(
+        self,
+        name: str,
+        number: int,
+        entry: Dict[str, Any],
+        text: Optional[str] = None,
+    ):
+        """Store an entry of the solutions of a task (without committing)
+
+        The entry is stored as YAML (a list containing only the entry), which
+        can be given as ``text`` when it is already available.
+        """
+        if text is None:
+            buffer = io.StringIO()
+            yaml.dump([entry], buffer)
+            text = buffer.getvalue()
+        data: Union[str, bytes] = text
+        if self.compress:
+            data = zlib.compress(data.encode())
+        solution = entry.get("solution", None)
+        self.db.execute(
+            "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                name,
+                number,
+                entry.get("configuration", None),
+                entry.get("problem", None),
+                entry.get("model", None),
+                entry.get("data_file", None),
+                entry.get("status", None),
+                entry.get("time", None),
+                solution is not None,
+                None if solution is None else solution.get("objective", None),
+                data,
+            ],
+        )
+
+    def statistics(self) -> Iterator[Dict[str, Any]]:
+        """The statistics of the (finished) tasks in the archive"""
+        for (stats,) in self.db.execute(
+            "SELECT statistics FROM tasks WHERE statistics IS NOT NULL ORDER BY name"
+        ):
+            yield json.loads(stats)
+
+    def errors(self) -> Iterator[Dict[str, str]]:
+        """The errors of the tasks in the archive"""
+        for name, error in self.db.execute(
+            "SELECT name, error FROM tasks WHERE error IS NOT NULL ORDER BY name"
+        ):
+            yield {"name": name, "error": error}
+
+    def objectives(self) -> Iterator[List[Dict[str, Any]]]:
+        """The objective values of the solutions, grouped by task"""
+        rows = self.db.execute(
+            "SELECT task, configuration, problem, model, data_file, time, objective "
+            "FROM solutions WHERE has_solution ORDER BY task, number"
+        )
+        task, items = None, []
+        for row in rows:
+            if row[0] != task and len(items) > 0:
+                yield items
+                items = []
+            task = row[0]
+            items.append(
+                {
+                    "configuration": row[1],
+                    "problem": row[2],
+                    "model": row[3],
+                    "data_file": row[4],
+                    "time": row[5],
+                    "objective": row[6],
+                }
+            )
+        if len(items) > 0:
+            yield items
+
+    def tasks(self) -> List[str]:
+        """The names of the tasks that have written solutions"""
+        return [
+            name
+            for (name,) in self.db.execute(
+                "SELECT DISTINCT task FROM solutions ORDER BY task"
+            )
+        ]
+
+    def solutions(self, name: str, assignments: bool = True) -> List[Dict[str, Any]]:
+        """The entries of the solutions of a task (see ``read_solutions``)"""
+        entries = [
+            yaml.load(zlib.decompress(entry) if isinstance(entry, bytes) else entry)[0]
+            for (entry,) in self.db.execute(
+                "SELECT entry FROM solutions WHERE task = ? ORDER BY number", [name]
+            )
+        ]
+        if assignments:
+            restore_assignments(entries)
+        return entries
+
+
+class ArchiveSolutionWriter(SolutionWriter):
+    """Writes the solutions of a task to an archive shard"""
+
+    def __init__(
+        self, archive: Archive, name: str, store: Optional[SolutionStore] = None
+    ):
+        self.archive = archive
+        self.name = name
+        super().__init__(Path(name), store)
+
+    def _open(self, path: Path):
+        # Remove the solutions of an earlier run of the task
+        self.archive.db.execute("DELETE FROM solutions WHERE task = ?", [self.name])
+        self.number = 0
+
+    def _dump(self, entry: Dict[str, Any]):
+        self.archive.insert_solution(self.name, self.number, entry)
+        self.number += 1
+        self.archive.commit(force=False)
+
+    def _write_objective(self, entry: Dict[str, Any]):
+        pass  # The objective is stored with every entry
+
+    def _close(self):
+        self.archive.commit()
+
+
+def compact(directory: Path, out_file: Path, remove: bool = False) -> int:
+    """Pack a results directory into a single (compressed) archive
+
+    All solutions, statistics and error files in the directory (and its
+    subdirectories) are stored in a new archive, together with the contents
+    of any archive shards. Tasks are named by their path relative to the
+    directory. The solution entries are stored as they are found, so the
+    encoding of the ``SolutionStore`` is preserved.
+
+    Args:
+        directory (Path): The results directory
+        out_file (Path): The archive to create
+        remove (bool, optional): Whether to remove the packed files once the
+            archive has been written. Defaults to False.
+
+    Returns:
+        int: The number of tasks stored in the archive
+
+    Raises:
+        FileExistsError: If the archive already exists
+    """
+    if out_file.exists():
+        raise FileExistsError(f"The archive '{out_file}' already exists")
+    packed = []
+    tasks = set()
+
+    def task(file: Path, suffix: str) -> str:
+        name = strip_compression(file.relative_to(directory).as_posix())
+        name = name[: -len(suffix)]
+        tasks.add(name)
+        packed.append(file)
+        return name
+
+    with Archive(out_file, compress=True) as archive:
+        for file in sorted(result_files(directory, "_stats.yml")):
+            with open_results(file) as fp:
+                archive.insert_statistics(task(file, "_stats.yml"), yaml.load(fp))
+        for file in sorted(result_files(directory, "_sol.yml")):
+            name = task(file, "_sol.yml")
+            with open_results(file) as fp:
+                text = fp.read()
+            entries = yaml.load(text) or []
+            # Reuse the YAML of the entries, since serialising them is slow
+            texts = _split_entries(text)
+            if len(texts) != len(entries):
+                texts = [None] * len(entries)
+            for number, (entry, entry_text) in enumerate(zip(entries, texts)):
+                archive.insert_solution(name, number, entry, entry_text)
+            sidecar = objectives_path(file)
+            if sidecar.exists():
+                packed.append(sidecar)  # The objectives are stored with the entries
+        for file in sorted(directory.rglob("*_err.txt")):
+            archive.insert_error(task(file, "_err.txt"), file.read_text())
+        for file in sorted(archives(directory)):
+            if file.resolve() == out_file.resolve():
+                continue
+            prefix = file.parent.relative_to(directory).as_posix() + "/"
+            prefix = "" if prefix == "./" else prefix
+            with Archive(file, readonly=True) as shard:
+                for name, stats in shard.db.execute(
+                    "SELECT name, statistics FROM tasks WHERE statistics IS NOT NULL"
+                ):
+                    tasks.add(prefix + name)
+                    archive.insert_statistics(prefix + name, json.loads(stats))
+                for error in shard.errors():
+                    tasks.add(prefix + error["name"])
+                    archive.insert_error(prefix + error["name"], error["error"])
+                for name in shard.tasks():
+                    tasks.add(prefix + name)
+                    entries = shard.solutions(name, assignments=False)
+                    for number, entry in enumerate(entries):
+                        archive.insert_solution(prefix + name, number, entry)
+            packed.append(file)
+        archive.commit()
+
+    if remove:
+        for file in packed:
+            file.unlink()
+            for extra in ["-wal", "-shm"]:
+                file.with_name(file.name + extra).unlink(missing_ok=True)
+    return len(tasks)
+
+
+def _split_entries(text: str) -> List[str]:
+    # Split a YAML list (in block style) into the YAML of its items
+    lines = text.splitlines(keepends=True)
+    starts = [i for i, line in enumerate(lines) if line.startswith("- ")]
+    return ["".join(lines[i:j]) for i, j in zip(starts, starts[1:] + [len(lines)])]
@@ -7,24 +7,30 @@ from typing import Iterable, Optional
 
 import click
 
-from mzn_bench.analysis.collect import collect_instances as collect_insts
-from mzn_bench.analysis.collect import collect_objectives as collect_objs
-from mzn_bench.analysis.collect import collect_statistics as collect_stats
-from mzn_bench.analysis.collect import STANDARD_KEYS
-
 IMPORT_ERROR = """This feature is not supported in minimal minizinc-slurm environments.
 
 Please install using `pip install mzn-bench[scripts]`
 """
 
-# Import the tabulate formats if the package is available
-tabulate_options = []
-try:
-    from tabulate import tabulate_formats
+# Commands import the modules they need when they are run, so that the
+# command line interface starts quickly. For the same reason, the tabulate
+# formats are only loaded when an output mode is parsed or shown.
+class TabulateFormat(click.Choice):
+    def __init__(self):
+        super().__init__([], case_sensitive=False)
 
-    tabulate_options = tabulate_formats
-except ImportError:
-    pass
+    @property
+    def choices(self):
+        try:
+            from tabulate import tabulate_formats
+
+            return tabulate_formats
+        except ImportError:
+            return []
+
+    @choices.setter
+    def choices(self, value):
+        pass
 
 
 @click.group()
@@ -56,6 +62,8 @@ def collect_instances(shared_data: Optional[str], benchmarks_location: str):
     Example usage:
         mzn-bench collect-instances minizinc-benchmarks > instances.csv
     """
+    from mzn_bench.analysis.collect import collect_instances as collect_insts
+
     instances = 0
     writer = csv.DictWriter(
         sys.stdout,
@@ -70,20 +78,41 @@ def collect_instances(shared_data: Optional[str], benchmarks_location: str):
 
 
 @main.command()
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Only keep the solutions that strictly improve the objective",
+)
+@click.option(
+    "--resolution",
+    default=None,
+    type=float,
+    help="Width (in seconds) of the time buckets used to resample compacted objective data",
+)
 @click.argument("dirs", nargs=-1, type=click.Path(exists=True, dir_okay=True))
 @click.argument("out_file", nargs=1, type=click.Path(file_okay=True))
-def collect_objectives(dirs: Iterable[str], out_file: str):
+def collect_objectives(
+    compact: bool, resolution: Optional[float], dirs: Iterable[str], out_file: str
+):
     """Collects objective values and combines them into a single CSV file.
 
     \b
-    DIRS are directories containing the result YAML files
+    DIRS are directories containing the result YAML files, or compacted archives
     OUT_FILE is the output CSV file containing objective data
     """
 
-    collect_objectives_(dirs, out_file)
+    collect_objectives_(dirs, out_file, compact=compact, resolution=resolution)
 
 
-def collect_objectives_(dirs: Iterable[str], out_file: str):
+def collect_objectives_(
+    dirs: Iterable[str],
+    out_file: str,
+    compact: bool = False,
+    resolution: Optional[float] = None,
+):
+    from mzn_bench.analysis.collect import STANDARD_KEYS
+    from mzn_bench.analysis.collect import collect_objectives as collect_objs
+
     count = 0
     with Path(out_file).open(mode="w") as file:
         writer = csv.DictWriter(
@@ -94,7 +123,7 @@ def collect_objectives_(dirs: Iterable[str], out_file: str):
         )
         writer.writeheader()
         last_keys = ("", "", "", "")
-        for objective in collect_objs(dirs):
+        for objective in collect_objs(dirs, compact, resolution):
             keys = (
                 objective["configuration"],
                 objective["problem"],
@@ -110,30 +139,104 @@ def collect_objectives_(dirs: Iterable[str], out_file: str):
 
 
 @main.command()
+@click.option(
+    "--normalise",
+    is_flag=True,
+    help="Normalise the times of each task by the speed of the node that ran it",
+)
+@click.option(
+    "--speed-factors",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="CSV file with the speed of each node (hostname,speed), used instead of the calibrated speeds",
+)
 @click.argument("dirs", nargs=-1, type=click.Path(exists=True, dir_okay=True))
 @click.argument("out_file", nargs=1, type=click.Path(file_okay=True))
-def collect_statistics(dirs: Iterable[str], out_file: str):
+def collect_statistics(
+    normalise: bool, speed_factors: Optional[str], dirs: Iterable[str], out_file: str
+):
     """Collects statistics values and combines them into a single CSV file.
 
     \b
-    DIRS are directories containing the result YAML files
+    DIRS are directories containing the result YAML files, or compacted archives
     OUT_FILE is the CSV file containing aggregated statistics data
     """
-    collect_statistics_(dirs, out_file)
+    collect_statistics_(
+        dirs,
+        out_file,
+        normalise=normalise or speed_factors is not None,
+        speed_factors=speed_factors,
+    )
+
 
+def collect_statistics_(
+    dirs: Iterable[str],
+    out_file: str,
+    normalise: bool = False,
+    speed_factors: Optional[str] = None,
+):
+    from mzn_bench.analysis.collect import STANDARD_KEYS
+    from mzn_bench.analysis.collect import collect_statistics as collect_stats
+    from mzn_bench.analysis.collect import normalise_times
 
-def collect_statistics_(dirs: Iterable[str], out_file: str):
     statistics = list(collect_stats(dirs))
+    if normalise:
+        factors = None
+        if speed_factors is not None:
+            with Path(speed_factors).open() as file:
+                factors = {row[0]: float(row[1]) for row in csv.reader(file) if row}
+        statistics = normalise_times(statistics, factors)
     keys = {key for obj in statistics for key in obj.keys()}
     keys = keys.difference(STANDARD_KEYS)
     with Path(out_file).open(mode="w") as file:
         writer = csv.DictWriter(
-            file, STANDARD_KEYS + list(keys), dialect="unix", extrasaction="ignore"
+            file, STANDARD_KEYS + sorted(keys), dialect="unix", extrasaction="ignore"
         )
         writer.writeheader()
         for stat in statistics:
             writer.writerow(stat)
     click.echo(f"Processed statistics from {len(statistics)} files.", err=True)
+    partial = sum(1 for stat in statistics if stat.get("partial", False))
+    if partial > 0:
+        click.echo(
+            f"{partial} tasks did not finish, and report partial statistics.",
+            err=True,
+        )
+
+
+@main.command()
+@click.option(
+    "--remove",
+    is_flag=True,
+    help="Remove the packed result files once the archive has been written",
+)
+@click.argument("dir", nargs=1, type=click.Path(exists=True, file_okay=False))
+@click.argument(
+    "out_file", nargs=1, required=False, type=click.Path(dir_okay=False)
+)
+def compact(remove: bool, dir: str, out_file: Optional[str]):
+    """Packs a results directory into a single compressed archive.
+
+    The statistics, objectives and (compressed) solutions of all tasks are
+    stored in an indexed SQLite database, which can be used instead of the
+    directory by the collect-*, compare-configurations and plotting commands.
+
+    \b
+    DIR is the directory containing YAML output from minizinc-slurm
+    OUT_FILE is the archive to create (defaults to DIR.sqlite)
+    """
+    from mzn_bench.archive import compact as compact_fn
+
+    path = Path(dir)
+    out = path.with_name(path.name + ".sqlite")
+    if out_file is not None:
+        out = Path(out_file)
+    try:
+        count = compact_fn(path, out, remove=remove)
+    except FileExistsError as err:
+        click.echo(str(err), err=True)
+        exit(1)
+    click.echo(f"Packed {count} tasks into {out}.", err=True)
 
 
 @main.command()
@@ -142,10 +245,23 @@ def collect_statistics_(dirs: Iterable[str], out_file: str):
     "--check",
     default=1,
     help="""Number of solutions to check per instance
-            (randomly chooses which, but always checks final solution).
+            (always checks the final, first and middle solution, and spreads
+            the remaining checks over the other solutions).
             Setting to zero will check all solutions.
             """,
 )
+@click.option(
+    "--seed",
+    default=0,
+    type=int,
+    help="Random seed used to select which solutions to check",
+)
+@click.option(
+    "--budget",
+    default=None,
+    type=int,
+    help="Total checker time (in seconds) per instance, divided over the checked solutions",
+)
 @click.option(
     "-b",
     "--base-dir",
@@ -155,7 +271,14 @@ def collect_statistics_(dirs: Iterable[str], out_file: str):
 )
 @click.argument("dir", nargs=1, type=click.Path(exists=True, dir_okay=True))
 @click.argument("pytest_args", nargs=-1)
-def check_solutions(check: int, base_dir: str, dir: str, pytest_args: Iterable[str]):
+def check_solutions(
+    check: int,
+    seed: int,
+    budget: Optional[int],
+    base_dir: str,
+    dir: str,
+    pytest_args: Iterable[str],
+):
     """Checks the correctness of solutions produced during a minizinc-slurm run.
 
     This is done by feeding the solution produced back into the model and checking
@@ -165,10 +288,17 @@ def check_solutions(check: int, base_dir: str, dir: str, pytest_args: Iterable[s
     DIR is the directory containing YAML output from minizinc-slurm
     PYTEST_ARGS are passed to the underlying PyTest command
     """
-    check_solutions_(check, base_dir, dir, pytest_args)
+    check_solutions_(check, base_dir, dir, pytest_args, seed=seed, budget=budget)
 
 
-def check_solutions_(check: int, base_dir: str, dir: str, pytest_args: Iterable[str]):
+def check_solutions_(
+    check: int,
+    base_dir: str,
+    dir: str,
+    pytest_args: Iterable[str],
+    seed: int = 0,
+    budget: Optional[int] = None,
+):
     try:
         import pytest
 
@@ -177,10 +307,14 @@ def check_solutions_(check: int, base_dir: str, dir: str, pytest_args: Iterable[
             "mzn_bench.pytest.check_solutions",
             "--check",
             str(check),
+            "--seed",
+            str(seed),
             "--base-dir",
             base_dir,
-            dir,
         ]
+        if budget is not None:
+            args.extend(["--budget", str(budget)])
+        args.append(dir)
         args.extend(pytest_args)
         exit(pytest.main(args))
     except ImportError:
@@ -218,6 +352,7 @@ def check_statuses_(dir: str, pytest_args: Iterable[str]):
 @main.command()
 @click.option(
     "--grouping",
+    "groupings",
     help="Aggregate results over one or more groupings",
     type=click.Choice(["configuration", "run", "problem", "model", "data_file"]),
     default=["configuration"],
@@ -228,9 +363,14 @@ def check_statuses_(dir: str, pytest_args: Iterable[str]):
     type=click.Choice(["time", "solveTime", "flatTime"]),
     help="Show average of the given stat in the table",
 )
+@click.option(
+    "--resources",
+    is_flag=True,
+    help="Show the average CPU time, maximum peak memory, and average harness CPU time",
+)
 @click.option(
     "--output-mode",
-    type=click.Choice(tabulate_options, case_sensitive=False),
+    type=TabulateFormat(),
     default="pretty",
     help="The table format used in the output. All valid tablefmt values are allow, try `latex` for example.",
 )
@@ -241,6 +381,7 @@ def report_status(
     groupings: Iterable[str],
     statistics: str,
     avg: str,
+    resources: bool,
     output_mode: str,
 ):
     """Aggregate status of MiniZinc instance runs into a table
@@ -251,13 +392,124 @@ def report_status(
         from .analysis.report_status import report_status as report_status_fn
 
         print(
-            report_status_fn(groupings, Path(statistics), avg, output_mode)
+            report_status_fn(groupings, Path(statistics), avg, output_mode, resources)
         )
     except ImportError:
         click.echo(IMPORT_ERROR, err=True)
         exit(1)
 
 
+@main.command()
+@click.option(
+    "--grouping",
+    "groupings",
+    help="Aggregate results over one or more groupings",
+    type=click.Choice(["configuration", "run", "problem", "model", "data_file"]),
+    default=["configuration"],
+    multiple=True,
+)
+@click.option(
+    "--threshold",
+    default=0.05,
+    type=float,
+    help="Fraction of the run time above which the harness overhead is considered to skew the results",
+)
+@click.option(
+    "--output-mode",
+    type=TabulateFormat(),
+    default="pretty",
+    help="The table format used in the output. All valid tablefmt values are allow, try `latex` for example.",
+)
+@click.argument(
+    "statistics", metavar="stats_file", type=click.Path(exists=True, file_okay=True)
+)
+def report_overhead(
+    groupings: Iterable[str],
+    threshold: float,
+    output_mode: str,
+    statistics: str,
+):
+    """Aggregate the time spent in each phase of the MiniZinc instance runs
+
+    The overhead of the harness consists of the setup, serialisation, and
+    teardown phases of each task.
+
+    STATS_FILE is the CSV file containing aggregated statistics data
+    """
+    try:
+        from .analysis.report_overhead import report_overhead as report_overhead_fn
+
+        print(report_overhead_fn(groupings, Path(statistics), threshold, output_mode))
+    except ImportError:
+        click.echo(IMPORT_ERROR, err=True)
+        exit(1)
+
+
+@main.command()
+@click.option(
+    "--size",
+    required=True,
+    type=int,
+    help="Number of instances to select (at least one instance of every problem is selected)",
+)
+@click.option(
+    "--bins",
+    default=3,
+    type=int,
+    help="Number of difficulty bins used to stratify the instances of each problem",
+)
+@click.option(
+    "--seed",
+    default=0,
+    type=int,
+    help="Random seed used to sample the instances",
+)
+@click.option(
+    "--output-mode",
+    type=TabulateFormat(),
+    default="pretty",
+    help="The table format used in the output. All valid tablefmt values are allow, try `latex` for example.",
+)
+@click.argument(
+    "statistics", metavar="stats_file", type=click.Path(exists=True, file_okay=True)
+)
+@click.argument("instances", type=click.Path(exists=True, dir_okay=False))
+@click.argument("out_file", type=click.Path(dir_okay=False))
+def select_subset(
+    size: int,
+    bins: int,
+    seed: int,
+    output_mode: str,
+    statistics: str,
+    instances: str,
+    out_file: str,
+):
+    """Select a small representative subset of the instances.
+
+    The instances are stratified by problem, by the fraction of solvers that
+    solved them, and by their difficulty in the historical statistics, and are
+    sampled from every stratum in proportion to its size. A report shows how
+    well the solver ranking on all instances is reproduced by the subset.
+
+    \b
+    STATS_FILE is the CSV file (or archive) containing historical statistics
+    INSTANCES is the instances file from which the subset is selected
+    OUT_FILE is the instances file to which the subset is written
+    """
+    try:
+        from .analysis import select_subset as fn
+        from .analysis.collect import read_stats_csv
+    except ImportError:
+        click.echo(IMPORT_ERROR, err=True)
+        exit(1)
+
+    stats = read_stats_csv(statistics)
+    features = fn.instance_features(fn.read_instances(Path(instances)), stats)
+    subset = fn.select_subset(features, size, bins, seed)
+    fn.write_instances(Path(instances), subset, Path(out_file))
+    print(fn.reproduction_report(stats, subset, output_mode))
+
+
 @main.command()
 @click.argument(
     "statistics", metavar="stats_file", type=click.Path(exists=True, file_okay=True)
@@ -310,5 +562,133 @@ def compare_configurations(
         exit(1)
 
 
+@main.command()
+@click.option(
+    "--page-size",
+    default=20,
+    type=int,
+    help="Number of instance plots on each problem page",
+)
+@click.option(
+    "--resolution",
+    default=None,
+    type=float,
+    help="Width (in seconds) of the time buckets used to resample objective data",
+)
+@click.argument("objectives", type=click.Path(exists=True, file_okay=True))
+@click.argument("statistics", type=click.Path(exists=True, file_okay=True))
+@click.argument("out_dir", type=click.Path(file_okay=False))
+def report(
+    page_size: int,
+    resolution: Optional[float],
+    objectives: str,
+    statistics: str,
+    out_dir: str,
+):
+    """Write a static HTML report of a benchmark run.
+
+    The report consists of an index page with summary tables and paginated
+    pages with the instance plots of each problem.
+
+    \b
+    OBJECTIVES is the CSV file containing objective data
+    STATISTICS is the CSV file containing aggregated statistics data
+    OUT_DIR is the directory in which the report is written
+    """
+    try:
+        from .analysis.report import write_report
+    except ImportError:
+        click.echo(IMPORT_ERROR, err=True)
+        exit(1)
+
+    write_report(
+        Path(objectives), Path(statistics), Path(out_dir), page_size, resolution
+    )
+    click.echo(f"Report written to {Path(out_dir) / 'index.html'}", err=True)
+
+
+@main.command()
+@click.argument(
+    "statistics", metavar="stats_file", type=click.Path(exists=True, file_okay=True)
+)
+@click.argument("out_file", type=click.Path(file_okay=True))
+def performance_profile(statistics: str, out_file: str):
+    """Plot the Dolan-Moré performance profiles of the configurations.
+
+    \b
+    STATS_FILE is the CSV file containing aggregated statistics data
+    OUT_FILE is the HTML file to which the plot is written
+    """
+    try:
+        from .analysis.collect import read_stats_csv
+        from .analysis.plot import plot_performance_profile
+    except ImportError:
+        click.echo(IMPORT_ERROR, err=True)
+        exit(1)
+
+    save_plot(plot_performance_profile(read_stats_csv(statistics)), out_file)
+
+
+@main.command()
+@click.argument(
+    "statistics", metavar="stats_file", type=click.Path(exists=True, file_okay=True)
+)
+@click.argument("out_file", type=click.Path(file_okay=True))
+def cactus_plot(statistics: str, out_file: str):
+    """Plot the number of solved instances against the required time.
+
+    \b
+    STATS_FILE is the CSV file containing aggregated statistics data
+    OUT_FILE is the HTML file to which the plot is written
+    """
+    try:
+        from .analysis.collect import read_stats_csv
+        from .analysis.plot import plot_cactus
+    except ImportError:
+        click.echo(IMPORT_ERROR, err=True)
+        exit(1)
+
+    save_plot(plot_cactus(read_stats_csv(statistics)), out_file)
+
+
+@main.command()
+@click.option(
+    "--gap",
+    default=0.0,
+    type=float,
+    help="Fraction by which the objective may differ from the best known objective",
+)
+@click.argument("objectives", type=click.Path(exists=True, file_okay=True))
+@click.argument(
+    "statistics", metavar="stats_file", type=click.Path(exists=True, file_okay=True)
+)
+@click.argument("out_file", type=click.Path(file_okay=True))
+def time_to_target(gap: float, objectives: str, statistics: str, out_file: str):
+    """Plot the distribution of the time to reach the best known objective.
+
+    \b
+    OBJECTIVES is the CSV file containing objective data
+    STATS_FILE is the CSV file containing aggregated statistics data
+    OUT_FILE is the HTML file to which the plot is written
+    """
+    try:
+        from .analysis.collect import read_csv
+        from .analysis.plot import plot_time_to_target
+    except ImportError:
+        click.echo(IMPORT_ERROR, err=True)
+        exit(1)
+
+    sols, stats = read_csv(objectives, statistics)
+    save_plot(plot_time_to_target(sols, stats, gap), out_file)
+
+
+def save_plot(plot, out_file: str):
+    from bokeh.io import output_file, save
+
+    output_file(filename=out_file, title=plot.title.text)
+    save(plot)
+    click.echo(f"Plot written to {out_file}", err=True)
+
+
 if __name__ == "__main__":
     main()
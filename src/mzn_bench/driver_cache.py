@@ -0,0 +1,207 @@
+import getpass
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import fields
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import minizinc
+
+# Environment variables that influence the solvers found by MiniZinc
+SOLVER_ENVIRONMENT = ["MZN_SOLVER_PATH", "MZN_STDLIB_DIR", "HOME"]
+
+# Drivers that have already been constructed by this process
+_drivers: Dict[str, "CachedDriver"] = {}
+
+# Called with the process identifier of every MiniZinc process that is started
+# by a cached driver in the current context
+_process_started: ContextVar[Optional[Callable[[int], None]]] = ContextVar(
+    "mzn_bench_process_started", default=None
+)
+
+
+@contextmanager
+def track_processes(started: Callable[[int], None]) -> Iterator[None]:
+    """Report the MiniZinc processes started by cached drivers
+
+    Within the context (and in the asyncio tasks created within it), the
+    process identifier of every MiniZinc process started by a ``CachedDriver``
+    is passed to ``started``, and to the callbacks of enclosing contexts.
+    """
+    outer = _process_started.get()
+
+    def report(pid: int):
+        started(pid)
+        if outer is not None:
+            outer(pid)
+
+    token = _process_started.set(report)
+    try:
+        yield
+    finally:
+        _process_started.reset(token)
+
+
+def cache_dir() -> Optional[Path]:
+    """The node-local directory in which driver information is cached
+
+    The directory is given by the MZN_BENCH_CACHE_DIR environment variable,
+    and defaults to ``mzn-bench-<user>`` in the temporary directory of the node
+    (``$TMPDIR`` or ``/tmp``), since the home directory is often shared between
+    the nodes of a cluster. Caching is disabled when MZN_BENCH_CACHE_DIR is set
+    to an empty string.
+    """
+    path = os.environ.get("MZN_BENCH_CACHE_DIR")
+    if path is None:
+        return Path(tempfile.gettempdir()) / f"mzn-bench-{getpass.getuser()}"
+    return Path(path) if path != "" else None
+
+
+def _key(executable: Path) -> str:
+    stat = executable.stat()
+    key = [str(executable), str(stat.st_mtime_ns), str(stat.st_size)]
+    key.extend(os.environ.get(var, "") for var in SOLVER_ENVIRONMENT)
+    return hashlib.sha1("\0".join(key).encode()).hexdigest()
+
+
+def _query(executable: Path) -> dict:
+    version = subprocess.run([str(executable), "--version"], capture_output=True)
+    if version.returncode != 0:
+        raise minizinc.ConfigurationError(
+            f"The MiniZinc driver found at '{executable}' could not report its "
+            f"version:\n{version.stderr.decode()}"
+        )
+    output = subprocess.run([str(executable), "--solvers-json"], capture_output=True)
+    if output.returncode != 0:
+        raise minizinc.ConfigurationError(
+            f"The MiniZinc driver found at '{executable}' could not list its "
+            f"solvers:\n{output.stderr.decode()}"
+        )
+    return {
+        "executable": str(executable),
+        "version": version.stdout.decode(),
+        "solvers": json.loads(output.stdout),
+    }
+
+
+def _solver_tags(solvers: List[dict]) -> Dict[str, List[minizinc.Solver]]:
+    # Mirrors minizinc.Driver.available_solvers
+    cache: Dict[str, List[minizinc.Solver]] = {}
+    allowed_fields = {f.name for f in fields(minizinc.Solver)}
+    for s in solvers:
+        obj = minizinc.Solver(
+            **{key: value for (key, value) in s.items() if key in allowed_fields}
+        )
+        if obj.version == "<unknown version>":
+            obj._identifier = obj.id
+        else:
+            obj._identifier = obj.id + "@" + obj.version
+        names = list(s.get("tags", []))
+        names.extend([s["id"], s["id"].split(".")[-1]])
+        for name in names:
+            cache.setdefault(name, []).append(obj)
+    return cache
+
+
+class CachedDriver(minizinc.Driver):
+    """A MiniZinc driver that uses cached version and solver information
+
+    The driver also reports the processes it starts (see ``track_processes``).
+
+    Attributes:
+        version (str): The version text reported by the executable
+        solvers (List[dict]): The solver configurations reported by the
+            executable (``--solvers-json``)
+    """
+
+    def __init__(self, executable: Path, version: str, solvers: List[dict]):
+        self.version = version
+        self.solvers = solvers
+        self._tags: Optional[Dict[str, List[minizinc.Solver]]] = None
+        super().__init__(executable)
+
+    @property
+    def minizinc_version(self) -> str:
+        return self.version
+
+    def available_solvers(self, refresh=False):
+        if refresh:
+            return super().available_solvers(refresh)
+        if self._tags is None:
+            self._tags = _solver_tags(self.solvers)
+        return self._tags
+
+    async def _create_process(self, *args, **kwargs):
+        # The only point at which the process started by an instance is known
+        proc = await super()._create_process(*args, **kwargs)
+        started = _process_started.get()
+        if started is not None:
+            started(proc.pid)
+        return proc
+
+
+def cached_driver(executable: Optional[Path] = None) -> Optional[CachedDriver]:
+    """Construct a MiniZinc driver using the node-local cache
+
+    Constructing a driver, and looking up its solvers, requires running the
+    ``minizinc`` executable to query its version and the available solver
+    configurations. This information is cached on disk, keyed by the path,
+    modification time and size of the executable (and the environment variables
+    that influence the available solvers), so it is only queried once per
+    node.
+
+    Args:
+        executable (Optional[Path]): The MiniZinc executable. Defaults to the
+            executable of the default driver.
+
+    Returns:
+        Optional[CachedDriver]: The driver, or None if no executable is given
+            and there is no default driver.
+
+    Raises:
+        ConfigurationError: If the driver version is incompatible with MiniZinc
+            Python
+    """
+    if executable is None:
+        if minizinc.default_driver is None:
+            return None
+        executable = minizinc.default_driver.executable
+    executable = Path(executable).resolve()
+    if not executable.exists():
+        raise minizinc.ConfigurationError(
+            f"No MiniZinc executable was found at '{executable}'."
+        )
+    key = _key(executable)
+    if key in _drivers:
+        return _drivers[key]
+
+    info = None
+    directory = cache_dir()
+    file = None if directory is None else directory / "drivers" / f"{key}.json"
+    if file is not None and file.exists():
+        try:
+            info = json.loads(file.read_text())
+        except (OSError, ValueError):
+            info = None  # Corrupt cache entry, query the driver again
+    if info is None:
+        info = _query(executable)
+        if file is not None:
+            try:
+                file.parent.mkdir(parents=True, exist_ok=True)
+                # Write atomically, since other tasks on this node might read it
+                fd, tmp = tempfile.mkstemp(dir=file.parent, suffix=".tmp")
+                with os.fdopen(fd, "w") as f:
+                    json.dump(info, f)
+                os.replace(tmp, file)
+            except OSError:
+                pass  # The cache is an optimisation only
+
+    # The driver checks the (cached) version without running the executable
+    driver = CachedDriver(executable, info["version"], info["solvers"])
+    _drivers[key] = driver
+    return driver
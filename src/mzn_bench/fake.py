@@ -0,0 +1,171 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import minizinc
+from minizinc import Method, Result, Status
+
+
+@dataclass
+class FakeSolver:
+    """A synthetic solver backend that does not run MiniZinc.
+
+    Instead of solving the instance, the fake backend emits a stream of
+    synthetic solutions through the same ``solutions()`` interface as
+    ``minizinc.Instance``. This allows ``schedule``, ``main`` and the result
+    writers and collectors to be exercised at scale without MiniZinc, solvers,
+    or real solve time.
+
+    The stream of every task is deterministic for a given seed, but differs
+    between configurations and instances.
+
+    Attributes:
+        solutions (int): The number of solutions emitted by each task
+        rate (Optional[float]): The number of solutions emitted per second, or
+            None to emit solutions as fast as possible
+        size (int): The number of values in the array of each solution
+        statuses (Dict[str, float]): The relative weights with which the final
+            status of a task is chosen. Tasks that are UNSATISFIABLE or UNKNOWN
+            do not emit solutions, and tasks that are ERROR raise an error after
+            emitting their solutions. Tasks that reach the timeout end as
+            SATISFIED (or UNKNOWN without solutions).
+        method (str): The method of the instances (satisfy, minimize, or maximize)
+        flat_time (float): The time (in seconds) spent flattening before the
+            first solution
+        overrun (float): The time (in seconds) that tasks keep running after
+            reaching the timeout, as if the solver ignores its time limit
+        seed (int): The seed for the random number generator
+    """
+
+    solutions: int = 10
+    rate: Optional[float] = 10.0
+    size: int = 100
+    statuses: Dict[str, float] = field(
+        default_factory=lambda: {"OPTIMAL_SOLUTION": 1.0}
+    )
+    method: str = "minimize"
+    flat_time: float = 0.0
+    overrun: float = 0.0
+    seed: int = 0
+
+    @staticmethod
+    def solver() -> minizinc.Solver:
+        """A solver configuration that can be used with the fake backend
+
+        The solver configuration is constructed without consulting MiniZinc,
+        and can be used in the ``Configuration`` objects passed to ``schedule``.
+
+        Returns:
+            minizinc.Solver: The (unusable) solver configuration
+        """
+        return minizinc.Solver(
+            name="Fake", version="1.0", id="org.minizinc.mzn_bench.fake", executable=""
+        )
+
+    def instance(self, model: minizinc.Model, key: str) -> "FakeInstance":
+        """Create an instance that emits synthetic solutions
+
+        Args:
+            model (minizinc.Model): The model of the instance
+            key (str): The key from which the random stream of the task is
+                derived (e.g., the configuration and instance names)
+
+        Returns:
+            FakeInstance: The fake instance
+        """
+        return FakeInstance(self, model, key)
+
+
+class FakeInstance:
+    """An instance of the fake backend, mimicking ``minizinc.Instance``"""
+
+    def __init__(self, solver: FakeSolver, model: minizinc.Model, key: str):
+        self.solver = solver
+        self.model = model
+        self.key = key
+        self.files: List[Path] = []
+        self.data: Dict[str, Any] = {}
+
+    @property
+    def method(self) -> Method:
+        return Method[self.solver.method.upper()]
+
+    def add_file(self, file: Union[Path, str], parse_data: bool = False):
+        self.files.append(Path(file))
+
+    def __setitem__(self, key: str, value: Any):
+        self.data[key] = value
+
+    async def solutions(
+        self,
+        timeout: Optional[timedelta] = None,
+        intermediate_solutions: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[Result]:
+        fake = self.solver
+        rng = random.Random(f"{fake.seed}:{self.key}")
+        status = Status[
+            rng.choices(list(fake.statuses), weights=list(fake.statuses.values()))[0]
+        ]
+        start = time.perf_counter()
+        deadline = None if timeout is None else start + timeout.total_seconds()
+
+        async def wait(seconds: float) -> bool:
+            # Wait for the given number of seconds, but not beyond the deadline
+            if deadline is not None and time.perf_counter() + seconds > deadline:
+                await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+                return False
+            if seconds > 0:
+                await asyncio.sleep(seconds)
+            return True
+
+        completed = await wait(fake.flat_time)
+        flat_time = time.perf_counter() - start
+
+        n_solutions = 0
+        if status not in [Status.UNSATISFIABLE, Status.UNKNOWN]:
+            values = [rng.randrange(1000) for _ in range(fake.size)]
+            objective = rng.randrange(1000, 2000)
+            interval = 0.0 if fake.rate is None else 1.0 / fake.rate
+            while completed and n_solutions < fake.solutions:
+                completed = await wait(interval)
+                if not completed:
+                    break
+                n_solutions += 1
+                # Change a few values, and improve the objective, in every solution
+                for _ in range(max(1, fake.size // 100) if fake.size > 0 else 0):
+                    values[rng.randrange(fake.size)] = rng.randrange(1000)
+                solution: Dict[str, Any] = {"x": list(values)}
+                if self.method != Method.SATISFY:
+                    objective += rng.randint(1, 10) * (
+                        -1 if self.method == Method.MINIMIZE else 1
+                    )
+                    solution["objective"] = objective
+                if intermediate_solutions or n_solutions == fake.solutions:
+                    yield Result(
+                        Status.SATISFIED,
+                        solution,
+                        {"time": timedelta(seconds=time.perf_counter() - start)},
+                    )
+
+        if not completed:
+            await asyncio.sleep(fake.overrun)
+            status = Status.SATISFIED if n_solutions > 0 else Status.UNKNOWN
+        elif status == Status.ERROR:
+            raise minizinc.MiniZincError(message="Fake solver error")
+        elapsed = time.perf_counter() - start
+        yield Result(
+            status,
+            None,
+            {
+                "method": self.solver.method,
+                "flatTime": timedelta(seconds=flat_time),
+                "solveTime": timedelta(seconds=elapsed - flat_time),
+                "nSolutions": n_solutions,
+                "time": timedelta(seconds=elapsed),
+            },
+        )
@@ -0,0 +1,272 @@
+import asyncio
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROC = Path("/proc")
+
+
+def _processes() -> Optional[Tuple[Dict[int, List[int]], Dict[int, List[str]]]]:
+    """The child processes and the status fields of every process
+
+    The status fields are those of /proc/<pid>/stat following the command name
+    (i.e., starting from the state of the process). Returns None if the process
+    information is not available (i.e., on systems without a /proc file system).
+    """
+    children: Dict[int, List[int]] = {}
+    stats: Dict[int, List[str]] = {}
+    try:
+        entries = list(PROC.iterdir())
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue  # Process has already terminated
+        # The command name can contain spaces, so split after its closing bracket
+        fields = stat[stat.rfind(")") + 2 :].split()
+        pid = int(entry.name)
+        children.setdefault(int(fields[1]), []).append(pid)
+        stats[pid] = fields
+    return children, stats
+
+
+def _descendants(children: Dict[int, List[int]], root: int) -> List[int]:
+    result = []
+    stack = list(children.get(root, []))
+    while stack:
+        pid = stack.pop()
+        result.append(pid)
+        stack.extend(children.get(pid, []))
+    return result
+
+
+def _context_switches(pid: int) -> Tuple[int, int]:
+    # The (voluntary, involuntary) context switches of a running process
+    switches = {}
+    try:
+        with open(PROC / str(pid) / "status") as file:
+            for line in file:
+                key, _, value = line.partition(":")
+                if key.endswith("ctxt_switches"):
+                    switches[key] = int(value)
+    except (OSError, ValueError):
+        pass
+    return (
+        switches.get("voluntary_ctxt_switches", 0),
+        switches.get("nonvoluntary_ctxt_switches", 0),
+    )
+
+
+def _tree_usage(root: int) -> Optional[Dict[str, float]]:
+    """The resources used by a process and all of its descendants
+
+    The CPU times include those of the terminated descendants that have been
+    reaped by their parent within the tree, but the context switches only
+    include those of the running processes. Returns None if the process has
+    terminated, or if the process information is not available.
+    """
+    processes = _processes()
+    if processes is None or root not in processes[1]:
+        return None
+    children, stats = processes
+    usage = {"rss": 0, "user": 0.0, "system": 0.0, "voluntary": 0, "involuntary": 0}
+    tick = os.sysconf("SC_CLK_TCK")
+    for pid in [root] + _descendants(children, root):
+        fields = stats[pid]
+        usage["rss"] += int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+        # Own CPU time, and that of the reaped children
+        usage["user"] += (int(fields[11]) + int(fields[13])) / tick
+        usage["system"] += (int(fields[12]) + int(fields[14])) / tick
+        voluntary, involuntary = _context_switches(pid)
+        usage["voluntary"] += voluntary
+        usage["involuntary"] += involuntary
+    return usage
+
+
+def process_tree(root: int) -> List[int]:
+    """A process and all of its descendants
+
+    Only the process itself is returned if the process information is not
+    available (i.e., on systems without a /proc file system).
+    """
+    processes = _processes()
+    if processes is None:
+        return [root]
+    return [root] + _descendants(processes[0], root)
+
+
+# The monitors of the tasks that are currently running
+_running: List["ResourceMonitor"] = []
+
+
+class ResourceMonitor:
+    """Measures the resources used by the processes started during a task.
+
+    The MiniZinc process of the task is given to ``track``, after which its
+    process tree is sampled at a fixed interval (when the /proc file system is
+    available). The peak memory usage is taken from these samples.
+
+    When no other task ran at the same time, the CPU times and context switches
+    of the (terminated) child processes are exactly measured by ``getrusage``,
+    and the peak memory usage is complemented by the maximum resident set size
+    of the largest child process. Otherwise, ``getrusage`` would include the
+    other tasks, and the CPU times and context switches are instead taken from
+    the last sample of the process tree of the task (missing at most the last
+    interval). When the process tree was never sampled (e.g., because the task
+    was shorter than the interval), these statistics and the peak memory usage
+    are reported as missing (None) instead. The CPU time used by the harness
+    itself is always taken from ``getrusage``, and thus includes the work for
+    the other tasks.
+    """
+
+    interval: float
+    peak_rss: int
+    shared: bool
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_rss = 0
+        self.shared = False
+        self._root = None
+        self._usage = None
+        self._sampler = None
+
+    def start(self):
+        self._self = resource.getrusage(resource.RUSAGE_SELF)
+        self._children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        if len(_running) > 0:
+            self.shared = True
+            for monitor in _running:
+                monitor.shared = True
+        _running.append(self)
+        if PROC.is_dir():
+            self._sampler = asyncio.ensure_future(self._sample())
+
+    def track(self, pid: int):
+        """Measure the process tree of the (MiniZinc) process of the task"""
+        self._root = pid
+
+    def _measure(self):
+        usage = None if self._root is None else _tree_usage(self._root)
+        if usage is None:
+            return
+        self.peak_rss = max(self.peak_rss, usage["rss"])
+        if self._usage is not None:
+            # CPU times only increase, but parts of the tree can terminate
+            for key in usage:
+                usage[key] = max(usage[key], self._usage[key])
+        self._usage = usage
+
+    async def _sample(self):
+        while True:
+            self._measure()
+            await asyncio.sleep(self.interval)
+
+    def stop(self) -> Dict[str, Optional[float]]:
+        """Stop monitoring and report the used resources
+
+        Returns:
+            Dict[str, Optional[float]]: The resource statistics, using the same
+                naming conventions as the MiniZinc statistics
+        """
+        if self._sampler is not None:
+            self._sampler.cancel()
+        self._measure()
+        if self in _running:
+            _running.remove(self)
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        peak = self.peak_rss
+        if self.shared and self._usage is None:
+            # Nothing was measured, which should not be mistaken for no usage
+            peak = None
+            stats = {
+                "userTime": None,
+                "systemTime": None,
+                "voluntaryContextSwitches": None,
+                "involuntaryContextSwitches": None,
+            }
+        elif self.shared:
+            stats = {
+                "userTime": self._usage["user"],
+                "systemTime": self._usage["system"],
+                "voluntaryContextSwitches": self._usage["voluntary"],
+                "involuntaryContextSwitches": self._usage["involuntary"],
+            }
+        else:
+            if children.ru_maxrss > self._children.ru_maxrss:
+                # A child process of this task is the largest so far, which
+                # might have been missed by the sampling. Note that ru_maxrss is
+                # reported in bytes on macOS, and in kilobytes elsewhere.
+                unit = 1 if sys.platform == "darwin" else 1024
+                peak = max(peak, children.ru_maxrss * unit)
+            stats = {
+                "userTime": children.ru_utime - self._children.ru_utime,
+                "systemTime": children.ru_stime - self._children.ru_stime,
+                "voluntaryContextSwitches": children.ru_nvcsw - self._children.ru_nvcsw,
+                "involuntaryContextSwitches": children.ru_nivcsw
+                - self._children.ru_nivcsw,
+            }
+        return {
+            "peakRSS": None if peak is None else peak / 2**20,
+            **stats,
+            "harnessCPUTime": (own.ru_utime - self._self.ru_utime)
+            + (own.ru_stime - self._self.ru_stime),
+        }
+
+
+class PhaseTimer:
+    """Accumulates the wall-clock time spent in the phases of a task.
+
+    The timer is always in exactly one phase (after ``switch`` has first been
+    called), and time is attributed to that phase until the next switch.
+    """
+
+    phases: Dict[str, float]
+
+    def __init__(self):
+        self.phases = {}
+        self.current = None
+        self._start = time.perf_counter()
+
+    def switch(self, phase: Optional[str]):
+        now = time.perf_counter()
+        if self.current is not None:
+            self.phases[self.current] = (
+                self.phases.get(self.current, 0.0) + now - self._start
+            )
+        self.current = phase
+        self._start = now
+
+    def stop(self, flat_time: Optional[float] = None) -> Dict[str, float]:
+        """Stop timing and report the time spent in each phase
+
+        Args:
+            flat_time (Optional[float]): The flattening time reported by
+                MiniZinc, which is used to split the time spent waiting for
+                MiniZinc into flattening and solving time.
+
+        Returns:
+            Dict[str, float]: The phase statistics, and the total overhead of the
+                harness (setup, serialisation and teardown).
+        """
+        self.switch(None)
+        phases = {
+            p: self.phases.get(p, 0.0)
+            for p in ["setup", "flatten", "solve", "serialise", "teardown"]
+        }
+        if flat_time is not None:
+            phases["flatten"] = min(flat_time, phases["solve"])
+            phases["solve"] -= phases["flatten"]
+        stats = {f"phase{p.capitalize()}Time": t for p, t in phases.items()}
+        stats["overheadTime"] = (
+            phases["setup"] + phases["serialise"] + phases["teardown"]
+        )
+        return stats
@@ -2,27 +2,35 @@
 import asyncio
 import csv
 import json
+import logging
 import os
+import signal
+import subprocess
 import sys
 import time
 import traceback
 from dataclasses import asdict, dataclass, field, fields
 from datetime import timedelta
 from pathlib import Path
-from typing import Any, Dict, Iterable, NoReturn, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NoReturn, Optional, Tuple
 import minizinc
-from ruamel.yaml import YAML
 
-yaml = YAML(typ="safe")
-yaml.register_class(minizinc.types.ConstrEnum)
-yaml.register_class(minizinc.types.AnonEnum)
-yaml.default_flow_style = False
+from mzn_bench.driver_cache import cached_driver, track_processes
+from mzn_bench.instrument import PhaseTimer, ResourceMonitor
+from mzn_bench.node import node_info, node_speed
+from mzn_bench.results import COMPRESSION_SUFFIXES, SolutionStore, write_statistics
+from mzn_bench.watchdog import KILL_GRACE, terminate_tree
 
-if os.environ.get("MZN_DEBUG", "OFF") == "ON":
-    import logging
+if TYPE_CHECKING:
+    from mzn_bench.fake import FakeSolver
+    from mzn_bench.pinning import Pinning
+    from mzn_bench.result_cache import ResultCache
 
+if os.environ.get("MZN_DEBUG", "OFF") == "ON":
     logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class Configuration:
@@ -70,7 +78,9 @@ class Configuration:
                 assert len(split) == 2
                 identifier = split[0]
                 version = split[1]
-            obj["solver"] = minizinc.Solver.lookup(identifier)
+            obj["solver"] = minizinc.Solver.lookup(
+                identifier, driver=cached_driver(obj["minizinc"])
+            )
             if version is not None:
                 assert obj["solver"].version == version
 
@@ -114,7 +124,27 @@ def schedule(
     debug: bool = False,
     nice: Optional[int] = None,
     wait: bool = False,
+    fake: Optional["FakeSolver"] = None,
+    concurrency: Optional[int] = 1,
+    tasks_per_job: Optional[int] = None,
+    solution_store: Optional[SolutionStore] = None,
+    archive: bool = False,
+    compression: Optional[str] = None,
+    result_cache: Optional["ResultCache"] = None,
+    tasks: Optional[Iterable[int]] = None,
+    calibrate: bool = False,
+    pinning: Optional["Pinning"] = None,
+    checkpoint_interval: Optional[timedelta] = timedelta(minutes=1),
+    watchdog: Optional[timedelta] = timedelta(seconds=10),
 ) -> NoReturn:
+    if result_cache is not None and archive:
+        raise ValueError("A result cache cannot be used together with an archive")
+    if compression is not None and compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(
+            f"Unknown compression method '{compression}', "
+            f"expected one of {list(COMPRESSION_SUFFIXES)}"
+        )
+
     # Count number of instances
     assert instances.exists()
     num_instances = sum(1 for line in instances.open()) - 1
@@ -131,31 +161,112 @@ def schedule(
         [conf.to_dict() for conf in configurations], cls=_JSONEnc
     )
     env["MZN_SLURM_TIMEOUT"] = str(int(timeout / timedelta(milliseconds=1)))
+    env.pop("MZN_SLURM_FAKE", None)
+    if fake is not None:
+        env["MZN_SLURM_FAKE"] = json.dumps(asdict(fake))
+    env["MZN_SLURM_SOLUTIONS"] = json.dumps(asdict(solution_store or SolutionStore()))
+    env["MZN_SLURM_ARCHIVE"] = "ON" if archive else "OFF"
+    env["MZN_SLURM_CALIBRATE"] = "ON" if calibrate else "OFF"
+    env.pop("MZN_SLURM_COMPRESSION", None)
+    if compression is not None:
+        env["MZN_SLURM_COMPRESSION"] = compression
+    env.pop("MZN_SLURM_PINNING", None)
+    if pinning is not None:
+        env["MZN_SLURM_PINNING"] = json.dumps(asdict(pinning))
+    env["MZN_SLURM_MEMORY"] = str(memory)
+    env.pop("MZN_SLURM_WATCHDOG", None)
+    if watchdog is not None:
+        env["MZN_SLURM_WATCHDOG"] = str(int(watchdog / timedelta(milliseconds=1)))
+    env.pop("MZN_SLURM_CHECKPOINT", None)
+    if checkpoint_interval is not None:
+        env["MZN_SLURM_CHECKPOINT"] = str(
+            int(checkpoint_interval / timedelta(milliseconds=1))
+        )
+
+    n_tasks = num_instances * len(configurations)
+    env.pop("MZN_SLURM_TASK_LIST", None)
+    env.pop("MZN_SLURM_RESULT_CACHE", None)
+    if tasks is not None or result_cache is not None:
+        task_ids = list(range(n_tasks)) if tasks is None else sorted(set(tasks))
+        remaining = [(i, "") for i in task_ids if i < n_tasks]
+        if result_cache is not None:
+            # Only run the tasks for which no result has been cached
+            remaining = _link_cached_tasks(
+                instances,
+                output_dir,
+                configurations,
+                timeout,
+                fake,
+                solution_store or SolutionStore(),
+                compression,
+                result_cache,
+                [i for i, _ in remaining],
+            )
+            logger.info(
+                "Reusing %d of %d results from the result cache",
+                len(task_ids) - len(remaining),
+                len(task_ids),
+            )
+            env["MZN_SLURM_RESULT_CACHE"] = str(Path(result_cache.path).resolve())
+        task_list = output_dir / "minizinc_slurm_tasks.txt"
+        task_list.write_text("".join(f"{i} {key}\n" for i, key in remaining))
+        env["MZN_SLURM_TASK_LIST"] = str(task_list.resolve())
+        n_tasks = len(remaining)
+        if n_tasks == 0:
+            return
 
     slurm_output = "/dev/null"
     if debug:
         slurm_output = f"{output_dir.resolve()}/minizinc_slurm-%A_%a.out"
         env["MZN_DEBUG"] = "ON"
 
-    n_tasks = num_instances * len(configurations)
     instances = str(instances.resolve())
     output_dir = str(output_dir.resolve())
 
+    # Number of tasks run by each job, and how many of those run concurrently
+    if tasks_per_job is None:
+        tasks_per_job = 1 if concurrency is None else concurrency
+    if nodelist is None:
+        tasks_per_job = n_tasks
+    parallel = tasks_per_job if concurrency is None else min(concurrency, tasks_per_job)
+    env["MZN_SLURM_TASKS_PER_JOB"] = str(tasks_per_job)
+    env["MZN_SLURM_CONCURRENCY"] = str(0 if concurrency is None else concurrency)
+    env["MZN_SLURM_CPUS_PER_TASK"] = str(cpus_per_task)
+
     if nodelist is None:
         os.environ.update(env)
-        for i in range(n_tasks):  # simulate environment like SLURM
-            os.environ["SLURM_ARRAY_TASK_ID"] = str(i + 1)
-            main(Path(instances), Path(output_dir))
+        for var in [
+            "MZN_SLURM_FAKE",
+            "MZN_SLURM_COMPRESSION",
+            "MZN_SLURM_PINNING",
+            "MZN_SLURM_CHECKPOINT",
+            "MZN_SLURM_WATCHDOG",
+            "MZN_SLURM_TASK_LIST",
+            "MZN_SLURM_RESULT_CACHE",
+        ]:
+            if var not in env:
+                os.environ.pop(var, None)
+        # simulate environment like SLURM, running all tasks in a single job
+        os.environ["SLURM_ARRAY_TASK_ID"] = "1"
+        main(Path(instances), Path(output_dir))
         return
+    n_jobs = -(-n_tasks // tasks_per_job)
+    waves = -(-tasks_per_job // max(parallel, 1))
+    # Set hard timeout as failsafe, which can be tight when the watchdog
+    # enforces the time budget of every task
+    time_limit = timeout * waves + timedelta(minutes=1)
+    if watchdog is not None:
+        budget = timeout + watchdog + timedelta(seconds=KILL_GRACE)
+        time_limit = budget * waves + timedelta(seconds=30)
     cmd = [
         "sbatch",
         f"--output={slurm_output}",
         f'--job-name="{job_name}"',
-        f"--cpus-per-task={cpus_per_task}",
-        f"--mem={memory}",
+        f"--cpus-per-task={cpus_per_task * parallel}",
+        f"--mem={memory * parallel}",
         f"--nodelist={','.join(nodelist)}",
-        f"--array=1-{n_tasks}",
-        f"--time={timeout + timedelta(minutes=1)}",  # Set hard timeout as failsafe
+        f"--array=1-{n_jobs}",
+        f"--time={time_limit}",
     ]
     if nice is not None:
         cmd.append(f"--nice={nice}")
@@ -169,6 +280,11 @@ def schedule(
         ]
     )
 
+    if wait:
+        # Wait for the jobs to finish, and then return to the caller
+        subprocess.run(cmd, env=env, check=True)
+        return
+
     # Replace current process with the correct sbatch call
     os.execvpe(
         "sbatch",
@@ -178,18 +294,97 @@ def schedule(
 
 
 async def run_instance(
-    problem, model, data, config, timeout, stat_base, sol_file, stats_file
+    problem,
+    model,
+    data,
+    config,
+    timeout,
+    stat_base,
+    sol_file,
+    stats_file,
+    fake=None,
+    solution_store=None,
+    archive=None,
+    node=None,
+    placement=None,
+    checkpoint_interval=None,
+    watchdog=None,
 ):
     statistics = stat_base.copy()
+    if node is not None:
+        statistics.update(node)
+    if placement is not None and placement.cpus is not None and fake is None:
+        statistics["cpuSet"] = ",".join(map(str, placement.cpus))
+    monitor = ResourceMonitor()
+    phases = PhaseTimer()
     start = time.perf_counter()
+    cancelled = False
+    monitor.start()
+    phases.switch("setup")
+
+    def write(statistics):
+        if archive is not None:
+            archive.write_statistics(stats_file.name[: -len("_stats.yml")], statistics)
+        else:
+            write_statistics(stats_file, statistics)
+
+    async def checkpoint():
+        # Periodically write the latest statistics, which are replaced by the
+        # final statistics, so that a task that is killed reports its progress
+        while True:
+            await asyncio.sleep(checkpoint_interval)
+            partial = {
+                key: val.total_seconds() if isinstance(val, timedelta) else val
+                for key, val in statistics.items()
+            }
+            partial["time"] = time.perf_counter() - start
+            partial["peakRSS"] = monitor.peak_rss / 2**20
+            partial["partial"] = True
+            write(partial)
+
+    task = asyncio.current_task()
+    root = None  # The MiniZinc process of the task
+    overrun = None  # The phase in which the task exceeded its time budget
+    finishing = False
+
+    def started(pid):
+        nonlocal root
+        root = pid
+        monitor.track(pid)
+
+    async def enforce_budget():
+        # Terminate the processes of the task when it exceeds its time budget
+        nonlocal overrun
+        await asyncio.sleep(timeout.total_seconds() + watchdog)
+        overrun = phases.current
+        status = statistics.get("status", str(minizinc.result.Status.UNKNOWN))
+        unknown = status == str(minizinc.result.Status.UNKNOWN)
+        if overrun == "solve" and unknown and "flatTime" not in statistics:
+            # Without solutions or flattening statistics, MiniZinc is still flattening
+            overrun = "flatten"
+        if root is not None:
+            await terminate_tree(root)
+        if not finishing:
+            task.cancel()
+
+    checkpointer, enforcer = None, None
+    if checkpoint_interval is not None:
+        checkpointer = asyncio.ensure_future(checkpoint())
+    if watchdog is not None:
+        enforcer = asyncio.ensure_future(enforce_budget())
     try:
-        driver = minizinc.default_driver
-        if config.minizinc is not None:
-            assert config.minizinc.exists()
-            driver = minizinc.Driver(config.minizinc)
         model = minizinc.Model(model)
         model.output_type = dict
-        instance = minizinc.Instance(config.solver, model, driver)
+        if fake is not None:
+            instance = fake.instance(
+                model, f"{config.name}:{stat_base['model']}:{stat_base['data_file']}"
+            )
+        else:
+            if config.minizinc is not None:
+                assert config.minizinc.exists()
+            # The cached driver reports the MiniZinc process that it starts
+            driver = cached_driver(config.minizinc)
+            instance = minizinc.Instance(config.solver, model, driver)
         for path in data:
             instance.add_file(path, parse_data=False)
         is_satisfaction = instance.method == minizinc.Method.SATISFY
@@ -197,8 +392,15 @@ async def run_instance(
         for key, value in config.extra_data.items():
             instance[key] = value
 
-        with sol_file.open(mode="w") as file:
-            async for result in instance.solutions(
+        store = solution_store if solution_store is not None else SolutionStore()
+        if archive is not None:
+            writer = archive.solution_writer(sol_file.name[: -len("_sol.yml")], store)
+        else:
+            writer = store.writer(sol_file)
+        # The MiniZinc process is reported by the cached driver once started
+        with writer, track_processes(started):
+            phases.switch("solve")
+            solutions = instance.solutions(
                 timeout=timeout,
                 processes=config.processes,
                 random_seed=config.random_seed,
@@ -206,7 +408,11 @@ async def run_instance(
                 free_search=config.free_search,
                 optimisation_level=config.optimisation_level,
                 **config.other_flags,
-            ):
+            )
+            if placement is not None and fake is None:
+                solutions = placement.run(solutions)
+            async for result in solutions:
+                phases.switch("serialise")
                 solution = stat_base.copy()
                 solution["status"] = str(result.status)
                 if "time" in result.statistics:
@@ -225,96 +431,327 @@ async def run_instance(
                     solution["solution"] = result.solution
                     solution["solution"].pop("_output_item", None)
                     solution["solution"].pop("_checker", None)
-                yaml.dump([solution], file)
+                writer.write(solution)
 
                 statistics.update(result.statistics)
                 statistics["status"] = str(result.status)
                 if result.solution is not None and not is_satisfaction:
                     statistics["objective"] = result.solution["objective"]
+                phases.switch("solve")
+            phases.switch("teardown")
     except minizinc.MiniZincError as err:
-        statistics["status"] = str(minizinc.result.Status.ERROR)
+        if overrun is None:
+            statistics["status"] = str(minizinc.result.Status.ERROR)
         statistics["error"] = str(err)
-
-    total_time = time.perf_counter() - start
-    statistics["time"] = time.perf_counter() - start
+    except asyncio.CancelledError:
+        if overrun is None:
+            # Record the progress made before the task was cancelled
+            statistics["error"] = "Task was cancelled"
+            cancelled = True
+        elif hasattr(task, "uncancel"):
+            task.uncancel()
+    finally:
+        finishing = True
+        if checkpointer is not None:
+            checkpointer.cancel()
+        if enforcer is not None and overrun is None:
+            enforcer.cancel()
+        elif enforcer is not None:
+            try:
+                await enforcer  # Kill the processes that ignore SIGTERM
+            except asyncio.CancelledError:
+                cancelled = True
+
+    if overrun is not None:
+        # Keep the status (and objective) reached within the time budget
+        statistics["error"] = f"Exceeded the time budget in the {overrun} phase"
+        statistics["overrun"] = overrun
+
+    phases.switch("teardown")
+    statistics.update(monitor.stop())
 
     for key, val in statistics.items():
         if isinstance(val, timedelta):
             statistics[key] = val.total_seconds()
+    # The phases end when the final statistics are written (which is not
+    # included), at the same time as the task, so that they add up to its time
+    statistics.update(phases.stop(statistics.get("flatTime", None)))
+    statistics["time"] = time.perf_counter() - start
 
-    with open(stats_file, "w") as file:
-        yaml.dump(statistics, file)
+    write(statistics)
+    if cancelled:
+        raise asyncio.CancelledError
+
+
+def _available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _select_tasks(instances, first, count, n_configurations, task_ids=None):
+    """Select the instance and configuration of a range of task identifiers
+
+    Yields the row number, the selected instance, and the configuration index
+    of each task from ``first`` to ``first + count`` (exclusive, and counting
+    from zero), reading the instances file only once. Tasks beyond the end of
+    the instances file are ignored. If a (sorted) list of task identifiers is
+    given, then the tasks are instead taken from its range.
+    """
+    if task_ids is None:
+        task_ids = range(first + count)
+    with open(instances) as instances_file:
+        reader = csv.reader(instances_file, dialect="unix")
+        next(reader)  # Skip the header line
+        row = 0
+        for task_id in task_ids[first : first + count]:
+            while row <= task_id // n_configurations:
+                selected_instance = next(reader, None)
+                row = row + 1
+                if selected_instance is None:
+                    return
+            yield row, selected_instance, task_id % n_configurations
 
 
-def main(instances, output_dir):
-    filename = "minizinc_slurm"
-    try:
-        task_id = int(os.environ["SLURM_ARRAY_TASK_ID"]) - 1
-        timeout = timedelta(milliseconds=int(os.environ["MZN_SLURM_TIMEOUT"]))
-        configurations = json.loads(os.environ["MZN_SLURM_CONFIGS"], cls=_JSONDec)
-
-        # Select instance and configuration based on SLURM_ARRAY_TASK_ID
-        with open(instances) as instances_file:
-            reader = csv.reader(instances_file, dialect="unix")
-            next(reader)  # Skip the header line
-            row = 1
-            while task_id >= len(configurations):
-                next(reader)  # Skip non-selected instances
-                task_id = task_id - len(configurations)
-                row = row + 1
-            selected_instance = next(reader)
-
-        # Deserialise Configuration
-        config = configurations[task_id]
-        # TODO: workaround because we might not know the solver in the system MiniZinc
-        if config["minizinc"] is not None:
-            mzn_path = Path(config["minizinc"])
-            assert mzn_path.exists()
-            minizinc.Driver(mzn_path).make_default()
-        config = Configuration.from_dict(config)
-
-        filename = f"{row}_{config.name}"
-
-        # Process instance
-        problem = selected_instance[0]
-
-        model = Path(selected_instance[1])
-        if not model.is_absolute():
-            model = instances.parent / model
-
-        data = []
-        for file in selected_instance[2].split(":"):
-            if file != "":
-                path = Path(selected_instance[2])
-                if not path.is_absolute():
-                    path = instances.parent / file
-                data.append(path)
-
-        stat_base = {
-            "problem": selected_instance[0],
-            "model": selected_instance[1],
-            "data_file": selected_instance[2],
-            "configuration": config.name,
-            "status": str(minizinc.result.Status.UNKNOWN),
-        }
-
-        # Run instance
-        asyncio.run(
-            run_instance(
+def _instance_files(instances: Path, selected_instance) -> Tuple[Path, List[Path]]:
+    """The model and data files of an instance (relative to the instances file)"""
+    model = Path(selected_instance[1])
+    if not model.is_absolute():
+        model = instances.parent / model
+
+    data = []
+    for file in selected_instance[2].split(":"):
+        if file != "":
+            path = Path(file)
+            if not path.is_absolute():
+                path = instances.parent / file
+            data.append(path)
+    return model, data
+
+
+def _link_cached_tasks(
+    instances: Path,
+    output_dir: Path,
+    configurations,
+    timeout: timedelta,
+    fake: Optional["FakeSolver"],
+    solution_store: SolutionStore,
+    compression: Optional[str],
+    result_cache: "ResultCache",
+    task_ids: List[int],
+) -> List[Tuple[int, str]]:
+    """Link the cached results of tasks into the output directory
+
+    Returns the identifier and cache key of each of the given tasks without a
+    cached result.
+    """
+    from mzn_bench.result_cache import task_key
+
+    configurations = list(configurations)
+    versions = []
+    for config in configurations:
+        minizinc_version = None
+        if fake is None:
+            driver = cached_driver(config.minizinc)
+            if driver is not None:
+                minizinc_version = ".".join(map(str, driver.parsed_version))
+        versions.append((config.solver.version, minizinc_version))
+    dicts = [json.loads(json.dumps(c.to_dict(), cls=_JSONEnc)) for c in configurations]
+
+    remaining = []
+    tasks = _select_tasks(instances, 0, len(task_ids), len(configurations), task_ids)
+    for task_id, (row, selected_instance, index) in zip(task_ids, tasks):
+        model, data = _instance_files(instances.resolve(), selected_instance)
+        key = task_key(
+            dicts[index],
+            selected_instance,
+            [model] + data,
+            timeout,
+            *versions[index],
+            fake=None if fake is None else asdict(fake),
+            solution_store=asdict(solution_store),
+            compression=compression,
+        )
+        filename = f"{row}_{configurations[index].name}"
+        if not result_cache.link(key, output_dir, filename):
+            remaining.append((task_id, key))
+    return remaining
+
+
+async def run_tasks(instances, output_dir, first, count, concurrency):
+    """Run a range of tasks concurrently within a single event loop
+
+    At most ``concurrency`` tasks are run at the same time, where every
+    concurrent worker is given its own CPUs when pinning is enabled (which can
+    reduce the concurrency when there are not enough CPUs). When the process
+    receives SIGTERM (e.g., when SLURM cancels the job), the running tasks are
+    cancelled, which terminates their MiniZinc processes and writes their
+    statistics.
+    """
+    timeout = timedelta(milliseconds=int(os.environ["MZN_SLURM_TIMEOUT"]))
+    configurations = json.loads(os.environ["MZN_SLURM_CONFIGS"], cls=_JSONDec)
+    fake = None
+    if "MZN_SLURM_FAKE" in os.environ:
+        from mzn_bench.fake import FakeSolver
+
+        fake = FakeSolver(**json.loads(os.environ["MZN_SLURM_FAKE"]))
+    solution_store = SolutionStore(
+        **json.loads(os.environ.get("MZN_SLURM_SOLUTIONS", "{}"))
+    )
+    watchdog = None
+    if "MZN_SLURM_WATCHDOG" in os.environ:
+        watchdog = int(os.environ["MZN_SLURM_WATCHDOG"]) / 1000
+    checkpoint_interval = None
+    if "MZN_SLURM_CHECKPOINT" in os.environ:
+        checkpoint_interval = int(os.environ["MZN_SLURM_CHECKPOINT"]) / 1000
+    node = node_info()
+    if os.environ.get("MZN_SLURM_CALIBRATE", "OFF") == "ON":
+        # Calibrate before running any tasks, to avoid measuring their load
+        node["nodeSpeed"] = node_speed(node)
+    compression = os.environ.get("MZN_SLURM_COMPRESSION", None)
+    suffix = "" if compression is None else COMPRESSION_SUFFIXES[compression]
+    task_ids, keys, result_cache = None, {}, None
+    if "MZN_SLURM_TASK_LIST" in os.environ:
+        with open(os.environ["MZN_SLURM_TASK_LIST"]) as file:
+            for line in file:
+                task_id, *key = line.split()
+                keys[int(task_id)] = key[0] if len(key) > 0 else None
+        task_ids = sorted(keys)
+    if "MZN_SLURM_RESULT_CACHE" in os.environ:
+        from mzn_bench.result_cache import ResultCache
+
+        result_cache = ResultCache(Path(os.environ["MZN_SLURM_RESULT_CACHE"]))
+    archive = None
+    if os.environ.get("MZN_SLURM_ARCHIVE", "OFF") == "ON":
+        from mzn_bench.archive import Archive, archive_path
+
+        job = os.environ["SLURM_ARRAY_TASK_ID"]
+        archive = Archive(archive_path(output_dir, job), compress=suffix != "")
+        suffix = ""
+
+    placements = [None] * max(1, concurrency)
+    if "MZN_SLURM_PINNING" in os.environ:
+        from mzn_bench.pinning import Pinning, Placement, core_sets
+
+        pinning = Pinning(**json.loads(os.environ["MZN_SLURM_PINNING"]))
+        memory = None
+        if pinning.limit_memory:
+            memory = int(os.environ.get("MZN_SLURM_MEMORY", "4096")) * 2**20
+        sets = core_sets(
+            len(placements),
+            int(os.environ.get("MZN_SLURM_CPUS_PER_TASK", "1")),
+            pinning.avoid_smt,
+            pinning.avoid_numa,
+        )
+        if len(sets) > 0:
+            placements = [Placement(cpus, memory) for cpus in sets]
+
+    # Deserialise every Configuration only once
+    deserialised = {}
+
+    def configuration(index):
+        if index not in deserialised:
+            config = configurations[index]
+            # TODO: workaround because we might not know the solver in the system MiniZinc
+            if config["minizinc"] is not None:
+                mzn_path = Path(config["minizinc"])
+                assert mzn_path.exists()
+                cached_driver(mzn_path).make_default()
+            deserialised[index] = Configuration.from_dict(config)
+        return deserialised[index]
+
+    async def run_task(row, selected_instance, index, placement=None):
+        filename = "minizinc_slurm"
+        try:
+            config = configuration(index)
+            filename = f"{row}_{config.name}"
+
+            # Process instance
+            problem = selected_instance[0]
+            model, data = _instance_files(instances, selected_instance)
+
+            stat_base = {
+                "problem": selected_instance[0],
+                "model": selected_instance[1],
+                "data_file": selected_instance[2],
+                "configuration": config.name,
+                "status": str(minizinc.result.Status.UNKNOWN),
+            }
+
+            # Run instance
+            await run_instance(
                 problem,
                 model,
                 data,
                 config,
                 timeout,
                 stat_base,
-                output_dir / f"{filename}_sol.yml",
-                output_dir / f"{filename}_stats.yml",
+                output_dir / f"{filename}_sol.yml{suffix}",
+                output_dir / f"{filename}_stats.yml{suffix}",
+                fake,
+                solution_store,
+                archive,
+                node,
+                placement,
+                checkpoint_interval,
+                watchdog,
             )
-        )
+
+            key = keys.get((row - 1) * len(configurations) + index, None)
+            if result_cache is not None and key is not None:
+                try:
+                    result_cache.store(key, output_dir, filename)
+                except OSError:
+                    pass  # The cache is an optimisation only
+        except Exception:
+            if "SLURM_JOB_NODELIST" not in os.environ:
+                raise
+            if archive is not None:
+                archive.write_error(filename, f"ERROR: {traceback.format_exc()}")
+            else:
+                file = output_dir / f"{filename}_err.txt"
+                file.write_text(f"ERROR: {traceback.format_exc()}")
+
+    # A fixed number of workers take tasks from the (shared) task iterator
+    tasks = _select_tasks(instances, first, count, len(configurations), task_ids)
+
+    async def worker(placement):
+        for task in tasks:
+            await run_task(*task, placement)
+
+    workers = asyncio.gather(*(worker(p) for p in placements))
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, workers.cancel)
+    except (NotImplementedError, RuntimeError):
+        pass  # Signal handlers are not supported (e.g., on Windows)
+    try:
+        await workers
+    except asyncio.CancelledError:
+        pass
+    finally:
+        try:
+            loop.remove_signal_handler(signal.SIGTERM)
+        except (NotImplementedError, RuntimeError):
+            pass
+        if archive is not None:
+            archive.close()
+
+
+def main(instances, output_dir):
+    try:
+        tasks_per_job = int(os.environ.get("MZN_SLURM_TASKS_PER_JOB", "1"))
+        first = (int(os.environ["SLURM_ARRAY_TASK_ID"]) - 1) * tasks_per_job
+        # Run as many tasks concurrently as requested, and as the available CPUs allow
+        cpus_per_task = int(os.environ.get("MZN_SLURM_CPUS_PER_TASK", "1"))
+        available = max(1, _available_cpus() // cpus_per_task)
+        concurrency = int(os.environ.get("MZN_SLURM_CONCURRENCY", "1"))
+        concurrency = available if concurrency <= 0 else min(concurrency, available)
+        asyncio.run(run_tasks(instances, output_dir, first, tasks_per_job, concurrency))
     except Exception:
         if "SLURM_JOB_NODELIST" not in os.environ:
             raise
-        file = output_dir / f"{filename}_err.txt"
+        file = output_dir / "minizinc_slurm_err.txt"
         file.write_text(f"ERROR: {traceback.format_exc()}")
 
 
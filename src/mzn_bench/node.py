@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from mzn_bench.driver_cache import cache_dir
+
+CPUINFO = Path("/proc/cpuinfo")
+
+# Number of repetitions of the calibration benchmark (the fastest is used)
+CALIBRATION_REPEAT = 5
+
+
+def cpu_model() -> str:
+    """The model name of the CPU, or an empty string if it is unknown"""
+    try:
+        with CPUINFO.open() as file:
+            for line in file:
+                key, _, value = line.partition(":")
+                if key.strip() in ["model name", "Model"]:
+                    return value.strip()
+    except OSError:
+        pass
+    if sys.platform == "darwin":
+        import subprocess
+
+        output = subprocess.run(
+            ["sysctl", "-n", "machdep.cpu.brand_string"],
+            capture_output=True,
+            text=True,
+        )
+        return output.stdout.strip()
+    return ""
+
+
+def node_info() -> Dict[str, Any]:
+    """The hostname and CPU model of the node running the tasks"""
+    return {"hostname": socket.gethostname(), "cpuModel": cpu_model()}
+
+
+def _workload() -> int:
+    # A fixed mix of integer arithmetic, branching, and memory access, similar
+    # to the work done by (search-based) solvers
+    rng = random.Random(0)
+    values = [rng.randrange(1 << 20) for _ in range(100_000)]
+    values.sort()
+    table: Dict[int, int] = {}
+    total = 0
+    for i, v in enumerate(values):
+        total = (total * 31 + v) & 0xFFFFFFFF
+        if v & 1:
+            table[v % 4096] = table.get(v % 4096, 0) + i
+        else:
+            total ^= table.get(i % 4096, 0)
+    return total
+
+
+def calibrate() -> float:
+    """Run the calibration benchmark
+
+    Returns:
+        float: The speed of the node, as the number of times the calibration
+            workload can be run per second
+    """
+    best = None
+    for _ in range(CALIBRATION_REPEAT):
+        start = time.perf_counter()
+        _workload()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return 1.0 / best
+
+
+def node_speed(info: Optional[Dict[str, Any]] = None) -> float:
+    """The speed of the node, using the node-local cache
+
+    The calibration benchmark is only run once per node (and CPU model and
+    Python version). Its result is stored in the ``calibration`` directory of
+    the node-local cache (see ``driver_cache.cache_dir``).
+
+    Args:
+        info (Optional[Dict[str, Any]]): The node information, as given by
+            ``node_info``
+
+    Returns:
+        float: The speed of the node (see ``calibrate``)
+    """
+    info = info if info is not None else node_info()
+    key = [info["hostname"], info["cpuModel"], sys.version]
+    key = hashlib.sha1("\0".join(key).encode()).hexdigest()
+    directory = cache_dir()
+    file = None if directory is None else directory / "calibration" / f"{key}.json"
+    if file is not None and file.exists():
+        try:
+            return float(json.loads(file.read_text())["nodeSpeed"])
+        except (OSError, ValueError, KeyError):
+            pass  # Corrupt cache entry, calibrate again
+
+    speed = calibrate()
+    if file is not None:
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            # Write atomically, since other tasks on this node might read it
+            fd, tmp = tempfile.mkstemp(dir=file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(dict(info, nodeSpeed=speed), f)
+            os.replace(tmp, file)
+        except OSError:
+            pass  # The cache is an optimisation only
+    return speed
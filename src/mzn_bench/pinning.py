@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import os
+import resource
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from mzn_bench.driver_cache import track_processes
+
+logger = logging.getLogger(__name__)
+
+SYSFS_CPU = Path("/sys/devices/system/cpu")
+SYSFS_NODE = Path("/sys/devices/system/node")
+
+
+@dataclass
+class Pinning:
+    """Determines how the tasks running concurrently on a node are isolated.
+
+    Every worker that runs tasks concurrently (see ``concurrency`` in
+    ``schedule``) is given a dedicated set of ``cpus_per_task`` CPUs, and the
+    MiniZinc and solver processes of its tasks are pinned to these CPUs. The
+    MiniZinc process of every task is also limited to ``memory`` MiB of virtual
+    address space (``RLIMIT_AS``), which is inherited by the solver it starts,
+    so that a runaway task fails instead of slowing down the others. Note that
+    this is a limit on every process, rather than a budget for the task as a
+    whole, and that it limits the address space rather than the resident
+    memory: solvers that reserve a lot of virtual memory (e.g., on the JVM, or
+    with many threads) can fail well below their actual memory usage, in which
+    case ``limit_memory`` should be disabled.
+
+    Pinning requires ``sched_setaffinity`` (i.e., Linux), and has no effect
+    on tasks run using the fake solver backend.
+
+    Attributes:
+        avoid_smt (bool): Only use a single CPU of every physical core, leaving
+            its SMT siblings idle, so that tasks do not share cores
+        avoid_numa (bool): Do not place a task on CPUs of different NUMA nodes
+        limit_memory (bool): Whether to limit the address space of the processes
+    """
+
+    avoid_smt: bool = True
+    avoid_numa: bool = True
+    limit_memory: bool = True
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """Parse a CPU list as used by the kernel (e.g., ``0-3,8,10-11``)"""
+    cpus = []
+    for part in text.strip().split(","):
+        if part == "":
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def cpu_topology(cpus: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+    """The NUMA node and physical core of every CPU
+
+    Physical cores are identified by their first (SMT sibling) CPU. When the
+    topology is not available, every CPU is its own core on node 0.
+    """
+    nodes: Dict[int, int] = {}
+    try:
+        for entry in SYSFS_NODE.glob("node[0-9]*"):
+            for cpu in parse_cpu_list((entry / "cpulist").read_text()):
+                nodes[cpu] = int(entry.name[len("node") :])
+    except (OSError, ValueError):
+        nodes = {}
+
+    topology = {}
+    for cpu in cpus:
+        core = cpu
+        try:
+            siblings = SYSFS_CPU / f"cpu{cpu}" / "topology" / "thread_siblings_list"
+            core = min(parse_cpu_list(siblings.read_text()))
+        except (OSError, ValueError):
+            pass
+        topology[cpu] = (nodes.get(cpu, 0), core)
+    return topology
+
+
+def core_sets(
+    count: int, size: int, avoid_smt: bool = True, avoid_numa: bool = True
+) -> List[List[int]]:
+    """Divide the available CPUs into disjoint sets
+
+    Args:
+        count (int): The (maximum) number of sets
+        size (int): The number of CPUs in every set
+        avoid_smt (bool): Only use a single CPU of every physical core
+        avoid_numa (bool): Only create sets within a single NUMA node, unless
+            no set fits within a node
+
+    Returns:
+        List[List[int]]: The CPU sets, alternating between NUMA nodes. Fewer
+            than ``count`` sets are returned when there are not enough CPUs.
+    """
+    topology = cpu_topology(sorted(os.sched_getaffinity(0)))
+    # Group the CPUs by node, keeping the SMT siblings of a core together
+    units: Dict[int, List[int]] = {}
+    seen = set()
+    for cpu, (node, core) in sorted(topology.items(), key=lambda t: (t[1], t[0])):
+        if avoid_smt and (node, core) in seen:
+            continue
+        seen.add((node, core))
+        units.setdefault(node, []).append(cpu)
+
+    groups = list(units.values()) if avoid_numa else [sum(units.values(), [])]
+    if all(len(group) < size for group in groups):
+        groups = [sum(groups, [])]
+    per_group = [
+        [group[i : i + size] for i in range(0, len(group) - size + 1, size)]
+        for group in groups
+    ]
+    sets = []
+    for i in range(max(map(len, per_group), default=0)):
+        sets.extend(group[i] for group in per_group if i < len(group))
+    return sets[:count]
+
+
+# Only a single task at a time can start its process, since the affinity of
+# the harness is changed while it is started
+_spawn_lock: Optional[asyncio.Lock] = None
+
+
+@dataclass
+class Placement:
+    """The CPUs and memory limit of the processes of a task
+
+    Attributes:
+        cpus (Optional[List[int]]): The CPUs to which the processes are pinned,
+            or None to not pin the processes
+        memory (Optional[int]): The limit on the address space of every process
+            (in bytes), or None for no limit
+    """
+
+    cpus: Optional[List[int]] = None
+    memory: Optional[int] = None
+
+    async def run(self, solutions: AsyncIterator) -> AsyncIterator:
+        """Start the processes of a task (i.e., a MiniZinc solutions iterator)
+
+        The affinity of the harness is set to the CPUs of the task while the
+        MiniZinc process is started, so that it (and its solver process) is
+        pinned from the start. The limit on the address space is set on the
+        MiniZinc process as soon as it is started (as reported by its
+        ``CachedDriver``), so that the solver process inherits it. A limit that
+        cannot be set is logged as a warning.
+        """
+        global _spawn_lock
+        if _spawn_lock is None:
+            _spawn_lock = asyncio.Lock()
+        spawned = asyncio.Event()
+
+        def started(pid: int):
+            self._limit(pid)
+            spawned.set()
+
+        async with _spawn_lock:
+            if self.cpus is not None:
+                original = os.sched_getaffinity(0)
+                os.sched_setaffinity(0, self.cpus)
+            with track_processes(started):
+                first = asyncio.ensure_future(solutions.__anext__())
+            waiter = asyncio.ensure_future(spawned.wait())
+            try:
+                await asyncio.wait([first, waiter], return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                first.cancel()
+                raise
+            finally:
+                waiter.cancel()
+                if self.cpus is not None:
+                    os.sched_setaffinity(0, original)
+
+        try:
+            result = await first
+        except StopAsyncIteration:
+            return
+        yield result
+        async for result in solutions:
+            yield result
+
+    def _limit(self, pid: int):
+        if self.memory is None:
+            return
+        try:
+            resource.prlimit(pid, resource.RLIMIT_AS, (self.memory, self.memory))
+        except ProcessLookupError:
+            pass  # The process has already terminated
+        except (OSError, ValueError) as err:
+            logger.warning("Could not limit the memory of process %d: %s", pid, err)
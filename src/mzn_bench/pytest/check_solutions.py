@@ -1,6 +1,6 @@
 import random
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from datetime import timedelta
 
 import pytest
@@ -8,7 +8,39 @@ from _pytest.config import Config
 from minizinc import Model, Solver, Status
 from minizinc.helpers import check_solution
 import minizinc
-from mzn_bench import yaml
+from mzn_bench.results import read_solutions, strip_compression
+
+
+def sample_solutions(n: int, k: Optional[int], rng: random.Random) -> List[int]:
+    """Select which of ``n`` solutions to check, without replacement.
+
+    The final (best) solution is always selected, followed by the first and the
+    middle solution of the trajectory. Any remaining checks are spread over the
+    trajectory by splitting the other solutions into equally sized strata and
+    choosing one solution from each stratum.
+
+    Args:
+        n (int): The number of solutions available
+        k (Optional[int]): The number of solutions to check (None checks all)
+        rng (random.Random): The (seeded) random generator used within strata
+
+    Returns:
+        List[int]: The sorted indices of the solutions to check
+    """
+    if k is None or k >= n:
+        return list(range(n))
+    chosen = set()
+    for anchor in (n - 1, 0, (n - 1) // 2):
+        if len(chosen) < k:
+            chosen.add(anchor)
+    remaining = k - len(chosen)
+    if remaining > 0:
+        candidates = [i for i in range(n) if i not in chosen]
+        for s in range(remaining):
+            lo = s * len(candidates) // remaining
+            hi = (s + 1) * len(candidates) // remaining
+            chosen.add(candidates[rng.randrange(lo, hi)])
+    return sorted(chosen)
 
 
 class SolFile(pytest.File):
@@ -16,51 +48,69 @@ class SolFile(pytest.File):
     num_check: int
     base_dir: Path
     timeout: timedelta
+    seed: int
+    budget: Optional[timedelta]
 
     def __init__(
-            self, checker: Solver, num_check: int, base_dir: Path, timeout: Optional[timedelta], *args, **kwargs
+            self, checker: Solver, num_check: int, base_dir: Path, timeout: Optional[timedelta], seed: int = 0, budget: Optional[timedelta] = None, *args, **kwargs
     ):
         super().__init__(*args, **kwargs)
         self.checker = checker
         self.num_check = num_check
         self.base_dir = base_dir
         self.timeout = timeout
+        self.seed = seed
+        self.budget = budget
 
     def collect(self):
-        with self.fspath.open() as fp:
-            results = yaml.load(fp) or []
-            pairs = [
-                (i, result) for i, result in enumerate(results) if "solution" in result
-            ]
-            if len(pairs) == 0:
-                return
-            if self.num_check is None:
-                # Check every solution
-                check = range(len(pairs))
-            else:
-                # Sample random solutions to check, but always include final one
-                n = len(pairs) - 1
-                check = [n] + random.choices(range(n), k=min(n, self.num_check - 1))
-            for i in sorted(check):
-                num, result = pairs[i]
-                name = ":".join(
-                    (
-                        result["configuration"],
-                        result["problem"],
-                        result["model"],
-                        result["data_file"],
-                        str(num),
-                    )
-                )
-                yield SolItem.from_parent(
-                    self,
-                    name=name,
-                    result=result,
-                    checker=self.checker,
-                    base_dir=self.base_dir,
-                    timeout=self.timeout
+        yield from self.items(read_solutions(self.fspath), self.fspath.basename)
+
+    def items(self, results: List[Dict[str, Any]], key: str):
+        # Solutions stored without their assignment cannot be checked
+        pairs = [
+            (i, result)
+            for i, result in enumerate(results)
+            if "solution" in result and result.get("assignment") != "omitted"
+        ]
+        if len(pairs) == 0:
+            return
+        # Seed per file (or task), so the selection is reproducible between runs
+        rng = random.Random(f"{self.seed}:{key}")
+        check = sample_solutions(len(pairs), self.num_check, rng)
+        timeout = self.timeout
+        if self.budget is not None:
+            # Divide the checker time budget over the selected solutions
+            share = self.budget / len(check)
+            timeout = share if timeout is None else min(timeout, share)
+        for i in check:
+            num, result = pairs[i]
+            name = ":".join(
+                (
+                    result["configuration"],
+                    result["problem"],
+                    result["model"],
+                    result["data_file"],
+                    str(num),
                 )
+            )
+            yield SolItem.from_parent(
+                self,
+                name=name,
+                result=result,
+                checker=self.checker,
+                base_dir=self.base_dir,
+                timeout=timeout
+            )
+
 
+class ArchiveSolFile(SolFile):
+    def collect(self):
+        from mzn_bench.archive import Archive
+
+        with Archive(Path(self.fspath), readonly=True) as archive:
+            for task in archive.tasks():
+                # Use the same seed as for the corresponding solutions file
+                yield from self.items(archive.solutions(task), f"{task}_sol.yml")
 
 class SolItem(pytest.Item):
     result: Dict[str, Any]
@@ -130,13 +180,20 @@ class SolutionChecker:
     def timeout(self) -> int:
         return self.config.getoption("--timeout")
 
+    @property
+    def seed(self) -> int:
+        return self.config.getoption("--seed")
+
+    @property
+    def budget(self) -> int:
+        return self.config.getoption("--budget")
 
     def pytest_addoption(self, parser):
         parser.addoption(
             "--check",
             type=int,
             default=1,
-            help="Number of solutions to check per instance (randomly chooses which, but always checks final solution).",
+            help="Number of solutions to check per instance (always checks the final, first and middle solution, and spreads the remaining checks over the other solutions).",
         )
         parser.addoption(
             "--base-dir",
@@ -150,16 +207,32 @@ class SolutionChecker:
             default="30",
             help="Timeout (in seconds) for checker solver. Set to -1 for no timeout.",
         )
+        parser.addoption(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed used to select which solutions to check.",
+        )
+        parser.addoption(
+            "--budget",
+            type=int,
+            default=-1,
+            help="Total checker time (in seconds) per instance, divided over the checked solutions. Set to -1 for no budget.",
+        )
 
     def pytest_collect_file(self, parent, path):
-        if path.basename.endswith("_sol.yml"):
-            return SolFile.from_parent(
+        is_sol = strip_compression(path.basename).endswith("_sol.yml")
+        if is_sol or path.fnmatch("mzn-bench-*.sqlite"):
+            cls = SolFile if is_sol else ArchiveSolFile
+            return cls.from_parent(
                 parent,
                 path=Path(path),
                 checker=self.checker,
                 num_check=self.num_check,
                 base_dir=Path(self.base_dir),
                 timeout=None if self.timeout == -1 else timedelta(seconds=self.timeout),
+                seed=self.seed,
+                budget=None if self.budget == -1 else timedelta(seconds=self.budget),
             )
 
     def pytest_runtest_logreport(self, report):
@@ -4,21 +4,34 @@ import pytest
 from minizinc import Method, Status
 from pathlib import Path
 from mzn_bench import yaml
+from mzn_bench.results import open_results, strip_compression
 
 
 class StatsFile(pytest.File):
     def collect(self):
-        with self.fspath.open() as fp:
+        with open_results(self.fspath) as fp:
             stats = yaml.load(fp)
-            name = ":".join(
-                (
-                    stats["configuration"],
-                    stats["problem"],
-                    stats["model"],
-                    stats["data_file"],
-                )
+            yield self.item(stats)
+
+    def item(self, stats: Dict[str, Any]) -> "StatsItem":
+        name = ":".join(
+            (
+                stats["configuration"],
+                stats["problem"],
+                stats["model"],
+                stats["data_file"],
             )
-            yield StatsItem.from_parent(self, name=name, stats=stats)
+        )
+        return StatsItem.from_parent(self, name=name, stats=stats)
+
+
+class ArchiveStatsFile(StatsFile):
+    def collect(self):
+        from mzn_bench.archive import Archive
+
+        with Archive(Path(self.fspath), readonly=True) as archive:
+            for stats in archive.statistics():
+                yield self.item(stats)
 
 
 class StatsItem(pytest.Item):
@@ -55,5 +68,7 @@ class StatsItem(pytest.Item):
 
 
 def pytest_collect_file(parent, path):
-    if path.basename.endswith("_stats.yml"):
+    if strip_compression(path.basename).endswith("_stats.yml"):
         return StatsFile.from_parent(parent, path=Path(path))
+    if path.fnmatch("mzn-bench-*.sqlite"):
+        return ArchiveStatsFile.from_parent(parent, path=Path(path))
@@ -0,0 +1,307 @@
+import csv
+import logging
+import math
+import random
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from mzn_bench.analysis.collect import collect_statistics
+from mzn_bench.mzn_slurm import Configuration, schedule
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean that a task solved its instance
+SOLVED_STATUSES = ["OPTIMAL_SOLUTION", "UNSATISFIABLE", "ALL_SOLUTIONS"]
+
+
+def race(
+    instances: Path,
+    timeout: timedelta,
+    configurations: Sequence[Configuration],
+    output_dir: Path = Path.cwd() / "results",
+    wave_size: int = 10,
+    first_test: int = 5,
+    alpha: float = 0.05,
+    seed: Optional[int] = 0,
+    **kwargs,
+) -> List[Configuration]:
+    """Race configurations, and stop running the configurations that are worse
+
+    In the style of F-race, the instances are run in waves of ``wave_size``
+    instances (in a random order). After each wave, the configurations are
+    ranked on every instance run so far, and a Friedman test is used to
+    determine whether the configurations perform differently. If they do, then
+    the configurations that are significantly worse than the best
+    configuration (using the post-hoc test of F-race) are not run on the
+    instances of later waves. The race stops when a single configuration is
+    left, or when all instances have been run.
+
+    On each instance, configurations that solved the instance (i.e., proved
+    optimality, unsatisfiability, or found a solution of a satisfaction
+    problem) are ranked by their time. They are followed by the configurations
+    that found a solution, ranked by their best objective value, and then by
+    the remaining configurations.
+
+    All tasks are written to ``output_dir``, as they would be by ``schedule``,
+    where tasks of instances that were not run by eliminated configurations
+    are missing. Other keyword arguments are passed to ``schedule``, which
+    waits for every wave to finish.
+
+    Args:
+        instances (Path): The instances file
+        timeout (timedelta): The timeout of each task
+        configurations (Sequence[Configuration]): The configurations to race
+        output_dir (Path): The directory in which the results are placed
+        wave_size (int): The number of instances run in each wave
+        first_test (int): The minimum number of instances that are run before
+            configurations can be eliminated
+        alpha (float): The significance level of the statistical tests
+        seed (Optional[int]): The seed used to shuffle the instances, or None
+            to run the instances in order
+
+    Returns:
+        List[Configuration]: The configurations that were not eliminated
+    """
+    configurations = list(configurations)
+    with instances.open() as file:
+        n_instances = sum(1 for _ in csv.reader(file, dialect="unix")) - 1
+    order = list(range(n_instances))
+    if seed is not None:
+        random.Random(seed).shuffle(order)
+    kwargs["wait"] = True
+
+    alive = list(range(len(configurations)))
+    done: List[int] = []
+    while len(order) > len(done) and len(alive) > 1:
+        wave = order[len(done) : len(done) + wave_size]
+        schedule(
+            instances=instances,
+            timeout=timeout,
+            configurations=configurations,
+            output_dir=output_dir,
+            tasks=[row * len(configurations) + c for row in wave for c in alive],
+            **kwargs,
+        )
+        done.extend(wave)
+        if len(done) < first_test:
+            continue
+
+        names = [configurations[c].name for c in alive]
+        scores = _collect_scores(output_dir, names)
+        if len(scores) < 2:
+            continue
+        statistic, p_value = friedman_test(scores)
+        eliminated = []
+        if p_value < alpha:
+            eliminated = [alive[j] for j in dominated(scores, alpha)]
+        logger.info(
+            "Race: %d/%d instances, %d configurations (p = %.3g)%s",
+            len(done),
+            n_instances,
+            len(alive),
+            p_value,
+            (
+                f", eliminated {', '.join(configurations[c].name for c in eliminated)}"
+                if len(eliminated) > 0
+                else ""
+            ),
+        )
+        alive = [c for c in alive if c not in eliminated]
+
+    return [configurations[c] for c in alive]
+
+
+def score(stats: Dict[str, Any]) -> Tuple[int, float]:
+    """The score (lower is better) of the statistics of a task
+
+    Tasks that did not finish (i.e., that report the partial statistics of
+    their last checkpoint) are never scored as solved.
+    """
+    status = stats.get("status", "UNKNOWN")
+    method = stats.get("method", None)
+    solved = status in SOLVED_STATUSES or (
+        status == "SATISFIED" and method == "satisfy"
+    )
+    if solved and not stats.get("partial", False):
+        return (0, float(stats["time"]))
+    objective = stats.get("objective", None)
+    if objective is not None and objective == objective:
+        return (1, -float(objective) if method == "maximize" else float(objective))
+    return (2, 0.0)
+
+
+def _collect_scores(output_dir: Path, names: List[str]) -> List[List[Any]]:
+    # The scores of the configurations on the instances run by all of them
+    results: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    for stats in collect_statistics([output_dir]):
+        key = (stats["problem"], stats["model"], stats["data_file"])
+        results.setdefault(key, {})[stats["configuration"]] = score(stats)
+    return [
+        [scores[name] for name in names]
+        for scores in results.values()
+        if all(name in scores for name in names)
+    ]
+
+
+def _ranks(scores: Sequence[Any]) -> List[float]:
+    # Rank the scores, where tied scores get their average rank
+    order = sorted(range(len(scores)), key=lambda i: scores[i])
+    ranks = [0.0] * len(scores)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and scores[order[j + 1]] == scores[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def _friedman(scores: List[List[Any]]) -> Tuple[float, List[float], float]:
+    n, k = len(scores), len(scores[0])
+    ranks = [_ranks(block) for block in scores]
+    sums = [sum(r[j] for r in ranks) for j in range(k)]
+    squares = sum(x * x for r in ranks for x in r)
+    denominator = squares - n * k * (k + 1) ** 2 / 4
+    if denominator <= 0:
+        return 0.0, sums, denominator  # All configurations are tied
+    statistic = (k - 1) * sum((s - n * (k + 1) / 2) ** 2 for s in sums) / denominator
+    return statistic, sums, denominator
+
+
+def friedman_test(scores: List[List[Any]]) -> Tuple[float, float]:
+    """The Friedman test of whether configurations perform differently
+
+    The statistic is corrected for ties, as in F-race.
+
+    Args:
+        scores (List[List[Any]]): The scores of every configuration (column)
+            on every instance (row), where lower scores are better
+
+    Returns:
+        Tuple[float, float]: The test statistic and its p-value
+    """
+    statistic, _, denominator = _friedman(scores)
+    if denominator <= 0:
+        return statistic, 1.0
+    return statistic, _chi2_sf(statistic, len(scores[0]) - 1)
+
+
+def dominated(scores: List[List[Any]], alpha: float = 0.05) -> List[int]:
+    """The configurations that perform significantly worse than the best one
+
+    This is the post-hoc test of F-race, which compares the rank sum of every
+    configuration with the best (lowest) rank sum. It should only be used when
+    the Friedman test is significant.
+
+    Args:
+        scores (List[List[Any]]): The scores of every configuration (column)
+            on every instance (row), where lower scores are better
+        alpha (float): The significance level
+
+    Returns:
+        List[int]: The indices of the dominated configurations
+    """
+    n, k = len(scores), len(scores[0])
+    _, sums, denominator = _friedman(scores)
+    if denominator <= 0 or n < 2:
+        return []
+    # Conover (1999), as used by F-race
+    squares = sum(x * x for block in scores for x in _ranks(block))
+    variance = 2 * (n * squares - sum(s * s for s in sums)) / ((n - 1) * (k - 1))
+    if variance <= 0:
+        # Every instance ranks the configurations in the same order
+        return [j for j in range(k) if sums[j] > min(sums)]
+    critical = _t_ppf(1 - alpha / 2, (n - 1) * (k - 1)) * math.sqrt(variance)
+    best = min(sums)
+    return [j for j in range(k) if sums[j] - best > critical]
+
+
+def _gammainc_upper(a: float, x: float) -> float:
+    # The regularised upper incomplete gamma function Q(a, x)
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return 1.0 - total * math.exp(log_prefix)
+    # Continued fraction (modified Lentz's method)
+    b = x + 1 - a
+    c, d = 1e300, 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = 1e-300 if abs(d) < 1e-300 else d
+        c = b + an / c
+        c = 1e-300 if abs(c) < 1e-300 else c
+        d = 1 / d
+        h *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+
+def _chi2_sf(x: float, df: int) -> float:
+    return _gammainc_upper(df / 2, x / 2)
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    # The regularised incomplete beta function I_x(a, b)
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _betainc(b, a, 1 - x)
+    log_prefix = (
+        math.lgamma(a + b)
+        - math.lgamma(a)
+        - math.lgamma(b)
+        + a * math.log(x)
+        + b * math.log(1 - x)
+    )
+    # Continued fraction (modified Lentz's method)
+    c, d = 1.0, 1 - (a + b) * x / (a + 1)
+    d = 1 / (1e-300 if abs(d) < 1e-300 else d)
+    h = d
+    for m in range(1, 1000):
+        for an in [
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ]:
+            d = 1 + an * d
+            d = 1 / (1e-300 if abs(d) < 1e-300 else d)
+            c = 1 + an / c
+            c = 1e-300 if abs(c) < 1e-300 else c
+            h *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h / a
+
+
+def _t_cdf(t: float, df: float) -> float:
+    tail = 0.5 * _betainc(df / 2, 0.5, df / (df + t * t))
+    return 1 - tail if t > 0 else tail
+
+
+def _t_ppf(p: float, df: float) -> float:
+    # Invert the CDF of Student's t distribution by bisection (for p >= 0.5)
+    low, high = 0.0, 1.0
+    while _t_cdf(high, df) < p:
+        high *= 2
+    for _ in range(100):
+        mid = (low + high) / 2
+        if _t_cdf(mid, df) < p:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mzn_bench.results import COMPRESSION_SUFFIXES, open_results, yaml
+
+# The results files of a task that are stored in the cache
+RESULT_SUFFIXES = [
+    suffix + ext
+    for suffix in ["_sol.yml", "_stats.yml"]
+    for ext in [""] + list(COMPRESSION_SUFFIXES.values())
+] + ["_obj.csv"]
+
+
+@lru_cache(maxsize=None)
+def file_hash(path: Path) -> str:
+    """The SHA-256 hash of the contents of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def task_key(
+    configuration: Dict[str, Any],
+    instance: List[str],
+    files: List[Path],
+    timeout: timedelta,
+    solver_version: Optional[str],
+    minizinc_version: Optional[str],
+    fake: Optional[Dict[str, Any]] = None,
+    solution_store: Optional[Dict[str, Any]] = None,
+    compression: Optional[str] = None,
+) -> str:
+    """The key of a task in the result cache
+
+    The key is a hash of everything that determines the result of a task: the
+    configuration (as given by ``Configuration.to_dict``), the instance (as
+    given in the instances file) and the contents of its model and data files,
+    the timeout, and the versions of the solver and MiniZinc. Tasks run using
+    the fake solver backend also include its parameters. The key also includes
+    how the results files are written (i.e., the ``SolutionStore`` and the
+    compression), since cached files are linked into the output as is.
+    """
+    parts = {
+        "configuration": configuration,
+        "instance": instance,
+        "files": [file_hash(file) for file in files],
+        "timeout": int(timeout / timedelta(milliseconds=1)),
+        "solver": solver_version,
+        "minizinc": minizinc_version,
+        "fake": fake,
+        "solutions": solution_store,
+        "compression": compression,
+    }
+    encoded = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+@dataclass
+class ResultCache:
+    """A content-addressed cache of the results of tasks.
+
+    When a result cache is given to ``schedule``, tasks for which the cache
+    contains a result (see ``task_key``) are not run. Instead, their cached
+    results files are linked into the output directory. The results of tasks
+    that are run are added to the cache, unless the task ended in an error.
+
+    The cache can be shared between benchmark runs (and users), as long as
+    they can create hard links to its files, and is never cleaned
+    automatically.
+
+    Attributes:
+        path (Path): The directory in which the results are stored
+    """
+
+    path: Path
+
+    def entry(self, key: str) -> Path:
+        return Path(self.path) / key[:2] / key
+
+    def contains(self, key: str) -> bool:
+        return self.entry(key).is_dir()
+
+    def link(self, key: str, output_dir: Path, filename: str) -> bool:
+        """Link the cached results of a task into the output directory
+
+        Returns:
+            bool: Whether the cache contained the results of the task
+        """
+        entry = self.entry(key)
+        if not entry.is_dir():
+            return False
+        for file in entry.iterdir():
+            target = output_dir / f"{filename}{file.name}"
+            if target.exists():
+                target.unlink()
+            try:
+                os.link(file, target)
+            except OSError:
+                shutil.copy2(file, target)  # E.g., on a different file system
+        return True
+
+    def store(self, key: str, output_dir: Path, filename: str) -> bool:
+        """Add the results of a task in the output directory to the cache
+
+        Returns:
+            bool: Whether the results were added to the cache
+        """
+        files = [
+            output_dir / f"{filename}{suffix}"
+            for suffix in RESULT_SUFFIXES
+            if (output_dir / f"{filename}{suffix}").exists()
+        ]
+        stats = [f for f in files if "_stats.yml" in f.name]
+        if len(stats) != 1:
+            return False
+        with open_results(stats[0]) as file:
+            statistics = yaml.load(file)
+        if statistics.get("status") == "ERROR" or "error" in statistics:
+            return False
+
+        entry = self.entry(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        # Add the entry atomically, since other tasks might look it up
+        tmp = Path(tempfile.mkdtemp(dir=entry.parent, suffix=".tmp"))
+        for file in files:
+            shutil.copy2(file, tmp / file.name[len(filename) :])
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp)  # Another task already stored the same result
+            return False
+        return True
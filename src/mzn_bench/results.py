@@ -0,0 +1,319 @@
+import csv
+import gzip
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Union
+
+import minizinc
+from ruamel.yaml import YAML
+
+yaml = YAML(typ="safe")
+yaml.register_class(minizinc.types.ConstrEnum)
+yaml.register_class(minizinc.types.AnonEnum)
+yaml.default_flow_style = False
+
+SOLUTION_MODES = ["full", "sample", "delta"]
+
+# File name suffixes of the supported compression methods
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# Columns of the objectives sidecar file (``_obj.csv``)
+OBJECTIVE_KEYS = [
+    "configuration",
+    "problem",
+    "model",
+    "data_file",
+    "status",
+    "time",
+    "objective",
+]
+
+
+@dataclass
+class SolutionStore:
+    """Determines how the solutions of each task are stored.
+
+    The time, status and objective value of every solution are always stored.
+    The full assignment of the solutions can be stored in the following modes:
+
+    - ``full``: the full assignment of every solution is stored.
+    - ``sample``: the full assignment is only stored for the final solution,
+      and for every ``interval``-th solution. Note that the final solution is
+      kept in memory until the next solution (or the end of the task), and
+      will be lost if the task is killed.
+    - ``delta``: only the variables (or array elements) that changed since the
+      previous solution are stored. The full assignment is stored for the first
+      solution, and for every ``interval``-th solution.
+
+    Additionally, the time, status and objective value of every solution are
+    written to a small CSV sidecar file (``_obj.csv``), from which objectives
+    can be collected without reading the solutions file.
+
+    Attributes:
+        mode (str): The storage mode (full, sample, or delta)
+        interval (Optional[int]): The interval at which full assignments are
+            stored in the sample and delta modes
+        objectives (bool): Whether to write the objectives sidecar file
+    """
+
+    mode: str = "full"
+    interval: Optional[int] = None
+    objectives: bool = True
+
+    def __post_init__(self):
+        if self.mode not in SOLUTION_MODES:
+            raise ValueError(
+                f"Unknown solution storage mode '{self.mode}', "
+                f"expected one of {SOLUTION_MODES}"
+            )
+
+    def writer(self, path: Path) -> "SolutionWriter":
+        return SolutionWriter(path, self)
+
+
+class SolutionWriter:
+    """Writes the solutions of a task to a solutions file (``_sol.yml``)
+
+    Every entry written is a dictionary with the task information, the status
+    and the time, and (for solutions) the ``solution`` assignment. Depending on
+    the ``SolutionStore``, the assignment of a solution is replaced by only its
+    objective value (marked by ``assignment: omitted``), or by its changes with
+    respect to the previous solution (marked by ``assignment: delta``). Use
+    ``read_solutions`` to read the file with the full assignments restored.
+    """
+
+    def __init__(self, path: Path, store: Optional[SolutionStore] = None):
+        self.store = store if store is not None else SolutionStore()
+        self.count = 0
+        self.pending: Optional[Dict[str, Any]] = None
+        self.previous: Optional[Dict[str, Any]] = None
+        self._open(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _open(self, path: Path):
+        self.file = open_results(path, "w")
+        self.objectives = None
+        if self.store.objectives:
+            objectives = objectives_path(path)
+            _unlink(objectives)
+            self.objectives = open(objectives, "w", newline="")
+            self.objectives_writer = csv.writer(self.objectives, dialect="unix")
+            self.objectives_writer.writerow(OBJECTIVE_KEYS)
+
+    def _dump(self, entry: Dict[str, Any]):
+        yaml.dump([entry], self.file)
+
+    def _write_objective(self, entry: Dict[str, Any]):
+        if self.objectives is not None:
+            self.objectives_writer.writerow(
+                [entry.get(k, "") for k in OBJECTIVE_KEYS[:-1]]
+                + [entry["solution"].get("objective", "")]
+            )
+
+    def _close(self):
+        self.file.close()
+        if self.objectives is not None:
+            self.objectives.close()
+
+    def write(self, entry: Dict[str, Any]):
+        if "solution" not in entry:
+            # Status and statistics are only reported after the final solution
+            self._flush(final=True)
+            self._dump(entry)
+            return
+
+        self._write_objective(entry)
+        self.count += 1
+        interval = self.store.interval
+        keyframe = interval is not None and self.count % interval == 0
+        if self.store.mode == "sample":
+            self._flush(final=False)
+            if keyframe:
+                self._dump(entry)
+            else:
+                self.pending = entry
+        elif self.store.mode == "delta":
+            if self.previous is None or keyframe:
+                self._dump(entry)
+            else:
+                self._dump(_delta_entry(self.previous, entry))
+            self.previous = entry["solution"]
+        else:
+            self._dump(entry)
+
+    def _flush(self, final: bool):
+        if self.pending is None:
+            return
+        entry = self.pending
+        if not final:
+            entry = _objective_entry(entry)
+            entry["assignment"] = "omitted"
+        self._dump(entry)
+        self.pending = None
+
+    def close(self):
+        self._flush(final=True)
+        self._close()
+
+
+def open_results(path: Union[str, Path], mode: str = "r") -> IO[str]:
+    """Open a (possibly compressed) results file in text mode
+
+    The compression is determined by the suffix of the file name: ``.gz`` for
+    gzip and ``.zst`` for zstd (which requires the zstandard package).
+    Compressed files are written and read as a stream. An existing file is
+    replaced by a new file instead of being truncated, since it might be a hard
+    link to an entry of a result cache.
+
+    Args:
+        path (Union[str, Path]): The results file
+        mode (str, optional): The mode in which the file is opened ("r" or "w").
+            Defaults to "r".
+
+    Returns:
+        IO[str]: The opened file
+    """
+    path = Path(path)
+    if "w" in mode:
+        _unlink(path)
+    if path.suffix == COMPRESSION_SUFFIXES["gzip"]:
+        return gzip.open(path, mode + "t")
+    if path.suffix == COMPRESSION_SUFFIXES["zstd"]:
+        import zstandard
+
+        return zstandard.open(path, mode + "t")
+    return open(path, mode)
+
+
+def _unlink(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def result_files(path: Path, suffix: str) -> Iterator[Path]:
+    """The (possibly compressed) results files with a suffix in a directory"""
+    for ext in [""] + list(COMPRESSION_SUFFIXES.values()):
+        yield from path.rglob(f"*{suffix}{ext}")
+
+
+def write_statistics(path: Path, statistics: Dict[str, Any]):
+    """Write a (possibly compressed) statistics file atomically
+
+    The statistics are written to a temporary file that replaces the
+    statistics file, so that the file always contains complete statistics,
+    even when the task is killed while writing.
+    """
+    name = strip_compression(path.name)
+    tmp = path.with_name(name + ".tmp" + path.name[len(name) :])
+    with open_results(tmp, "w") as file:
+        yaml.dump(statistics, file)
+    os.replace(tmp, path)
+
+
+def strip_compression(name: str) -> str:
+    """The name of a results file without its compression suffix"""
+    for ext in COMPRESSION_SUFFIXES.values():
+        if name.endswith(ext):
+            return name[: -len(ext)]
+    return name
+
+
+def objectives_path(path: Path) -> Path:
+    """The objectives sidecar file of a solutions file"""
+    name = strip_compression(path.name)
+    if name.endswith("_sol.yml"):
+        name = name[: -len("_sol.yml")]
+    return path.with_name(name + "_obj.csv")
+
+
+def _objective_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    entry = dict(entry)
+    solution = entry["solution"]
+    entry["solution"] = (
+        {"objective": solution["objective"]} if "objective" in solution else {}
+    )
+    return entry
+
+
+def _delta_entry(previous: Dict[str, Any], entry: Dict[str, Any]) -> Dict[str, Any]:
+    solution = entry["solution"]
+    assign, items = {}, {}
+    for key, value in solution.items():
+        if key == "objective" or (key in previous and previous[key] == value):
+            continue
+        old = previous.get(key, None)
+        if isinstance(value, list) and isinstance(old, list) and len(value) == len(old):
+            changed = {i: v for i, (v, w) in enumerate(zip(value, old)) if v != w}
+            if len(changed) <= len(value) // 2:
+                items[key] = changed
+                continue
+        assign[key] = value
+    delta = {}
+    if len(assign) > 0:
+        delta["assign"] = assign
+    if len(items) > 0:
+        delta["items"] = items
+    removed = [key for key in previous if key not in solution]
+    if len(removed) > 0:
+        delta["remove"] = removed
+
+    entry = _objective_entry(entry)
+    entry["assignment"] = "delta"
+    entry["delta"] = delta
+    return entry
+
+
+def read_solutions(
+    path: Union[str, Path], assignments: bool = True
+) -> List[Dict[str, Any]]:
+    """Read a (possibly compressed) solutions file (``_sol.yml``)
+
+    Args:
+        path (Union[str, Path]): The solutions file
+        assignments (bool, optional): Whether to restore the full assignments
+            of solutions that are stored as changes to their previous solution.
+            Defaults to True.
+
+    Returns:
+        List[Dict[str, Any]]: The entries of the solutions file. Solutions for
+            which only the objective value was stored are marked by
+            ``assignment: omitted``.
+    """
+    with open_results(path) as file:
+        entries = yaml.load(file) or []
+    if assignments:
+        restore_assignments(entries)
+    return entries
+
+
+def restore_assignments(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Restore the full assignments of delta-encoded solutions (in place)"""
+    previous: Dict[str, Any] = {}
+    for entry in entries:
+        if "solution" not in entry:
+            continue
+        kind = entry.get("assignment", "full")
+        if kind == "delta":
+            delta = entry.pop("delta")
+            solution = {
+                k: v for k, v in previous.items() if k not in delta.get("remove", [])
+            }
+            solution.update(delta.get("assign", {}))
+            for key, changed in delta.get("items", {}).items():
+                solution[key] = list(solution[key])
+                for i, v in changed.items():
+                    solution[key][i] = v
+            solution.update(entry["solution"])
+            entry["solution"] = solution
+            del entry["assignment"]
+        if kind != "omitted":
+            previous = entry["solution"]
+    return entries
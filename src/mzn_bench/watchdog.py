@@ -0,0 +1,64 @@
+import asyncio
+import os
+import signal
+from typing import List
+
+from mzn_bench.instrument import process_tree
+
+# Time (in seconds) that processes are given to stop after SIGTERM, before
+# they are killed using SIGKILL
+KILL_GRACE = 5.0
+
+# Interval (in seconds) at which terminated processes are checked
+POLL_INTERVAL = 0.1
+
+
+def _signal(pids: List[int], sig: int) -> List[int]:
+    # Send a signal to the processes, and return those that still exist
+    alive = []
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+            alive.append(pid)
+        except OSError:
+            pass  # The process has already terminated
+    return alive
+
+
+def _running(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as file:
+            stat = file.read()
+        # Terminated processes that have not been reaped are zombies
+        return stat[stat.rfind(")") + 2] != "Z"
+    except OSError:
+        pass
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+async def terminate_tree(root: int, grace: float = KILL_GRACE) -> List[int]:
+    """Terminate a process and all of its descendants
+
+    All processes in the tree are sent SIGTERM at once. The processes that are
+    still running after ``grace`` seconds are sent SIGKILL, including
+    descendants that were orphaned when their parent terminated.
+
+    Args:
+        root (int): The process identifier of the root of the tree
+        grace (float): The time (in seconds) given to the processes to stop
+
+    Returns:
+        List[int]: The processes that had to be killed using SIGKILL
+    """
+    pids = process_tree(root)
+    alive = _signal(pids, signal.SIGTERM)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + grace
+    while len(alive) > 0 and loop.time() < deadline:
+        await asyncio.sleep(POLL_INTERVAL)
+        alive = [pid for pid in alive if _running(pid)]
+    return _signal([pid for pid in alive if _running(pid)], signal.SIGKILL)
@@ -0,0 +1,73 @@
+from datetime import timedelta
+from pathlib import Path
+
+from mzn_bench import Configuration, FakeSolver, SolutionStore, schedule
+from mzn_bench.analysis.collect import collect_objectives, collect_statistics
+from mzn_bench.archive import Archive, archives, compact
+
+
+KEYS = ["configuration", "problem", "model", "data_file", "status", "objective"]
+
+
+def without_time(rows):
+    return sorted(tuple(row.get(k, None) for k in KEYS) for row in rows)
+
+
+def run(output_dir: Path, archive: bool):
+    schedule(
+        instances=Path("./tests/test.csv"),
+        timeout=timedelta(seconds=5),
+        configurations=[
+            Configuration(name="A", solver=FakeSolver.solver()),
+            Configuration(name="B", solver=FakeSolver.solver()),
+        ],
+        output_dir=output_dir,
+        nodelist=None,
+        fake=FakeSolver(solutions=5, rate=None, size=10),
+        solution_store=SolutionStore(mode="delta"),
+        archive=archive,
+    )
+
+
+def test_archive(tmp_path):
+    run(tmp_path / "files", archive=False)
+    run(tmp_path / "archive", archive=True)
+
+    shards = list(archives(tmp_path / "archive"))
+    assert [p.name for p in shards] == ["mzn-bench-1.sqlite"]
+    assert not list((tmp_path / "archive").glob("*.yml"))
+
+    # The collected results are the same as those of the YAML files
+    assert without_time(collect_statistics([tmp_path / "archive"])) == without_time(
+        collect_statistics([tmp_path / "files"])
+    )
+    assert without_time(collect_objectives([tmp_path / "archive"])) == without_time(
+        collect_objectives([tmp_path / "files"])
+    )
+
+    # Delta-encoded solutions are restored when read
+    with Archive(shards[0], readonly=True) as archive:
+        assert archive.tasks() == ["1_A", "1_B"]
+        sols = archive.solutions("1_A")
+        assert len(sols) == 6
+        assert all(len(s["solution"]["x"]) == 10 for s in sols[:-1])
+        assert list(archive.errors()) == []
+
+
+def test_compact(tmp_path):
+    results = tmp_path / "results"
+    run(results, archive=False)
+    run(results / "shards", archive=True)
+    stats = without_time(collect_statistics([results]))
+    objs = without_time(collect_objectives([results]))
+
+    out = tmp_path / "results.sqlite"
+    assert compact(results, out, remove=True) == 4
+    assert [p for p in results.rglob("*") if p.is_file()] == []
+    assert without_time(collect_statistics([out])) == stats
+    assert without_time(collect_objectives([out])) == objs
+    assert {s["run"] for s in collect_statistics([out])} == {"results"}
+
+    with Archive(out, readonly=True) as archive:
+        assert archive.tasks() == ["1_A", "1_B", "shards/1_A", "shards/1_B"]
+        assert len(archive.solutions("1_B")[-2]["solution"]["x"]) == 10
@@ -0,0 +1,16 @@
+import random
+
+from mzn_bench.pytest.check_solutions import sample_solutions
+
+
+def test_sample_solutions():
+    # Always check the final, first, and middle solutions (in that order)
+    assert sample_solutions(10, 1, random.Random(0)) == [9]
+    assert sample_solutions(10, 3, random.Random(0)) == [0, 4, 9]
+    assert sample_solutions(3, None, random.Random(0)) == [0, 1, 2]
+    assert sample_solutions(3, 5, random.Random(0)) == [0, 1, 2]
+
+    # Sampling is without replacement and reproducible
+    check = sample_solutions(1000, 20, random.Random("0:a_sol.yml"))
+    assert len(set(check)) == 20
+    assert check == sample_solutions(1000, 20, random.Random("0:a_sol.yml"))
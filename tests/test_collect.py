@@ -0,0 +1,60 @@
+import pytest
+
+from mzn_bench.analysis.collect import compact_objectives, compact_trajectory
+
+
+def trajectory(points):
+    return [
+        {
+            "configuration": "A",
+            "run": "results",
+            "problem": "p",
+            "model": "p.mzn",
+            "data_file": "",
+            "time": time,
+            "objective": objective,
+        }
+        for time, objective in points
+    ]
+
+
+def test_compact_trajectory():
+    # Minimisation: only strictly improving solutions are kept
+    sols = trajectory([(0.1, 10), (0.2, 10), (0.3, 8), (0.4, 9), (0.5, 5)])
+    assert [s["time"] for s in compact_trajectory(sols)] == [0.1, 0.3, 0.5]
+
+    # Maximisation is derived from the trajectory
+    sols = trajectory([(0.1, 1), (0.2, 3), (0.3, 2), (0.4, 7)])
+    assert [s["time"] for s in compact_trajectory(sols)] == [0.1, 0.2, 0.4]
+
+    # Resampling keeps the first solution and the best solution in each bucket
+    sols = trajectory([(t / 10, 100 - t) for t in range(1, 30)])
+    compact = compact_trajectory(sols, resolution=1.0)
+    assert [s["objective"] for s in compact] == [99, 91, 81, 71]
+
+    # The method of the instance takes precedence over the trajectory
+    sols = trajectory([(0.1, 5), (0.2, 3), (0.3, 8)])
+    assert [s["time"] for s in compact_trajectory(sols)] == [0.1, 0.3]
+    compact = compact_trajectory(sols, method="minimize")
+    assert [s["time"] for s in compact] == [0.1, 0.2]
+
+
+def test_compact_objectives():
+    pd = pytest.importorskip("pandas")
+
+    sols = trajectory([(0.1, 10), (0.2, 10), (0.3, 8), (0.4, 9), (0.5, 5)])
+    sols += [dict(s, configuration="B") for s in trajectory([(0.1, 1), (0.2, 3)])]
+    df = compact_objectives(pd.DataFrame(sols))
+    assert df.objective.tolist() == [10, 8, 5, 1, 3]
+
+    sols = trajectory([(t / 10, 100 - t) for t in range(1, 30)])
+    df = compact_objectives(pd.DataFrame(sols), resolution=1.0)
+    assert df.objective.tolist() == [99, 91, 81, 71]
+
+    # The method is joined from the statistics of the task
+    sols = trajectory([(0.1, 5), (0.2, 3), (0.3, 8)])
+    stats = pd.DataFrame([dict(sols[0], method="minimize")])
+    df = compact_objectives(pd.DataFrame(sols), stats=stats)
+    assert df.objective.tolist() == [5, 3]
+    df = compact_objectives(pd.DataFrame(sols), stats=stats.assign(run="other"))
+    assert df.objective.tolist() == [5, 8]
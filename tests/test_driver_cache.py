@@ -0,0 +1,90 @@
+import json
+import sys
+import tempfile
+
+import minizinc
+import pytest
+
+from mzn_bench import Configuration
+from mzn_bench.driver_cache import _drivers, cache_dir, cached_driver
+
+SOLVERS = [
+    {
+        "id": "org.gecode.gecode",
+        "name": "Gecode",
+        "version": "6.3.0",
+        "tags": ["cp", "int"],
+        "executable": "fzn-gecode",
+    }
+]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires a shell script")
+def test_cached_driver(tmp_path, monkeypatch):
+    # A MiniZinc executable that logs every invocation
+    log = tmp_path / "calls.log"
+    executable = tmp_path / "minizinc"
+    executable.write_text(
+        "#!/bin/sh\n"
+        f'echo "$1" >> "{log}"\n'
+        'if [ "$1" = "--version" ]; then\n'
+        '  echo "MiniZinc to FlatZinc converter, version 2.8.5"\n'
+        "else\n"
+        f"  echo '{json.dumps(SOLVERS)}'\n"
+        "fi\n"
+    )
+    executable.chmod(0o755)
+    monkeypatch.setenv("MZN_BENCH_CACHE_DIR", str(tmp_path / "cache"))
+
+    driver = cached_driver(executable)
+    assert driver.parsed_version == (2, 8, 5)
+    assert log.read_text().split() == ["--version", "--solvers-json"]
+
+    # A new process (simulated by clearing the in-memory cache) uses the disk cache
+    _drivers.clear()
+    config = Configuration.from_dict(
+        {
+            "name": "Gecode",
+            "solver": "",
+            "sol_ident": "org.gecode.gecode@6.3.0",
+            "minizinc": str(executable),
+            "processes": None,
+            "random_seed": None,
+            "free_search": False,
+            "optimisation_level": None,
+            "other_flags": {},
+            "extra_data": {},
+        }
+    )
+    assert config.solver.name == "Gecode"
+    assert log.read_text().split() == ["--version", "--solvers-json"]
+
+    # Changing the executable invalidates the cache
+    _drivers.clear()
+    executable.write_text(executable.read_text().replace("2.8.5", "2.8.6"))
+    assert cached_driver(executable).parsed_version == (2, 8, 6)
+    assert len(log.read_text().split()) == 4
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires a shell script")
+def test_failed_query(tmp_path, monkeypatch):
+    executable = tmp_path / "minizinc"
+    executable.write_text("#!/bin/sh\necho 'broken' >&2\nexit 1\n")
+    executable.chmod(0o755)
+    monkeypatch.setenv("MZN_BENCH_CACHE_DIR", str(tmp_path / "cache"))
+
+    with pytest.raises(minizinc.ConfigurationError, match="broken"):
+        cached_driver(executable)
+    assert not (tmp_path / "cache").exists()
+
+
+def test_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("MZN_BENCH_CACHE_DIR", raising=False)
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    for var in ["LOGNAME", "USER"]:
+        monkeypatch.setenv(var, "alice")
+    monkeypatch.setattr(tempfile, "tempdir", None)
+    # The cache defaults to the node-local temporary directory
+    assert cache_dir() == tmp_path / "mzn-bench-alice"
+    monkeypatch.setenv("MZN_BENCH_CACHE_DIR", "")
+    assert cache_dir() is None
@@ -0,0 +1,257 @@
+import asyncio
+import gzip
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from mzn_bench import Configuration, FakeSolver, read_solutions, schedule, yaml
+from mzn_bench.analysis.collect import collect_objectives, collect_statistics
+from mzn_bench.cli import collect_objectives_, collect_statistics_
+from mzn_bench.mzn_slurm import _available_cpus, _select_tasks, run_instance
+from mzn_bench.results import COMPRESSION_SUFFIXES, write_statistics
+
+
+def test_fake(tmp_path):
+    fake = FakeSolver(solutions=5, rate=None, size=10)
+    schedule(
+        instances=Path("./tests/test.csv"),
+        timeout=timedelta(seconds=5),
+        configurations=[
+            Configuration(name="A", solver=FakeSolver.solver()),
+            Configuration(name="B", solver=FakeSolver.solver()),
+        ],
+        output_dir=tmp_path,
+        nodelist=None,  # local runner
+        fake=fake,
+    )
+
+    stats = yaml.load(tmp_path / "1_A_stats.yml")
+    assert stats["status"] == "OPTIMAL_SOLUTION"
+    assert stats["nSolutions"] == 5
+    sols = yaml.load(tmp_path / "1_A_sol.yml")
+    assert len(sols) == 6  # Five solutions and the final status
+    assert [len(s["solution"]["x"]) for s in sols[:-1]] == [10] * 5
+    assert stats["objective"] == sols[-2]["solution"]["objective"]
+
+    # Solution streams differ between configurations
+    assert sols[0]["solution"] != yaml.load(tmp_path / "1_B_sol.yml")[0]["solution"]
+
+    collect_objectives_([str(tmp_path)], str(tmp_path / "objs.csv"))
+    collect_statistics_([str(tmp_path)], str(tmp_path / "stats.csv"))
+    assert len((tmp_path / "objs.csv").read_text().splitlines()) == 1 + 2 * 5
+
+
+def test_fake_timeout(tmp_path):
+    fake = FakeSolver(solutions=100, rate=20, statuses={"OPTIMAL_SOLUTION": 1.0})
+    schedule(
+        instances=Path("./tests/test.csv"),
+        timeout=timedelta(seconds=0.2),
+        configurations=[Configuration(name="A", solver=FakeSolver.solver())],
+        output_dir=tmp_path,
+        nodelist=None,
+        fake=fake,
+    )
+    stats = yaml.load(tmp_path / "1_A_stats.yml")
+    assert stats["status"] == "SATISFIED"
+    assert 0 < stats["nSolutions"] < 100
+
+
+def test_select_tasks(tmp_path):
+    instances = tmp_path / "instances.csv"
+    instances.write_text(
+        '"problem","model","data_file"\n'
+        + "".join(f'"p","p.mzn","{i}.dzn"\n' for i in range(1, 4))
+    )
+    tasks = list(_select_tasks(instances, 3, 10, 2))
+    assert [(row, inst[2], conf) for row, inst, conf in tasks] == [
+        (2, "2.dzn", 1),
+        (3, "3.dzn", 0),
+        (3, "3.dzn", 1),
+    ]
+
+
+def test_concurrency(tmp_path):
+    model = Path("./tests/nqueens.mzn").resolve()
+    instances = tmp_path / "instances.csv"
+    instances.write_text(
+        '"problem","model","data_file"\n'
+        + "".join(f'"p","{model}",""\n' for _ in range(4))
+    )
+    # Every task takes (at least) 0.5 seconds
+    fake = FakeSolver(solutions=5, rate=10)
+    start = time.perf_counter()
+    schedule(
+        instances=instances,
+        timeout=timedelta(seconds=5),
+        configurations=[Configuration(name="A", solver=FakeSolver.solver())],
+        output_dir=tmp_path,
+        nodelist=None,
+        fake=fake,
+        concurrency=4,
+    )
+    if _available_cpus() >= 4:
+        assert time.perf_counter() - start < 1.5
+    for row in range(1, 5):
+        assert yaml.load(tmp_path / f"{row}_A_stats.yml")["nSolutions"] == 5
+
+
+def test_cancellation(tmp_path):
+    fake = FakeSolver(solutions=100, rate=10)
+    config = Configuration(name="A", solver=FakeSolver.solver())
+    stat_base = {"model": "nqueens.mzn", "data_file": "", "configuration": "A"}
+
+    async def cancel():
+        task = asyncio.ensure_future(
+            run_instance(
+                "nqueens",
+                Path("./tests/nqueens.mzn"),
+                [],
+                config,
+                timedelta(seconds=20),
+                stat_base,
+                tmp_path / "1_A_sol.yml",
+                tmp_path / "1_A_stats.yml",
+                fake,
+            )
+        )
+        await asyncio.sleep(0.35)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+    stats = yaml.load(tmp_path / "1_A_stats.yml")
+    assert stats["error"] == "Task was cancelled"
+    assert stats["status"] == "SATISFIED"
+    assert len(yaml.load(tmp_path / "1_A_sol.yml")) == 3
+
+
+def test_teardown(tmp_path, monkeypatch):
+    fake = FakeSolver(solutions=1, rate=None)
+    config = Configuration(name="A", solver=FakeSolver.solver())
+    stat_base = {"model": "nqueens.mzn", "data_file": "", "configuration": "A"}
+
+    writes = []
+
+    def counted_write(path, statistics):
+        writes.append(path)
+        write_statistics(path, statistics)
+
+    monkeypatch.setattr("mzn_bench.mzn_slurm.write_statistics", counted_write)
+    asyncio.run(
+        run_instance(
+            "nqueens",
+            Path("./tests/nqueens.mzn"),
+            [],
+            config,
+            timedelta(seconds=20),
+            stat_base,
+            tmp_path / "1_A_sol.yml",
+            tmp_path / "1_A_stats.yml",
+            fake,
+        )
+    )
+    # The statistics are written once, and the phases add up to the time
+    assert len(writes) == 1
+    stats = yaml.load(tmp_path / "1_A_stats.yml")
+    phases = sum(v for k, v in stats.items() if k.startswith("phase"))
+    assert phases <= stats["time"]
+    assert stats["overheadTime"] <= stats["time"]
+
+
+def test_checkpoint(tmp_path):
+    fake = FakeSolver(solutions=100, rate=10, size=10)
+    config = Configuration(name="A", solver=FakeSolver.solver())
+    stat_base = {"model": "nqueens.mzn", "data_file": "", "configuration": "A"}
+
+    async def checkpoint():
+        start = time.perf_counter()
+        task = asyncio.ensure_future(
+            run_instance(
+                "nqueens",
+                Path("./tests/nqueens.mzn"),
+                [],
+                config,
+                timedelta(seconds=20),
+                stat_base,
+                tmp_path / "1_A_sol.yml.gz",
+                tmp_path / "1_A_stats.yml.gz",
+                fake,
+                checkpoint_interval=0.1,
+            )
+        )
+        await asyncio.sleep(0.55)
+        # The statistics written by the last checkpoint (as if the task is killed)
+        stats = list(collect_statistics([tmp_path]))
+        elapsed = time.perf_counter() - start
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return stats, elapsed
+
+    stats, elapsed = asyncio.run(checkpoint())
+    assert len(stats) == 1 and stats[0]["partial"] is True
+    stats = stats[0]
+    assert stats["status"] == "SATISFIED"
+    assert stats["objective"] is not None
+    assert 0 < stats["time"] <= elapsed
+    assert sorted(f.name for f in tmp_path.iterdir()) == [
+        "1_A_obj.csv",
+        "1_A_sol.yml.gz",
+        "1_A_stats.yml.gz",
+    ]
+    assert "partial" not in yaml.load(gzip.open(tmp_path / "1_A_stats.yml.gz"))
+
+
+def test_watchdog(tmp_path):
+    # The fake solver ignores its timeout, and is stopped by the watchdog
+    fake = FakeSolver(solutions=100, rate=10, overrun=30)
+    config = Configuration(name="A", solver=FakeSolver.solver())
+    stat_base = {"model": "nqueens.mzn", "data_file": "", "configuration": "A"}
+    start = time.perf_counter()
+    asyncio.run(
+        run_instance(
+            "nqueens",
+            Path("./tests/nqueens.mzn"),
+            [],
+            config,
+            timedelta(seconds=0.35),
+            stat_base,
+            tmp_path / "1_A_sol.yml",
+            tmp_path / "1_A_stats.yml",
+            fake,
+            watchdog=0.2,
+        )
+    )
+    assert time.perf_counter() - start < 1
+    stats = yaml.load(tmp_path / "1_A_stats.yml")
+    assert stats["overrun"] == "solve"
+    assert stats["error"] == "Exceeded the time budget in the solve phase"
+    assert stats["status"] == "SATISFIED"
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_compression(tmp_path, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    fake = FakeSolver(solutions=5, rate=None, size=10)
+    schedule(
+        instances=Path("./tests/test.csv"),
+        timeout=timedelta(seconds=5),
+        configurations=[Configuration(name="A", solver=FakeSolver.solver())],
+        output_dir=tmp_path,
+        nodelist=None,
+        fake=fake,
+        compression=compression,
+    )
+    suffix = COMPRESSION_SUFFIXES[compression]
+    assert (tmp_path / f"1_A_sol.yml{suffix}").exists()
+    assert (tmp_path / "1_A_obj.csv").exists()
+    assert len(read_solutions(tmp_path / f"1_A_sol.yml{suffix}")) == 6
+
+    (tmp_path / "1_A_obj.csv").unlink()  # Read the objectives from the solutions
+    stats = list(collect_statistics([tmp_path]))
+    assert [s["nSolutions"] for s in stats] == [5]
+    assert len(list(collect_objectives([tmp_path]))) == 5
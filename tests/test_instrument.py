@@ -0,0 +1,53 @@
+import asyncio
+import sys
+
+import pytest
+
+from mzn_bench.instrument import ResourceMonitor
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="requires Linux")
+def test_concurrent_monitors():
+    async def task(*cmd):
+        monitor = ResourceMonitor(interval=0.05)
+        monitor.start()
+        proc = await asyncio.create_subprocess_exec(*cmd)
+        monitor.track(proc.pid)
+        await proc.wait()
+        return monitor.stop(), monitor.shared
+
+    async def run():
+        # A busy process, and one that sleeps while the other is running
+        return await asyncio.gather(
+            task(
+                sys.executable, "-c", "import time\nwhile time.process_time() < 1: pass"
+            ),
+            task("sleep", "1.2"),
+        )
+
+    (busy, busy_shared), (idle, idle_shared) = asyncio.run(run())
+    assert busy_shared and idle_shared
+    # Each task only reports the CPU time of its own processes
+    assert busy["userTime"] + busy["systemTime"] > 0.5
+    assert idle["userTime"] + idle["systemTime"] < 0.2
+    assert busy["peakRSS"] > 0 and idle["peakRSS"] > 0
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="requires Linux")
+def test_unsampled_monitors():
+    async def task():
+        monitor = ResourceMonitor(interval=10)
+        monitor.start()
+        proc = await asyncio.create_subprocess_exec("true")
+        monitor.track(proc.pid)
+        await proc.wait()
+        return monitor.stop()
+
+    async def run():
+        return await asyncio.gather(task(), task())
+
+    # Concurrent tasks that were never sampled report their usage as missing
+    for stats in asyncio.run(run()):
+        assert stats["peakRSS"] is None
+        assert stats["userTime"] is None and stats["systemTime"] is None
+        assert stats["harnessCPUTime"] is not None
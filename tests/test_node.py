@@ -0,0 +1,34 @@
+from mzn_bench.analysis.collect import normalise_times
+from mzn_bench.node import node_info, node_speed
+
+
+def test_node_speed(tmp_path, monkeypatch):
+    monkeypatch.setenv("MZN_BENCH_CACHE_DIR", str(tmp_path))
+    info = node_info()
+    assert set(info) == {"hostname", "cpuModel"}
+    speed = node_speed(info)
+    assert speed > 0
+    (entry,) = (tmp_path / "calibration").iterdir()
+
+    # The cached speed is used by later tasks
+    entry.write_text(entry.read_text().replace(str(speed), "1.5"))
+    assert node_speed(info) == 1.5
+
+
+def test_normalise_times():
+    statistics = [
+        {"hostname": "a", "nodeSpeed": 2.0, "time": 10.0, "flatTime": 1.0},
+        {"hostname": "b", "nodeSpeed": 1.0, "time": 10.0, "solveTime": ""},
+        {"hostname": "c", "nodeSpeed": 4.0, "time": 10.0},
+        {"hostname": "d", "time": 10.0},
+    ]
+    normalise_times(statistics)
+    # The median node speed is the reference
+    assert [s["time"] for s in statistics] == [10.0, 5.0, 20.0, 10.0]
+    assert statistics[0]["flatTime"] == 1.0
+    assert statistics[1]["solveTime"] == ""
+    assert "speedFactor" not in statistics[3]
+
+    statistics = [{"hostname": "d", "time": 10.0}, {"hostname": "e", "time": 10.0}]
+    normalise_times(statistics, {"d": 1.0, "e": 3.0}, reference=2.0)
+    assert [s["time"] for s in statistics] == [5.0, 15.0]
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from mzn_bench import pinning
+from mzn_bench.driver_cache import CachedDriver, track_processes
+from mzn_bench.pinning import Placement, core_sets, parse_cpu_list
+
+
+def test_parse_cpu_list():
+    assert parse_cpu_list("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+    assert parse_cpu_list("") == []
+
+
+def test_core_sets(tmp_path, monkeypatch):
+    # Two NUMA nodes, with 4 cores of 2 SMT siblings each
+    for cpu in range(16):
+        core = cpu % 8
+        topology = tmp_path / "cpu" / f"cpu{cpu}" / "topology"
+        topology.mkdir(parents=True)
+        (topology / "thread_siblings_list").write_text(f"{core},{core + 8}\n")
+    for node in range(2):
+        (tmp_path / "node" / f"node{node}").mkdir(parents=True)
+        (tmp_path / "node" / f"node{node}" / "cpulist").write_text(
+            f"{4 * node}-{4 * node + 3},{4 * node + 8}-{4 * node + 11}\n"
+        )
+    monkeypatch.setattr(pinning, "SYSFS_CPU", tmp_path / "cpu")
+    monkeypatch.setattr(pinning, "SYSFS_NODE", tmp_path / "node")
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(16)), False)
+
+    # Sets alternate between the nodes, and use a single CPU of every core
+    assert core_sets(16, 1) == [[0], [4], [1], [5], [2], [6], [3], [7]]
+    assert core_sets(3, 2) == [[0, 1], [4, 5], [2, 3]]
+    assert core_sets(16, 3) == [[0, 1, 2], [4, 5, 6]]
+    # Allow sets to span nodes when no set fits within a node
+    assert core_sets(16, 5) == [[0, 1, 2, 3, 4]]
+    assert core_sets(16, 3, avoid_numa=False) == [[0, 1, 2], [3, 4, 5]]
+    # SMT siblings are placed in the same set
+    assert core_sets(2, 2, avoid_smt=False) == [[0, 8], [4, 12]]
+
+
+def _driver(tmp_path, script):
+    # A driver whose "MiniZinc" executable runs the given Python script
+    executable = tmp_path / "minizinc"
+    executable.write_text(f"#!/bin/sh\nexec {sys.executable} -c '{script}'\n")
+    executable.chmod(0o755)
+    return CachedDriver(executable, "MiniZinc to FlatZinc converter, version 2.8.5", [])
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity") or not sys.platform.startswith("linux"),
+    reason="requires Linux",
+)
+def test_placement(tmp_path):
+    cpu = min(os.sched_getaffinity(0))
+    original = os.sched_getaffinity(0)
+    # Report the affinity and memory limit of the process, after giving the
+    # harness time to set the memory limit
+    driver = _driver(
+        tmp_path,
+        "import os, resource, time; time.sleep(0.2); "
+        "print(sorted(os.sched_getaffinity(0)), "
+        "resource.getrlimit(resource.RLIMIT_AS)[0])",
+    )
+
+    async def solutions():
+        proc = await driver._create_process([])
+        stdout, _ = await proc.communicate()
+        yield stdout.decode().strip()
+
+    async def run():
+        placement = Placement([cpu], 2**32)
+        return [result async for result in placement.run(solutions())]
+
+    assert asyncio.run(run()) == [f"[{cpu}] {2**32}"]
+    assert os.sched_getaffinity(0) == original
+
+
+def test_limit_failure(monkeypatch, caplog):
+    def prlimit(pid, res, limits):
+        raise PermissionError("Operation not permitted")
+
+    monkeypatch.setattr(pinning.resource, "prlimit", prlimit)
+    # A limit that cannot be set is not silently ignored
+    Placement(memory=2**32)._limit(os.getpid())
+    assert "Could not limit the memory" in caplog.text
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="requires Linux")
+def test_track_processes(tmp_path):
+    driver = _driver(tmp_path, "pass")
+
+    async def solutions():
+        proc = await driver._create_process([])
+        await proc.wait()
+        yield proc.pid
+
+    async def run():
+        started, outer = [], []
+        with track_processes(outer.append):
+            with track_processes(started.append):
+                results = [pid async for pid in Placement().run(solutions())]
+            # Processes are only reported within the context
+            await (await driver._create_process([])).wait()
+        return results, started, outer
+
+    results, started, outer = asyncio.run(run())
+    assert results == started
+    assert outer[:1] == started and len(outer) == 2
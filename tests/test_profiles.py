@@ -0,0 +1,92 @@
+import pytest
+
+
+def statistics(pd, rows):
+    return pd.DataFrame(
+        [
+            {
+                "configuration": conf,
+                "run": "results",
+                "problem": "p",
+                "model": "p.mzn",
+                "data_file": data,
+                "status": status,
+                "time": time,
+                "method": method,
+            }
+            for conf, data, status, time, method in rows
+        ]
+    )
+
+
+def test_performance_profile():
+    pd = pytest.importorskip("pandas")
+    from mzn_bench.analysis.profiles import cactus, performance_profile
+
+    stats = statistics(
+        pd,
+        [
+            ("A", "1.dzn", "OPTIMAL_SOLUTION", 1.0, "minimize"),
+            ("B", "1.dzn", "OPTIMAL_SOLUTION", 2.0, "minimize"),
+            ("A", "2.dzn", "UNKNOWN", 10.0, "minimize"),
+            ("B", "2.dzn", "SATISFIED", 4.0, "satisfy"),
+            ("A", "3.dzn", "UNKNOWN", 10.0, "minimize"),
+            ("B", "3.dzn", "UNKNOWN", 10.0, "minimize"),
+        ],
+    )
+    profile = performance_profile(stats)
+    assert profile.index.tolist() == [1.0, 2.0]
+    assert profile.A.tolist() == [0.5, 0.5]
+    assert profile.B.tolist() == [0.5, 1.0]
+
+    df = cactus(stats)
+    assert df[df.solver.eq("B")].time.tolist() == [2.0, 4.0]
+
+
+def test_time_to_target():
+    pd = pytest.importorskip("pandas")
+    from mzn_bench.analysis.profiles import time_to_target
+
+    stats = statistics(
+        pd,
+        [
+            ("A", "1.dzn", "SATISFIED", 10.0, "maximize"),
+            ("B", "1.dzn", "SATISFIED", 10.0, "maximize"),
+        ],
+    )
+    sols = pd.DataFrame(
+        [
+            {
+                "configuration": conf,
+                "run": "results",
+                "problem": "p",
+                "model": "p.mzn",
+                "data_file": "1.dzn",
+                "time": time,
+                "objective": objective,
+            }
+            for conf, time, objective in [
+                ("A", 1.0, 5),
+                ("A", 3.0, 10),
+                ("B", 2.0, 9),
+            ]
+        ]
+    )
+    df = time_to_target(sols, stats)
+    assert df.solver.tolist() == ["A"] and df.time.tolist() == [3.0]
+    df = time_to_target(sols, stats, gap=0.1)
+    assert df.set_index("solver").time.to_dict() == {"A": 3.0, "B": 2.0}
+
+
+def test_empty():
+    pd = pytest.importorskip("pandas")
+    from mzn_bench.analysis.profiles import cactus, solver_labels, time_to_target
+
+    stats = statistics(pd, [("A", "1.dzn", "UNKNOWN", 10.0, "minimize")])
+    assert cactus(stats.iloc[:0]).columns.tolist() == ["solver", "solved", "time"]
+    sols = pd.DataFrame(columns=stats.columns.tolist() + ["objective"])
+    assert len(time_to_target(sols, stats)) == 0
+
+    # Runs that are not strings are included in the labels
+    stats = pd.concat([stats, stats.assign(run=2)])
+    assert solver_labels(stats).tolist() == ["A (results)", "A (2)"]
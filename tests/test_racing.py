@@ -0,0 +1,82 @@
+import random
+from datetime import timedelta
+
+import pytest
+
+from mzn_bench import Configuration, FakeSolver, race
+from mzn_bench.racing import _chi2_sf, _t_ppf, dominated, friedman_test, score
+
+
+def test_distributions():
+    assert _chi2_sf(3.841459, 1) == pytest.approx(0.05, abs=1e-6)
+    assert _chi2_sf(5.991465, 2) == pytest.approx(0.05, abs=1e-6)
+    assert _t_ppf(0.975, 10) == pytest.approx(2.228139, abs=1e-5)
+    assert _t_ppf(0.975, 1) == pytest.approx(12.7062, abs=1e-3)
+
+
+def test_friedman():
+    rng = random.Random(0)
+    # The third configuration never solves an instance, the others are similar
+    scores = [
+        [
+            score({"status": "OPTIMAL_SOLUTION", "time": rng.random()}),
+            score({"status": "OPTIMAL_SOLUTION", "time": rng.random()}),
+            score({"status": "SATISFIED", "objective": 10, "method": "minimize"}),
+        ]
+        for _ in range(10)
+    ]
+    statistic, p_value = friedman_test(scores)
+    assert p_value < 0.01
+    assert dominated(scores) == [2]
+
+    # Identical configurations are never dominated
+    tied = [[(0, 1.0), (0, 1.0)] for _ in range(10)]
+    assert friedman_test(tied)[1] == 1.0
+    assert dominated(tied) == []
+
+
+def test_score():
+    assert score({"status": "OPTIMAL_SOLUTION", "time": 2.0}) == (0, 2.0)
+    # Tasks that did not finish are not solved, but keep their objective
+    stats = {"status": "OPTIMAL_SOLUTION", "time": 2.0, "partial": True}
+    assert score(stats) == (2, 0.0)
+    assert score(dict(stats, objective=5, method="maximize")) == (1, -5.0)
+
+
+def test_race(tmp_path):
+    instances = tmp_path / "instances.csv"
+    (tmp_path / "p.mzn").write_text("var 1..10: x;\nsolve minimize x;\n")
+    instances.write_text(
+        '"problem","model","data_file"\n'
+        + "".join(f'"p","p.mzn","{i}.dzn"\n' for i in range(12))
+    )
+    configurations = [
+        Configuration(name=name, solver=FakeSolver.solver()) for name in "ABC"
+    ]
+    alive = race(
+        instances,
+        timedelta(seconds=5),
+        configurations,
+        output_dir=tmp_path / "results",
+        wave_size=4,
+        first_test=4,
+        # With this seed, C never solves an instance, while A and B solve 11
+        # and 9 of the 12 instances
+        fake=FakeSolver(
+            solutions=3,
+            rate=None,
+            statuses={"OPTIMAL_SOLUTION": 1, "UNKNOWN": 1},
+            seed=344095,
+        ),
+    )
+    assert "C" not in [config.name for config in alive]
+    runs = {
+        config.name: len(
+            list((tmp_path / "results").glob(f"*_{config.name}_stats.yml"))
+        )
+        for config in configurations
+    }
+    # Every configuration runs the first wave, and the survivors run every wave
+    assert min(runs.values()) >= 4
+    assert all(runs[config.name] == max(runs.values()) for config in alive)
+    assert all(runs["C"] < runs[config.name] for config in alive)
@@ -0,0 +1,31 @@
+import pytest
+
+from mzn_bench.archive import compact
+
+
+def test_slugs():
+    pytest.importorskip("bokeh")
+    from mzn_bench.analysis.report import _slugs
+
+    slugs = _slugs(["a b", "a/b", "a_b", "c"])
+    assert slugs["a b"] == "a_b" and slugs["c"] == "c"
+    # Problems with the same slug get their own pages
+    assert len(set(slugs.values())) == 4
+
+
+def test_report_archive(tmp_path):
+    pytest.importorskip("bokeh")
+    pytest.importorskip("tabulate")
+    from test_archive import run
+
+    from mzn_bench.analysis.report import write_report
+
+    run(tmp_path / "results", archive=True)
+    archive = tmp_path / "results.sqlite"
+    compact(tmp_path / "results", archive)
+
+    # The report reads the statistics of an archive only once
+    write_report(archive, archive, tmp_path / "report")
+    index = (tmp_path / "report" / "index.html").read_text()
+    assert "OPTIMAL_SOLUTION" in index
+    assert (tmp_path / "report" / "problems" / "nqueens-1.html").exists()
@@ -0,0 +1,98 @@
+import shutil
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+
+from mzn_bench import Configuration, FakeSolver, SolutionStore, schedule, yaml
+from mzn_bench.result_cache import ResultCache, file_hash
+
+
+def run(
+    instances: Path,
+    output_dir: Path,
+    cache: ResultCache,
+    timeout: float = 5,
+    solution_store: Optional[SolutionStore] = None,
+    compression: Optional[str] = None,
+):
+    schedule(
+        instances=instances,
+        timeout=timedelta(seconds=timeout),
+        configurations=[
+            Configuration(name="A", solver=FakeSolver.solver()),
+            Configuration(name="B", solver=FakeSolver.solver(), random_seed=1),
+        ],
+        output_dir=output_dir,
+        nodelist=None,
+        fake=FakeSolver(solutions=3, rate=None, size=5),
+        result_cache=cache,
+        solution_store=solution_store,
+        compression=compression,
+    )
+
+
+def test_result_cache(tmp_path):
+    for file in ["test.csv", "nqueens.mzn", "n4.dzn"]:
+        shutil.copy(Path("./tests") / file, tmp_path / file)
+    instances = tmp_path / "test.csv"
+    cache = ResultCache(tmp_path / "cache")
+
+    run(instances, tmp_path / "first", cache)
+    assert len(list((tmp_path / "cache").glob("*/*"))) == 2
+
+    # Cached results are linked instead of run
+    run(instances, tmp_path / "second", cache)
+    for name in ["1_A_stats.yml", "1_B_sol.yml", "1_B_obj.csv"]:
+        first, second = tmp_path / "first" / name, tmp_path / "second" / name
+        assert first.read_text() == second.read_text()
+        assert (second).stat().st_nlink > 1
+    assert (tmp_path / "second" / "minizinc_slurm_tasks.txt").read_text() == ""
+
+    # Changing the data invalidates the cached results
+    (tmp_path / "n4.dzn").write_text("n = 4;\n% changed\n")
+    file_hash.cache_clear()
+    run(instances, tmp_path / "third", cache)
+    assert len(list((tmp_path / "cache").glob("*/*"))) == 4
+    stats = yaml.load(tmp_path / "third" / "1_A_stats.yml")
+    assert stats["status"] == "OPTIMAL_SOLUTION"
+
+
+def test_rerun_linked(tmp_path):
+    for file in ["test.csv", "nqueens.mzn", "n4.dzn"]:
+        shutil.copy(Path("./tests") / file, tmp_path / file)
+    instances = tmp_path / "test.csv"
+    cache = ResultCache(tmp_path / "cache")
+    run(instances, tmp_path / "first", cache)
+    run(instances, tmp_path / "second", cache)
+    entries = {f: f.read_bytes() for f in (tmp_path / "cache").glob("*/*/*")}
+
+    # Tasks that are run again replace the linked files instead of writing
+    # through them into the cache
+    run(instances, tmp_path / "second", cache, timeout=10)
+    assert len(list((tmp_path / "cache").glob("*/*"))) == 4
+    for file, content in entries.items():
+        assert file.read_bytes() == content
+        assert file.stat().st_nlink == 1
+
+
+def test_storage_key(tmp_path):
+    for file in ["test.csv", "nqueens.mzn", "n4.dzn"]:
+        shutil.copy(Path("./tests") / file, tmp_path / file)
+    instances = tmp_path / "test.csv"
+    cache = ResultCache(tmp_path / "cache")
+    run(instances, tmp_path / "first", cache)
+    run(instances, tmp_path / "full", cache, solution_store=SolutionStore())
+    assert len(list((tmp_path / "cache").glob("*/*"))) == 2
+
+    # Results stored differently are not reused
+    run(
+        instances, tmp_path / "delta", cache, solution_store=SolutionStore(mode="delta")
+    )
+    assert len(list((tmp_path / "cache").glob("*/*"))) == 4
+    run(instances, tmp_path / "gzip", cache, compression="gzip")
+    assert len(list((tmp_path / "cache").glob("*/*"))) == 6
+    assert sorted(f.name for f in (tmp_path / "gzip").glob("1_A_*")) == [
+        "1_A_obj.csv",
+        "1_A_sol.yml.gz",
+        "1_A_stats.yml.gz",
+    ]
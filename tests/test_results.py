@@ -0,0 +1,75 @@
+import pytest
+
+from mzn_bench.results import SolutionStore, read_solutions
+
+BASE = {"configuration": "A", "problem": "p", "model": "p.mzn", "data_file": ""}
+
+
+def solutions(n):
+    x = list(range(20))
+    for i in range(n):
+        x = list(x)
+        x[i % len(x)] = 100 + i
+        yield dict(
+            BASE,
+            status="SATISFIED",
+            time=0.1 * (i + 1),
+            solution={"objective": 100 - i, "x": x, "y": i // 2},
+        )
+    yield dict(BASE, status="OPTIMAL_SOLUTION", time=0.1 * (n + 1))
+
+
+def write(path, store, entries):
+    with store.writer(path) as writer:
+        for entry in entries:
+            writer.write(entry)
+
+
+@pytest.mark.parametrize("interval", [None, 3])
+def test_delta(tmp_path, interval):
+    path = tmp_path / "1_A_sol.yml"
+    write(path, SolutionStore("delta", interval), solutions(7))
+    assert read_solutions(path) == list(solutions(7))
+
+    # Without restoring the assignments, the objectives are still available
+    entries = read_solutions(path, assignments=False)
+    assert [e["solution"]["objective"] for e in entries[:-1]] == list(
+        range(100, 93, -1)
+    )
+    assert entries[1]["assignment"] == "delta"
+
+
+@pytest.mark.parametrize("interval", [None, 3])
+def test_sample(tmp_path, interval):
+    path = tmp_path / "1_A_sol.yml"
+    write(path, SolutionStore("sample", interval), solutions(7))
+    entries = read_solutions(path)
+    expected = list(solutions(7))
+    assert len(entries) == len(expected)
+    full = [i for i, e in enumerate(entries) if e.get("assignment") != "omitted"]
+    assert full == ([2, 5, 6, 7] if interval == 3 else [6, 7])
+    for i, entry in enumerate(entries[:-1]):
+        if i in full:
+            assert entry == expected[i]
+        else:
+            assert entry["solution"] == {"objective": 100 - i}
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        SolutionStore("compressed")
+
+
+def test_objectives_sidecar(tmp_path):
+    from mzn_bench.analysis.collect import collect_objectives
+
+    # Objectives are collected from the sidecar file when available
+    write(tmp_path / "1_A_sol.yml", SolutionStore("sample"), solutions(5))
+    assert (tmp_path / "1_A_obj.csv").exists()
+    from_sidecar = list(collect_objectives([tmp_path]))
+    assert [o["objective"] for o in from_sidecar] == [100, 99, 98, 97, 96]
+
+    (tmp_path / "1_A_obj.csv").unlink()
+    write(tmp_path / "1_A_sol.yml", SolutionStore(objectives=False), solutions(5))
+    assert not (tmp_path / "1_A_obj.csv").exists()
+    assert from_sidecar == list(collect_objectives([tmp_path]))
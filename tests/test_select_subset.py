@@ -0,0 +1,66 @@
+import csv
+import random
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("tabulate")
+
+from mzn_bench.analysis.select_subset import (
+    instance_features,
+    read_instances,
+    reproduction_report,
+    select_subset,
+    strata,
+    write_instances,
+)
+
+
+def test_select_subset(tmp_path):
+    rng = random.Random(0)
+    instances = [
+        (f"p{p}", f"p{p}.mzn", f"{i}.dzn") for p in range(4) for i in range(25)
+    ]
+    (tmp_path / "instances").mkdir()
+    file = tmp_path / "instances" / "instances.csv"
+    with file.open("w") as fp:
+        writer = csv.writer(fp, dialect="unix")
+        writer.writerow(["problem", "model", "data_file"])
+        writer.writerows(instances + [("new", "new.mzn", "")])
+    rows = []
+    for conf, skill in [("A", 0.9), ("B", 0.6), ("C", 0.3)]:
+        for problem, model, data in instances:
+            solved = rng.random() < skill
+            rows.append(
+                {
+                    "configuration": conf,
+                    "run": "results",
+                    "problem": problem,
+                    "model": model,
+                    "data_file": data,
+                    "status": "OPTIMAL_SOLUTION" if solved else "UNKNOWN",
+                    "time": rng.uniform(1, 10) if solved else 60.0,
+                    "method": "minimize",
+                }
+            )
+    stats = pd.DataFrame(rows)
+
+    features = instance_features(read_instances(file), stats)
+    assert features.solved.isna().sum() == 1  # The instance without history
+    assert strata(features)[features.problem == "new"].tolist() == ["new|new|"]
+
+    subset = select_subset(features, 20, seed=1)
+    assert len(subset) == 20
+    assert set(subset.problem) == {"p0", "p1", "p2", "p3", "new"}
+    assert subset.equals(select_subset(features, 20, seed=1))
+
+    out = tmp_path / "subset.csv"
+    write_instances(file, subset, out)
+    with out.open() as fp:
+        written = list(csv.DictReader(fp))
+    assert len(written) == 20
+    assert all(row["model"].startswith("instances/") for row in written)
+
+    report = reproduction_report(stats, subset, "plain")
+    assert "covering 4 of 4 problems" in report
+    assert "Kendall's tau" in report
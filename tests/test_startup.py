@@ -0,0 +1,61 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import mzn_bench
+
+WORKER = Path(mzn_bench.__file__).parent / "mzn_slurm.py"
+
+# Modules that the SLURM worker should not import
+FORBIDDEN = [
+    "click",
+    "tabulate",
+    "pandas",
+    "bokeh",
+    "mzn_bench.cli",
+    "mzn_bench.analysis",
+]
+
+
+def imported_modules(code):
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    modules = set()
+    for line in output.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            self_time, _, name = line[len("import time:") :].split("|")
+            if self_time.strip().isdigit():
+                modules.add(name.strip())
+    return modules
+
+
+def test_worker_imports():
+    worker = imported_modules(
+        f"import runpy; runpy.run_path({str(WORKER)!r}, run_name='worker')"
+    )
+    for name in worker:
+        assert not any(
+            name == module or name.startswith(module + ".") for module in FORBIDDEN
+        ), f"the worker imports {name}"
+    # The optional backends are only imported when they are used
+    for module in ["mzn_bench.fake", "mzn_bench.archive", "mzn_bench.pinning"]:
+        assert module not in worker, f"the worker imports {module}"
+
+
+def test_cli_imports():
+    # Listing the commands, or collecting instances, should not require MiniZinc
+    # or the analysis dependencies
+    for args in [["--help"], ["collect-instances", "--help"]]:
+        cli = imported_modules(
+            f"import sys; sys.argv = ['mzn-bench'] + {args!r}; "
+            "from mzn_bench.cli import main; main()"
+        )
+        for name in cli:
+            assert not any(
+                name == module or name.startswith(module + ".")
+                for module in ["minizinc", "ruamel", "tabulate", "pandas", "bokeh"]
+            ), f"mzn-bench {' '.join(args)} imports {name}"
@@ -0,0 +1,29 @@
+import asyncio
+import subprocess
+import sys
+import time
+
+import pytest
+
+from mzn_bench.instrument import process_tree
+from mzn_bench.watchdog import terminate_tree
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="requires Linux")
+def test_terminate_tree():
+    # A process tree that ignores SIGTERM
+    proc = subprocess.Popen(["sh", "-c", "trap '' TERM; sleep 30 & sleep 30; wait"])
+    time.sleep(0.2)
+    pids = process_tree(proc.pid)
+    assert len(pids) == 3
+
+    killed = asyncio.run(terminate_tree(proc.pid, grace=0.3))
+    assert sorted(killed) == sorted(pids)
+    proc.wait(timeout=1)
+    time.sleep(0.1)
+    assert process_tree(proc.pid) == [proc.pid]
+
+    # Processes that stop after SIGTERM are not killed
+    proc = subprocess.Popen(["sleep", "30"])
+    assert asyncio.run(terminate_tree(proc.pid, grace=5)) == []
+    assert proc.wait(timeout=1) == -15